@@ -1,3 +1,39 @@
 from django.contrib import admin
+from django.contrib.auth.forms import BaseUserCreationForm
+from admin_panel.admin import EstimatedCountPaginator
+from .models import User
 
-# Register your models here.
+
+class UserCreationForm(BaseUserCreationForm):
+    """Add form: the password is entered twice, validated and hashed"""
+
+    class Meta:
+        model = User
+        fields = ('email', 'full_name', 'role', 'department', 'is_approved')
+
+
+@admin.register(User)
+class UserAdmin(admin.ModelAdmin):
+    list_display = ('email', 'full_name', 'role', 'department', 'is_approved', 'is_active', 'created_at')
+    # Covered by users_status_created_idx and users_role_department_idx
+    list_filter = ('is_approved', 'is_active', 'role', 'department')
+    search_fields = ('email', 'full_name')
+    exclude = ('password', 'groups', 'user_permissions')
+    readonly_fields = ('last_login', 'created_at', 'updated_at')
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+    add_form = UserCreationForm
+    add_fieldsets = (
+        (None, {'fields': ('email', 'full_name', 'role', 'department', 'is_approved', 'password1', 'password2')}),
+    )
+
+    def get_fieldsets(self, request, obj=None):
+        if obj is None:
+            return self.add_fieldsets
+        return super().get_fieldsets(request, obj)
+
+    def get_form(self, request, obj=None, **kwargs):
+        if obj is None:
+            kwargs['form'] = self.add_form
+        return super().get_form(request, obj, **kwargs)
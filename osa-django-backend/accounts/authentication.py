@@ -1,9 +1,35 @@
 import jwt
+import uuid
 from datetime import datetime, timedelta
 from django.conf import settings
+from django.core.cache import cache
 from rest_framework import authentication
 from rest_framework.exceptions import AuthenticationFailed
 from .models import User
+from .revocation import revocation_list
+
+AUTH_CACHE_PREFIX = 'auth_user:'
+
+# The only columns kept in the cache: what permission checks read. Never
+# the password hash. Other fields load on first access.
+AUTH_CACHE_FIELDS = [
+    field.attname for field in User._meta.concrete_fields
+    if field.attname in {
+        'id', 'email', 'full_name', 'role', 'department',
+        'is_active', 'is_approved', 'is_staff', 'is_superuser', 'tokens_valid_after',
+    }
+]
+
+
+def auth_cache_key(user_id):
+    return f'{AUTH_CACHE_PREFIX}{user_id}'
+
+
+def invalidate_cached_users(user_ids):
+    """Forget cached authentication state so the next request reloads the user"""
+    keys = [auth_cache_key(user_id) for user_id in user_ids]
+    if keys:
+        cache.delete_many(keys)
 
 class JWTAuthentication(authentication.BaseAuthentication):
     def authenticate(self, request):
@@ -13,29 +39,71 @@ class JWTAuthentication(authentication.BaseAuthentication):
             return None
         
         try:
-
             prefix, token = auth_header.split(' ')
-            if prefix.lower() != 'bearer':
-                return None
-            
+        except ValueError:
+            raise AuthenticationFailed('Invalid or expired token')
+
+        if prefix.lower() != 'bearer':
+            return None
+
+        return self.authenticate_credentials(token)
+
+    def authenticate_credentials(self, token):
+        """Resolve a raw JWT to an active, approved user"""
+        try:
+            payload = self.decode_token(token)
+        except jwt.InvalidTokenError:
+            raise AuthenticationFailed('Invalid or expired token')
+        
+        return (self.authenticate_payload(payload), token)
     
-            payload = jwt.decode(
-                token,
-                settings.JWT_SECRET_KEY,
-                algorithms=[settings.JWT_ALGORITHM]
-            )
+    def authenticate_payload(self, payload):
+        """
+        Resolve decoded token claims to an active, approved user, refusing
+        revoked tokens. Also used to re-check long-lived event streams.
+        """
+        try:
+            # Tokens issued before revocation support have no jti and are refused
+            if revocation_list.is_revoked(payload['jti']):
+                raise AuthenticationFailed('Token has been revoked')
             
-            user = User.objects.get(
-                id=payload['userId'], 
-                is_active=True,
-                is_approved=True  
-            )
+            user = self.get_user(payload['userId'])
+            if user.tokens_valid_after and payload['iat'] < user.tokens_valid_after.timestamp():
+                raise AuthenticationFailed('Token has been revoked')
             
-            return (user, token)
+            return user
             
-        except (ValueError, jwt.ExpiredSignatureError, jwt.DecodeError, User.DoesNotExist):
+        except (ValueError, KeyError, TypeError, User.DoesNotExist):
             raise AuthenticationFailed('Invalid or expired token')
     
+    @staticmethod
+    def get_user(user_id):
+        """
+        The active, approved user, with only AUTH_CACHE_FIELDS loaded. Served
+        from the cache for AUTH_USER_CACHE_SECONDS when that is enabled.
+        """
+        key = auth_cache_key(user_id)
+        values = cache.get(key) if settings.AUTH_USER_CACHE_SECONDS else None
+        if values is None:
+            values = User.objects.filter(
+                id=user_id,
+                is_active=True,
+                is_approved=True
+            ).values_list(*AUTH_CACHE_FIELDS).get()
+            if settings.AUTH_USER_CACHE_SECONDS:
+                cache.set(key, values, settings.AUTH_USER_CACHE_SECONDS)
+        # Like an .only() instance (values in model field order): saving it
+        # writes the loaded fields only
+        return User.from_db('default', AUTH_CACHE_FIELDS, values)
+    
+    @staticmethod
+    def decode_token(token):
+        return jwt.decode(
+            token,
+            settings.JWT_SECRET_KEY,
+            algorithms=[settings.JWT_ALGORITHM]
+        )
+    
     @staticmethod
     def generate_token(user):
         """Generate JWT token for user"""
@@ -43,7 +111,8 @@ class JWTAuthentication(authentication.BaseAuthentication):
             'userId': user.id,
             'email': user.email,
             'exp': datetime.utcnow() + timedelta(days=settings.JWT_EXPIRATION_DAYS),
-            'iat': datetime.utcnow()
+            'iat': datetime.utcnow(),
+            'jti': uuid.uuid4().hex
         }
         
         token = jwt.encode(
@@ -52,4 +121,4 @@ class JWTAuthentication(authentication.BaseAuthentication):
             algorithm=settings.JWT_ALGORITHM
         )
         
-        return token
\ No newline at end of file
+        return token
@@ -0,0 +1,22 @@
+# Generated by Django 5.0.1 on 2026-10-19 17:06
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0002_user_is_approved_user_rejection_reason'),
+        ('auth', '0012_alter_user_first_name_max_length'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='user',
+            index=models.Index(fields=['is_approved', 'is_active', '-created_at'], name='users_status_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='user',
+            index=models.Index(fields=['role', 'department'], name='users_role_department_idx'),
+        ),
+    ]
@@ -0,0 +1,42 @@
+# Generated by Django 5.0.1 on 2026-10-19 17:10
+
+import django.db.models.functions.text
+from django.db import migrations, models
+
+
+def check_case_duplicates(apps, schema_editor):
+    """Refuse to add the constraint while case-variant duplicates exist"""
+    User = apps.get_model('accounts', 'User')
+    duplicates = (
+        User.objects.annotate(email_lower=django.db.models.functions.text.Lower('email'))
+        .values('email_lower')
+        .annotate(count=models.Count('id'))
+        .filter(count__gt=1)
+        .order_by('email_lower')
+    )
+    conflicts = []
+    for row in duplicates:
+        accounts = User.objects.filter(email__iexact=row['email_lower']).order_by('id')
+        conflicts.append(', '.join(f'{user.id}:{user.email}' for user in accounts))
+
+    if conflicts:
+        raise RuntimeError(
+            'Users with emails that differ only by case must be merged or '
+            'renamed before migrating (id:email):\n  ' + '\n  '.join(conflicts)
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0003_user_indexes'),
+        ('auth', '0012_alter_user_first_name_max_length'),
+    ]
+
+    operations = [
+        migrations.RunPython(check_case_duplicates, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='user',
+            constraint=models.UniqueConstraint(django.db.models.functions.text.Lower('email'), name='users_email_lower_uniq'),
+        ),
+    ]
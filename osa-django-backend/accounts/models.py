@@ -1,7 +1,11 @@
 from django.contrib.auth.models import AbstractBaseUser, BaseUserManager, PermissionsMixin
 from django.db import models
+from django.db.models.functions import Lower
 from django.utils import timezone
 
+# Enables `email__lower=...`, which matches the Lower(email) unique index
+models.EmailField.register_lookup(Lower)
+
 class UserManager(BaseUserManager):
     def create_user(self, email, password=None, **extra_fields):
         if not email:
@@ -21,6 +25,13 @@ class UserManager(BaseUserManager):
         extra_fields.setdefault('is_approved', True) 
         
         return self.create_user(email, password, **extra_fields)
+    
+    def for_email(self, email):
+        """Case-insensitive email match, served by the Lower(email) index"""
+        return self.filter(email__lower=(email or '').strip().lower())
+    
+    def get_by_natural_key(self, email):
+        return self.for_email(email).get()
 
 class User(AbstractBaseUser, PermissionsMixin):
     ROLE_CHOICES = [
@@ -47,6 +58,8 @@ class User(AbstractBaseUser, PermissionsMixin):
     is_staff = models.BooleanField(default=False)
     is_approved = models.BooleanField(default=False)  
     rejection_reason = models.TextField(null=True, blank=True) 
+    # Tokens issued before this are refused (set on password changes)
+    tokens_valid_after = models.DateTimeField(null=True, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
@@ -58,11 +71,40 @@ class User(AbstractBaseUser, PermissionsMixin):
     class Meta:
         db_table = 'users'
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['is_approved', 'is_active', '-created_at'], name='users_status_created_idx'),
+            models.Index(fields=['role', 'department'], name='users_role_department_idx'),
+        ]
+        constraints = [
+            models.UniqueConstraint(Lower('email'), name='users_email_lower_uniq'),
+        ]
     
     def __str__(self):
         return f"{self.email} ({self.get_role_display()})"
     
+    def revoke_tokens(self):
+        """
+        Refuse every token issued before now; the caller saves. Token `iat`
+        has one-second resolution, so the cut-off is rounded down to the
+        second and a token issued right after still works.
+        """
+        self.tokens_valid_after = timezone.now().replace(microsecond=0)
+    
     def save(self, *args, **kwargs):
         if self.role != 'department':
             self.department = None
-        super().save(*args, **kwargs)
\ No newline at end of file
+        super().save(*args, **kwargs)
+
+
+class RevokedToken(models.Model):
+    """JWT ids that must be refused until the token would have expired anyway"""
+    jti = models.CharField(max_length=64, unique=True)
+    user = models.ForeignKey(User, on_delete=models.CASCADE, null=True, blank=True, related_name='revoked_tokens')
+    expires_at = models.DateTimeField(db_index=True)
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+    
+    class Meta:
+        db_table = 'revoked_tokens'
+    
+    def __str__(self):
+        return self.jti
@@ -0,0 +1,123 @@
+"""
+JWT revocation.
+
+Revoked token ids live in the `revoked_tokens` table until the token would
+have expired. Each process keeps a Bloom filter of them, so the common
+case (token not revoked) is answered from memory; only a possible hit
+goes to the database to confirm. The filter picks up rows revoked by
+other processes every REVOCATION_REFRESH_SECONDS and is rebuilt from
+scratch, pruning expired rows, every REVOCATION_REBUILD_SECONDS.
+"""
+import hashlib
+import math
+import threading
+import time
+from datetime import datetime, timedelta, timezone as dt_timezone
+from django.conf import settings
+from django.db import IntegrityError
+from django.utils import timezone
+from .models import RevokedToken
+
+# Rows created this close together may commit out of order; re-read them
+REFRESH_OVERLAP = timedelta(seconds=5)
+
+
+class BloomFilter:
+    """Fixed-size Bloom filter using double hashing over one BLAKE2b digest"""
+
+    def __init__(self, capacity, error_rate=0.001):
+        self.capacity = max(int(capacity), 1)
+        self.size = max(8, math.ceil(-self.capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hash_count = max(1, round(self.size / self.capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def _positions(self, item):
+        digest = hashlib.blake2b(item.encode(), digest_size=16).digest()
+        first = int.from_bytes(digest[:8], 'little')
+        second = int.from_bytes(digest[8:], 'little') | 1
+        return [(first + i * second) % self.size for i in range(self.hash_count)]
+
+    def add(self, item):
+        for position in self._positions(item):
+            self.bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, item):
+        return all(self.bits[position >> 3] & (1 << (position & 7)) for position in self._positions(item))
+
+
+class RevocationList:
+    """Per-process view of the revoked token ids"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._filter = None
+        self._refreshed_at = 0
+        self._rebuilt_at = 0
+        self._last_seen = None
+
+    def _rebuild(self, now):
+        # Expired tokens fail signature verification anyway
+        RevokedToken.objects.filter(expires_at__lt=now).delete()
+        rows = RevokedToken.objects.filter(expires_at__gte=now)
+        bloom = BloomFilter(max(rows.count() * 2, settings.REVOCATION_FILTER_CAPACITY))
+        for jti in rows.values_list('jti', flat=True).iterator(chunk_size=2000):
+            bloom.add(jti)
+        self._filter = bloom
+        self._last_seen = now
+
+    def _refresh(self):
+        now = timezone.now()
+        clock = time.monotonic()
+        if self._filter is None or clock - self._rebuilt_at >= settings.REVOCATION_REBUILD_SECONDS:
+            self._rebuild(now)
+            self._rebuilt_at = clock
+        else:
+            new = RevokedToken.objects.filter(created_at__gte=self._last_seen - REFRESH_OVERLAP)
+            for jti in new.values_list('jti', flat=True):
+                self._filter.add(jti)
+            self._last_seen = now
+            if self._filter.count > self._filter.capacity:
+                # Over capacity the false-positive rate climbs; resize
+                self._rebuild(now)
+                self._rebuilt_at = clock
+        self._refreshed_at = clock
+
+    def _current_filter(self):
+        if self._filter is None or time.monotonic() - self._refreshed_at >= settings.REVOCATION_REFRESH_SECONDS:
+            with self._lock:
+                if self._filter is None or time.monotonic() - self._refreshed_at >= settings.REVOCATION_REFRESH_SECONDS:
+                    self._refresh()
+        return self._filter
+
+    def is_revoked(self, jti):
+        if jti not in self._current_filter():
+            return False
+        return RevokedToken.objects.filter(jti=jti).exists()
+
+    def add(self, jti):
+        with self._lock:
+            if self._filter is not None:
+                self._filter.add(jti)
+
+    def reset(self):
+        with self._lock:
+            self._filter = None
+
+
+revocation_list = RevocationList()
+
+
+def revoke_token(payload, user=None):
+    """Revoke a decoded token; a no-op for tokens issued without a jti"""
+    jti = payload.get('jti')
+    if not jti:
+        return
+    expires_at = datetime.fromtimestamp(payload['exp'], tz=dt_timezone.utc)
+    try:
+        RevokedToken.objects.get_or_create(jti=jti, defaults={'user': user, 'expires_at': expires_at})
+    except IntegrityError:
+        # Revoked concurrently
+        pass
+    revocation_list.add(jti)
@@ -1,12 +1,25 @@
 from rest_framework import serializers
 from django.contrib.auth.password_validation import validate_password
+from osa_backend.utils import SparseFieldsMixin
 from .models import User
 
-class UserSerializer(serializers.ModelSerializer):
+def validate_unique_email(email, instance=None):
+    """Emails are unique regardless of case"""
+    existing = User.objects.for_email(email)
+    if instance is not None:
+        existing = existing.exclude(pk=instance.pk)
+    if existing.exists():
+        raise serializers.ValidationError('user with this email already exists.')
+    return email
+
+class UserSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = User
         fields = ['id', 'email', 'full_name', 'role', 'department', 'is_active', 'is_approved', 'rejection_reason', 'created_at']
         read_only_fields = ['id', 'created_at', 'is_approved', 'rejection_reason']
+    
+    def validate_email(self, value):
+        return validate_unique_email(value, self.instance)
 
 class RegisterSerializer(serializers.ModelSerializer):
     password = serializers.CharField(
@@ -20,6 +33,9 @@ class RegisterSerializer(serializers.ModelSerializer):
         model = User
         fields = ['email', 'password', 'full_name', 'role', 'department']
     
+    def validate_email(self, value):
+        return validate_unique_email(value)
+    
     def validate(self, attrs):
 
         if attrs.get('role') == 'department' and not attrs.get('department'):
@@ -1,3 +1,97 @@
+import uuid
+from datetime import datetime, timedelta
+import jwt
+from django.conf import settings
 from django.test import TestCase
+from rest_framework.test import APIClient
+from .authentication import JWTAuthentication
+from .models import User
 
-# Create your tests here.
+PASSWORD = 'Old-passw0rd!'
+NEW_PASSWORD = 'New-passw0rd!'
+
+
+def issued_token(user, seconds_ago):
+    """A token like generate_token's, issued `seconds_ago` (another device's login)"""
+    issued = datetime.utcnow() - timedelta(seconds=seconds_ago)
+    return jwt.encode({
+        'userId': user.id,
+        'email': user.email,
+        'exp': issued + timedelta(days=settings.JWT_EXPIRATION_DAYS),
+        'iat': issued,
+        'jti': uuid.uuid4().hex
+    }, settings.JWT_SECRET_KEY, algorithm=settings.JWT_ALGORITHM)
+
+
+class TokenRevocationTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            'dept@example.com', PASSWORD, full_name='Dept User',
+            role='department', department='CET', is_approved=True
+        )
+        self.admin = User.objects.create_superuser('admin@example.com', PASSWORD, full_name='Admin')
+
+    def client_for(self, token):
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+        return client
+
+    def assertRevoked(self, token):
+        # No WWW-Authenticate scheme is declared, so DRF answers 403
+        response = self.client_for(token).get('/api/auth/profile')
+        self.assertEqual(response.status_code, 403)
+        self.assertEqual(response.data['message'], 'Token has been revoked')
+
+    def test_logout_revokes_only_that_token(self):
+        token = JWTAuthentication.generate_token(self.user)
+        other = JWTAuthentication.generate_token(self.user)
+
+        self.assertEqual(self.client_for(token).post('/api/auth/logout').status_code, 200)
+
+        self.assertRevoked(token)
+        self.assertEqual(self.client_for(other).get('/api/auth/profile').status_code, 200)
+
+    def test_password_change_revokes_every_earlier_token(self):
+        token = JWTAuthentication.generate_token(self.user)
+        other_device = issued_token(self.user, seconds_ago=10)
+
+        response = self.client_for(token).post('/api/auth/change-password', {
+            'currentPassword': PASSWORD,
+            'newPassword': NEW_PASSWORD,
+        }, format='json')
+        self.assertEqual(response.status_code, 200)
+
+        self.assertRevoked(token)
+        self.assertRevoked(other_device)
+        fresh = response.data['data']['token']
+        self.assertEqual(self.client_for(fresh).get('/api/auth/profile').status_code, 200)
+
+    def test_admin_password_reset_revokes_the_users_tokens(self):
+        user_token = issued_token(self.user, seconds_ago=10)
+        admin = self.client_for(JWTAuthentication.generate_token(self.admin))
+
+        response = admin.post(
+            f'/api/admin/users/{self.user.pk}/change-password/', {'newPassword': NEW_PASSWORD}, format='json'
+        )
+        self.assertEqual(response.status_code, 200)
+
+        self.assertRevoked(user_token)
+
+
+class UserAdminTests(TestCase):
+    def test_user_added_in_the_admin_can_log_in(self):
+        admin = User.objects.create_superuser('admin@example.com', PASSWORD, full_name='Admin')
+        self.client.force_login(admin)
+
+        response = self.client.post('/admin/accounts/user/add/', {
+            'email': 'dept@example.com',
+            'full_name': 'Dept User',
+            'role': 'department',
+            'department': 'CET',
+            'is_approved': 'on',
+            'password1': NEW_PASSWORD,
+            'password2': NEW_PASSWORD,
+        })
+
+        self.assertEqual(response.status_code, 302)
+        self.assertTrue(User.objects.get(email='dept@example.com').check_password(NEW_PASSWORD))
@@ -6,8 +6,10 @@ app_name = 'accounts'
 urlpatterns = [
     path('register', views.register, name='register'),
     path('login', views.login, name='login'),
+    path('logout', views.logout, name='logout'),
     path('profile', views.get_profile, name='profile'),
     path('change-password', views.change_password, name='change-password'),
     path('check-email', views.check_email, name='check-email'),
     path('check-email-status', views.check_email_status, name='check-email-status'),
+    path('pre-login', views.pre_login, name='pre-login'),
 ]
\ No newline at end of file
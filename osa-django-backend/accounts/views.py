@@ -1,16 +1,32 @@
 from rest_framework import status
-from rest_framework.decorators import api_view, permission_classes
+from rest_framework.decorators import api_view, permission_classes, throttle_classes
 from rest_framework.response import Response
 from rest_framework.permissions import AllowAny, IsAuthenticated
 from django.contrib.auth import authenticate
+from django.views.decorators.cache import never_cache
 from .models import User
+from .revocation import revoke_token
 from .serializers import (
     RegisterSerializer, LoginSerializer, UserSerializer, ChangePasswordSerializer
 )
 from .authentication import JWTAuthentication
+from osa_backend.events import publish_on_commit
+from osa_backend.idempotency import idempotent
+from osa_backend.throttling import LoginIPThrottle, LoginEmailThrottle, EmailCheckThrottle
+
+def account_status(row):
+    """approved / rejected / pending / not_found from an `is_approved, rejection_reason` row"""
+    if row is None:
+        return 'not_found'
+    if row['is_approved']:
+        return 'approved'
+    if row['rejection_reason']:
+        return 'rejected'
+    return 'pending'
 
 @api_view(['POST'])
 @permission_classes([AllowAny])
+@idempotent
 def register(request):
     """Register a new user (pending approval)"""
     serializer = RegisterSerializer(data=request.data)
@@ -19,6 +35,12 @@ def register(request):
         user.is_approved = False 
         user.save()
         
+        publish_on_commit(
+            'registration.created',
+            {'id': user.id, 'email': user.email, 'role': user.role, 'department': user.department},
+            roles=('admin',)
+        )
+        
         return Response({
             'success': True,
             'message': 'Registration submitted successfully. Please wait for admin approval.',
@@ -34,8 +56,10 @@ def register(request):
         'errors': serializer.errors
     }, status=status.HTTP_400_BAD_REQUEST)
 
+@never_cache
 @api_view(['POST'])
 @permission_classes([AllowAny])
+@throttle_classes([LoginIPThrottle, LoginEmailThrottle])
 def login(request):
     """Login user (only if approved)"""
     serializer = LoginSerializer(data=request.data)
@@ -49,7 +73,7 @@ def login(request):
     password = serializer.validated_data['password']
     
     try:
-        user = User.objects.get(email=email, is_active=True)
+        user = User.objects.for_email(email).get(is_active=True)
         
 
         if not user.check_password(password):
@@ -82,12 +106,14 @@ def login(request):
 @permission_classes([IsAuthenticated])
 def get_profile(request):
     """Get user profile"""
-    serializer = UserSerializer(request.user)
+    # request.user only has the authentication columns loaded
+    serializer = UserSerializer(User.objects.get(pk=request.user.pk))
     return Response({
         'success': True,
         'data': serializer.data
     })
 
+@never_cache
 @api_view(['POST'])
 @permission_classes([IsAuthenticated])
 def change_password(request):
@@ -108,16 +134,36 @@ def change_password(request):
             'message': 'Current password is incorrect'
         }, status=status.HTTP_400_BAD_REQUEST)
     
+    # Every token issued so far stops working, on every device; the one used
+    # here is revoked outright in case it was issued this very second
     user.set_password(serializer.validated_data['newPassword'])
-    user.save()
+    user.revoke_tokens()
+    user.save(update_fields=['password', 'tokens_valid_after', 'updated_at'])
+    revoke_token(JWTAuthentication.decode_token(request.auth), user)
+    
+    # Hand the client a fresh one
+    return Response({
+        'success': True,
+        'message': 'Password changed successfully',
+        'data': {
+            'token': JWTAuthentication.generate_token(user)
+        }
+    })
+
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def logout(request):
+    """Revoke the token used for this request"""
+    revoke_token(JWTAuthentication.decode_token(request.auth), request.user)
     
     return Response({
         'success': True,
-        'message': 'Password changed successfully'
+        'message': 'Logged out successfully'
     })
 
 @api_view(['POST'])
 @permission_classes([AllowAny])
+@throttle_classes([EmailCheckThrottle])
 def check_email(request):
     """Check if email exists"""
     email = request.data.get('email')
@@ -127,7 +173,7 @@ def check_email(request):
             'message': 'Email is required'
         }, status=status.HTTP_400_BAD_REQUEST)
     
-    exists = User.objects.filter(email=email).exists()
+    exists = User.objects.for_email(email).exists()
     
     return Response({
         'success': True,
@@ -136,6 +182,7 @@ def check_email(request):
 
 @api_view(['POST'])
 @permission_classes([AllowAny])
+@throttle_classes([EmailCheckThrottle])
 def check_email_status(request):
     """Check email approval status for login page"""
     email = request.data.get('email')
@@ -145,25 +192,42 @@ def check_email_status(request):
             'message': 'Email is required'
         }, status=status.HTTP_400_BAD_REQUEST)
     
-    try:
-        user = User.objects.get(email=email)
-        
-        if user.is_approved:
-            user_status = 'approved'
-        elif user.rejection_reason:
-            user_status = 'rejected'
-        else:
-            user_status = 'pending'
-        
-        return Response({
-            'success': True,
-            'status': user_status,
-            'message': f'Account is {user_status}'
-        })
+    user_status = account_status(
+        User.objects.for_email(email).values('is_approved', 'rejection_reason').first()
+    )
     
-    except User.DoesNotExist:
+    if user_status == 'not_found':
         return Response({
             'success': True,
             'status': 'not_found',
             'message': 'Email not registered'
-        })
\ No newline at end of file
+        })
+    
+    return Response({
+        'success': True,
+        'status': user_status,
+        'message': f'Account is {user_status}'
+    })
+
+@api_view(['POST'])
+@permission_classes([AllowAny])
+@throttle_classes([EmailCheckThrottle])
+def pre_login(request):
+    """Existence and approval status for the login page in one lookup"""
+    email = request.data.get('email')
+    if not email:
+        return Response({
+            'success': False,
+            'message': 'Email is required'
+        }, status=status.HTTP_400_BAD_REQUEST)
+    
+    user_status = account_status(
+        User.objects.for_email(email).values('is_approved', 'rejection_reason').first()
+    )
+    
+    return Response({
+        'success': True,
+        'exists': user_status != 'not_found',
+        'status': user_status,
+        'message': 'Email not registered' if user_status == 'not_found' else f'Account is {user_status}'
+    })
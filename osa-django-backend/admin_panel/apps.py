@@ -1,6 +1,16 @@
+import os
 from django.apps import AppConfig
+from django.conf import settings
+from django.db.backends.signals import connection_created
 
 
 class AdminPanelConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'admin_panel'
+
+    def ready(self):
+        from . import slow_queries
+
+        if settings.SLOW_QUERY_THRESHOLD_MS > 0:
+            os.makedirs(os.path.dirname(settings.SLOW_QUERY_LOG_FILE), exist_ok=True)
+            connection_created.connect(slow_queries.install, dispatch_uid='slow_query_wrapper')
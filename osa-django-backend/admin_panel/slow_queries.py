@@ -0,0 +1,188 @@
+"""
+Slow-query log.
+
+A database execute wrapper, installed on every new connection by
+AdminPanelConfig.ready(), times each query. Queries slower than
+SLOW_QUERY_THRESHOLD_MS are recorded with their normalized SQL, the view
+and line of project code that issued them, and the plan from EXPLAIN
+(EXPLAIN QUERY PLAN on SQLite) run on a separate connection so the
+request's own transaction is left alone. Entries go to a per-process ring
+buffer, browsed through the admin API, and to the rotating
+`osa_backend.slow_queries` log file.
+
+Parameter values and string literals are never kept, in the SQL or the
+plan: they carry password hashes, emails and tokens.
+"""
+import hashlib
+import logging
+import re
+import sys
+import threading
+import time
+from collections import deque
+from django.conf import settings
+from django.db import connections
+from django.utils import timezone
+
+logger = logging.getLogger('osa_backend.slow_queries')
+
+EXPLAINABLE = ('select', 'update', 'delete', 'with')
+
+_buffer = deque(maxlen=settings.SLOW_QUERY_BUFFER_SIZE)
+_buffer_lock = threading.Lock()
+_local = threading.local()
+
+
+def redact_literals(text):
+    """Replace quoted string literals with ?"""
+    return re.sub(r"'(?:[^']|'')*'", '?', text)
+
+
+def fingerprint_sql(sql):
+    """
+    Normalized SQL and its fingerprint: literals, numbers and placeholder
+    lists are collapsed so the same query with different values groups
+    together.
+    """
+    normalized = redact_literals(sql)
+    normalized = re.sub(r'%s|\b\d+(?:\.\d+)?\b', '?', normalized)
+    normalized = re.sub(r'\(\s*\?(?:\s*,\s*\?)*\s*\)', '(...)', normalized)
+    normalized = re.sub(r'\s+', ' ', normalized).strip()
+    return normalized, hashlib.sha1(normalized.encode()).hexdigest()[:12]
+
+
+def _call_site():
+    """
+    (view, caller): the outermost project function on the stack, preferring
+    one defined in a views module, and the innermost project line.
+    """
+    base = str(settings.BASE_DIR)
+    frames = []
+    frame = sys._getframe(2)
+    while frame is not None:
+        filename = frame.f_code.co_filename
+        if filename.startswith(base) and filename != __file__ and 'site-packages' not in filename:
+            frames.append(frame)
+        frame = frame.f_back
+
+    if not frames:
+        return None, None
+    inner = frames[0]
+    views = [frame for frame in frames if frame.f_globals.get('__name__', '').endswith('views')]
+    outer = views[-1] if views else frames[-1]
+    view = f"{outer.f_globals.get('__name__')}.{outer.f_code.co_name}"
+    caller = f"{inner.f_code.co_filename[len(base) + 1:]}:{inner.f_lineno} in {inner.f_code.co_name}"
+    return view, caller
+
+
+def explain(alias, sql, params):
+    """Query plan from a fresh connection, as a list of lines with literals redacted"""
+    if not sql.lstrip().lower().startswith(EXPLAINABLE):
+        return None
+
+    connection = connections.create_connection(alias)
+    prefix = 'EXPLAIN QUERY PLAN ' if connection.vendor == 'sqlite' else 'EXPLAIN '
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute(prefix + sql, params)
+            return [redact_literals(' '.join(str(value) for value in row)) for row in cursor.fetchall()]
+    except Exception as exc:
+        return [f'EXPLAIN failed: {type(exc).__name__}']
+    finally:
+        connection.close()
+
+
+def record(alias, sql, params, many, duration_ms):
+    normalized, fingerprint = fingerprint_sql(sql)
+    view, caller = _call_site()
+
+    _local.explaining = True
+    try:
+        plan = None if many or not settings.SLOW_QUERY_EXPLAIN else explain(alias, sql, params)
+    finally:
+        _local.explaining = False
+
+    entry = {
+        'fingerprint': fingerprint,
+        'normalized_sql': normalized,
+        'param_count': len(params) if params is not None and not many else None,
+        'many': many,
+        'duration_ms': round(duration_ms, 2),
+        'database': alias,
+        'view': view,
+        'caller': caller,
+        'plan': plan,
+        'recorded_at': timezone.now().isoformat(),
+    }
+    with _buffer_lock:
+        _buffer.append(entry)
+
+    logger.warning(
+        'slow query %.1f ms [%s] view=%s caller=%s\n%s\nplan=%s',
+        duration_ms, fingerprint, view, caller, normalized,
+        '\n  '.join(plan) if plan else None
+    )
+
+
+def slow_query_wrapper(execute, sql, params, many, context):
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        duration_ms = (time.perf_counter() - start) * 1000
+        if duration_ms >= settings.SLOW_QUERY_THRESHOLD_MS and not getattr(_local, 'explaining', False):
+            try:
+                record(context['connection'].alias, sql, params, many, duration_ms)
+            except Exception:
+                logger.exception('Could not record slow query')
+
+
+def install(sender=None, connection=None, **kwargs):
+    """connection_created receiver: wrap the new connection"""
+    if slow_query_wrapper not in connection.execute_wrappers:
+        connection.execute_wrappers.append(slow_query_wrapper)
+
+
+def entries():
+    with _buffer_lock:
+        return list(_buffer)
+
+
+def clear():
+    with _buffer_lock:
+        _buffer.clear()
+
+
+def grouped(order='total'):
+    """Buffered entries grouped by fingerprint, worst first"""
+    groups = {}
+    for entry in entries():
+        group = groups.setdefault(entry['fingerprint'], {
+            'fingerprint': entry['fingerprint'],
+            'normalized_sql': entry['normalized_sql'],
+            'count': 0,
+            'total_ms': 0.0,
+            'max_ms': 0.0,
+            'views': set(),
+            'callers': set(),
+        })
+        group['count'] += 1
+        group['total_ms'] += entry['duration_ms']
+        if entry['duration_ms'] >= group['max_ms']:
+            group['max_ms'] = entry['duration_ms']
+            group['slowest'] = entry
+        group['last_seen'] = entry['recorded_at']
+        group['views'].add(entry['view'])
+        group['callers'].add(entry['caller'])
+
+    result = []
+    for group in groups.values():
+        group['total_ms'] = round(group['total_ms'], 2)
+        group['avg_ms'] = round(group['total_ms'] / group['count'], 2)
+        group['views'] = sorted(view for view in group['views'] if view)
+        group['callers'] = sorted(caller for caller in group['callers'] if caller)
+        result.append(group)
+
+    key = {'total': 'total_ms', 'max': 'max_ms', 'avg': 'avg_ms', 'count': 'count'}[order]
+    result.sort(key=lambda group: group[key], reverse=True)
+    return result
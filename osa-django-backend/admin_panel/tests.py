@@ -1,3 +1,52 @@
 from django.test import TestCase
+from rest_framework.test import APIClient
+from accounts.authentication import JWTAuthentication
+from accounts.models import User
+from partnerships.tests import create_partnership
 
-# Create your tests here.
+
+class DashboardBootstrapTests(TestCase):
+    url = '/api/admin/dashboard/bootstrap/'
+
+    def setUp(self):
+        self.admin = User.objects.create_superuser('admin@example.com', 'Adm1n-passw0rd!', full_name='Admin')
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {JWTAuthentication.generate_token(self.admin)}')
+        self.partnership = create_partnership(self.admin)
+
+    def bootstrap(self, **params):
+        response = self.client.get(self.url, params)
+        self.assertEqual(response.status_code, 200)
+        return response.data['data']
+
+    def known(self, data):
+        return ','.join(f"{name}:{section['etag']}" for name, section in data.items())
+
+    def test_sections_with_known_etags_are_not_rebuilt(self):
+        first = self.bootstrap()
+        self.assertEqual(first['profile']['data']['email'], 'admin@example.com')
+        self.assertEqual(first['statistics']['data']['total'], 1)
+
+        # Authentication, the profile reload and the three version queries
+        with self.assertNumQueries(5):
+            again = self.bootstrap(etags=self.known(first))
+        self.assertTrue(all(section.get('not_modified') for section in again.values()))
+
+    def test_partnership_change_rebuilds_partnership_sections(self):
+        first = self.bootstrap()
+        self.client.put(f'/api/partnerships/{self.partnership.pk}/', {'status': 'terminated'}, format='json')
+
+        again = self.bootstrap(etags=self.known(first))
+
+        self.assertEqual(again['statistics']['data']['terminated'], 1)
+        self.assertIn('data', again['dashboard_stats'])
+        self.assertTrue(again['profile']['not_modified'])
+        self.assertTrue(again['pending_users']['not_modified'])
+
+    def test_unchanged_response_is_304(self):
+        response = self.client.get(self.url)
+
+        again = self.client.get(self.url, HTTP_IF_NONE_MATCH=response['ETag'])
+
+        self.assertEqual(again.status_code, 304)
+        self.assertEqual(again['ETag'], response['ETag'])
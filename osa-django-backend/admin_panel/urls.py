@@ -6,6 +6,10 @@ app_name = 'admin_panel'
 urlpatterns = [
     path('users/pending/', views.get_pending_users, name='pending-users'),
     
+    path('users/bulk/approve/', views.bulk_update_users, {'action': 'approve'}, name='bulk-approve-users'),
+    path('users/bulk/reject/', views.bulk_update_users, {'action': 'reject'}, name='bulk-reject-users'),
+    path('users/bulk/deactivate/', views.bulk_update_users, {'action': 'deactivate'}, name='bulk-deactivate-users'),
+
     path('users/<int:pk>/approve/', views.approve_user, name='approve-user'),
     path('users/<int:pk>/reject/', views.reject_user, name='reject-user'),
     path('users/<int:pk>/change-password/', views.change_user_password, name='change-user-password'),
@@ -15,4 +19,6 @@ urlpatterns = [
     
     path('audit-logs/', views.get_audit_logs, name='audit-logs'),
     path('dashboard-stats/', views.get_dashboard_stats, name='dashboard-stats'),
+    path('slow-queries/', views.manage_slow_queries, name='slow-queries'),
+    path('dashboard/bootstrap/', views.get_dashboard_bootstrap, name='dashboard-bootstrap'),
 ]
\ No newline at end of file
@@ -1,31 +1,137 @@
+import hashlib
+import json
 from rest_framework import status
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
-from django.db.models import Count
-from datetime import datetime, timedelta
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, Max, Q
+from django.utils import timezone
+from accounts.authentication import invalidate_cached_users
 from accounts.models import User
 from accounts.serializers import UserSerializer, RegisterSerializer
-from partnerships.models import Partnership, AuditLog
+from partnerships.models import Partnership, ArchivedPartnership, AuditLog, OutboxEvent
 from partnerships.serializers import AuditLogSerializer
+from partnerships.analytics import status_summary
+from partnerships.archive import include_archived
+from osa_backend.events import publish_on_commit
+from osa_backend.idempotency import idempotent
+from osa_backend.utils import get_sparse_fieldset, if_none_match
+from osa_backend.columnar import wants_columnar, build_columns, COLUMNAR
 from .permissions import IsAdmin
+from . import slow_queries
+
+
+def serialize_users(users, request):
+    """Serialize users trimmed by `fields=` / `exclude=`, fetching only the needed columns"""
+    fields, exclude = get_sparse_fieldset(request)
+    field_names = UserSerializer.sparse_field_names(fields, exclude)
+    serializer = UserSerializer(fields=field_names)
+    columns = UserSerializer.model_columns(field_names)
+    return [serializer.to_representation(user) for user in users.only(*columns)]
+
+
+USER_STATUSES = {
+    'active': Q(is_approved=True, is_active=True),
+    'inactive': Q(is_approved=True, is_active=False),
+    'pending': Q(is_approved=False, is_active=True),
+    'rejected': Q(is_approved=False, is_active=False),
+}
+
+MAX_PAGE_SIZE = 500
+
+
+def list_users(request, user_status):
+    """
+    User listing with search on email/full name and filters on role and
+    department. Counts per status for the same search/filters come from one
+    aggregate query, which also provides the total. Paginated when the
+    client passes `page` or `page_size`; otherwise every match is returned,
+    as older clients expect.
+    """
+    paginated = 'page' in request.query_params or 'page_size' in request.query_params
+    try:
+        page = max(int(request.query_params.get('page', 1)), 1)
+        page_size = int(request.query_params.get('page_size', settings.REST_FRAMEWORK['PAGE_SIZE']))
+        page_size = min(max(page_size, 1), MAX_PAGE_SIZE)
+    except ValueError:
+        return Response({
+            'success': False,
+            'message': 'page and page_size must be integers'
+        }, status=status.HTTP_400_BAD_REQUEST)
+
+    if user_status not in USER_STATUSES and user_status != 'approved':
+        return Response({
+            'success': False,
+            'message': f"status must be one of: approved, {', '.join(USER_STATUSES)}"
+        }, status=status.HTTP_400_BAD_REQUEST)
+
+    users = User.objects.all()
+
+    search = request.query_params.get('search')
+    role = request.query_params.get('role')
+    department = request.query_params.get('department')
+
+    if search:
+        users = users.filter(Q(email__icontains=search) | Q(full_name__icontains=search))
+
+    if role:
+        users = users.filter(role=role)
+
+    if department:
+        users = users.filter(department=department)
+
+    status_counts = users.aggregate(**{
+        name: Count('id', filter=condition) for name, condition in USER_STATUSES.items()
+    })
+    status_counts['approved'] = status_counts['active'] + status_counts['inactive']
+
+    if user_status == 'approved':
+        users = users.filter(is_approved=True)
+    else:
+        users = users.filter(USER_STATUSES[user_status])
+
+    total = status_counts[user_status]
+    page_users = users.order_by('-created_at')
+    if paginated:
+        offset = (page - 1) * page_size
+        page_users = page_users[offset:offset + page_size]
+
+    response_data = {
+        'success': True,
+        'count': total
+    }
+    if wants_columnar(request):
+        response_data['shape'] = COLUMNAR
+        _, response_data['data'] = build_columns(
+            page_users,
+            UserSerializer.sparse_field_names(*get_sparse_fieldset(request)),
+            dictionary=['role', 'department']
+        )
+    else:
+        response_data['data'] = serialize_users(page_users, request)
+
+    if paginated:
+        response_data['pagination'] = {
+            'page': page,
+            'page_size': page_size,
+            'total_pages': -(-total // page_size)
+        }
+    response_data['status_counts'] = status_counts
+    return Response(response_data)
 
 # ============= USER MANAGEMENT (GET ALL & CREATE) =============
 @api_view(['GET', 'POST'])
 @permission_classes([IsAuthenticated, IsAdmin])
+@idempotent
 def manage_users(request):
     """
-    GET: Get all approved users
+    GET: Get users (approved users unless `status` is given), paginated on request
     POST: Create new user
     """
     if request.method == 'GET':
-        users = User.objects.filter(is_approved=True).order_by('-created_at')
-        serializer = UserSerializer(users, many=True)
-        return Response({
-            'success': True,
-            'count': users.count(),
-            'data': serializer.data
-        })
+        return list_users(request, request.query_params.get('status', 'approved'))
     
     elif request.method == 'POST':
         serializer = RegisterSerializer(data=request.data)
@@ -129,8 +235,9 @@ def change_user_password(request, pk):
             'message': 'Password must be at least 8 characters'
         }, status=status.HTTP_400_BAD_REQUEST)
     
-    # Set new password
+    # Set new password and sign the user out everywhere
     user.set_password(new_password)
+    user.revoke_tokens()
     user.save()
     
     return Response({
@@ -142,15 +249,8 @@ def change_user_password(request, pk):
 @api_view(['GET'])
 @permission_classes([IsAuthenticated, IsAdmin])
 def get_pending_users(request):
-    """Get all pending users (waiting for approval)"""
-    pending_users = User.objects.filter(is_approved=False, is_active=True).order_by('-created_at')
-    serializer = UserSerializer(pending_users, many=True)
-    
-    return Response({
-        'success': True,
-        'count': pending_users.count(),
-        'data': serializer.data
-    })
+    """Get pending users (waiting for approval), paginated on request"""
+    return list_users(request, 'pending')
 
 # ============= APPROVE USER =============
 @api_view(['POST'])
@@ -175,6 +275,8 @@ def approve_user(request, pk):
     user.rejection_reason = None
     user.save()
     
+    publish_on_commit('registration.approved', {'id': user.id}, roles=('admin',))
+    
     return Response({
         'success': True,
         'message': 'User approved successfully',
@@ -205,17 +307,115 @@ def reject_user(request, pk):
     user.is_active = False  # Deactivate rejected users
     user.save()
     
+    publish_on_commit('registration.rejected', {'id': user.id}, roles=('admin',))
+    
     return Response({
         'success': True,
         'message': 'User rejected successfully'
     })
 
+# ============= BULK APPROVE / REJECT / DEACTIVATE =============
+MAX_BULK_USERS = 1000
+
+# action: (users it applies to, message for the others, result status, event)
+BULK_USER_ACTIONS = {
+    'approve': (Q(is_approved=False), 'User is already approved', 'approved', 'registration.approved'),
+    'reject': (Q(is_approved=False), 'Cannot reject an approved user', 'rejected', 'registration.rejected'),
+    'deactivate': (Q(is_active=True), 'User is already inactive', 'deactivated', None),
+}
+
+
+@api_view(['POST'])
+@permission_classes([IsAuthenticated, IsAdmin])
+def bulk_update_users(request, action):
+    """
+    Approve, reject or deactivate many users with one UPDATE.
+    Body: {"ids": [...], "reason": "..." (reject only)}
+    """
+    ids = request.data.get('ids')
+    if not isinstance(ids, list) or not ids:
+        return Response({
+            'success': False,
+            'message': 'ids must be a non-empty list'
+        }, status=status.HTTP_400_BAD_REQUEST)
+
+    try:
+        ids = list(dict.fromkeys(int(user_id) for user_id in ids))
+    except (TypeError, ValueError):
+        return Response({
+            'success': False,
+            'message': 'ids must be integers'
+        }, status=status.HTTP_400_BAD_REQUEST)
+
+    if len(ids) > MAX_BULK_USERS:
+        return Response({
+            'success': False,
+            'message': f'At most {MAX_BULK_USERS} users can be updated at once'
+        }, status=status.HTTP_400_BAD_REQUEST)
+
+    applicable, skip_message, done_status, event_type = BULK_USER_ACTIONS[action]
+    if action == 'approve':
+        changes = {'is_approved': True, 'rejection_reason': None}
+    elif action == 'reject':
+        changes = {'is_active': False, 'rejection_reason': request.data.get('reason', '')}
+    else:
+        changes = {'is_active': False}
+
+    results = {}
+    with transaction.atomic():
+        users = User.objects.filter(id__in=ids).select_for_update()
+        eligible = set(users.filter(applicable).values_list('id', flat=True))
+        existing = set(users.values_list('id', flat=True))
+
+        if action == 'deactivate' and request.user.id in eligible:
+            eligible.discard(request.user.id)
+            results[request.user.id] = {'status': 'skipped', 'message': 'Cannot deactivate your own account'}
+
+        if eligible:
+            User.objects.filter(applicable, id__in=eligible).update(updated_at=timezone.now(), **changes)
+
+    invalidate_cached_users(eligible)
+
+    for user_id in ids:
+        if user_id in results:
+            continue
+        if user_id in eligible:
+            results[user_id] = {'status': done_status}
+            if event_type:
+                publish_on_commit(event_type, {'id': user_id}, roles=('admin',))
+        elif user_id in existing:
+            results[user_id] = {'status': 'skipped', 'message': skip_message}
+        else:
+            results[user_id] = {'status': 'not_found', 'message': 'User not found'}
+
+    return Response({
+        'success': True,
+        'message': f'{len(eligible)} of {len(ids)} users {done_status}',
+        'count': len(eligible),
+        'data': [{'id': user_id, **results[user_id]} for user_id in ids]
+    })
+
 # ============= AUDIT LOGS =============
 @api_view(['GET'])
 @permission_classes([IsAuthenticated, IsAdmin])
 def get_audit_logs(request):
     """Get audit logs"""
     logs = AuditLog.objects.all().select_related('user')[:100]
+    
+    if wants_columnar(request):
+        count, data = build_columns(
+            logs,
+            AuditLogSerializer.Meta.fields,
+            sources={'user_email': 'user__email', 'user_name': 'user__full_name'},
+            dictionary=['user_email', 'user_name', 'action', 'table_name']
+        )
+        return Response({
+            'success': True,
+            'count': count,
+            'shape': COLUMNAR,
+            'data': data
+        })
+    
     serializer = AuditLogSerializer(logs, many=True)
     
     return Response({
@@ -225,45 +425,229 @@ def get_audit_logs(request):
     })
 
 # ============= DASHBOARD STATS =============
+def user_summary():
+    """Approved-user totals by role and the pending count, in one aggregate"""
+    approved = Q(is_approved=True)
+    return User.objects.order_by().aggregate(
+        total=Count('id', filter=approved),
+        active=Count('id', filter=approved & Q(is_active=True)),
+        admin=Count('id', filter=approved & Q(role='admin')),
+        department=Count('id', filter=approved & Q(role='department')),
+        viewer=Count('id', filter=approved & Q(role='viewer')),
+        pending=Count('id', filter=USER_STATUSES['pending']),
+    )
+
+
+def dashboard_stats(partnership_counts, by_department, user_counts):
+    return {
+        'partnerships': {
+            'total': partnership_counts['total'],
+            'active': partnership_counts['active'],
+            'for_renewal': partnership_counts['for_renewal'],
+            'terminated': partnership_counts['terminated'],
+            'expiring_soon': partnership_counts['expiring_soon']
+        },
+        'users': {
+            key: user_counts[key] for key in ('total', 'active', 'admin', 'department', 'viewer')
+        },
+        'by_department': by_department
+    }
+
+
+def partnership_summary(request):
+    """status_summary of live partnerships, plus the archive with ?include_archived=true"""
+    archived = ArchivedPartnership.objects.all() if include_archived(request) else None
+    return status_summary(Partnership.objects.all(), archived)
+
+
 @api_view(['GET'])
 @permission_classes([IsAuthenticated, IsAdmin])
 def get_dashboard_stats(request):
     """Get dashboard statistics"""
-    # Partnership stats
-    partnerships = Partnership.objects.all()
-    now = datetime.now()
-    expiring_soon = partnerships.filter(
-        expiration_date__lte=now + timedelta(days=30),
-        expiration_date__gte=now
-    ).count()
-    
-    partnership_stats = {
-        'total': partnerships.count(),
-        'active': partnerships.filter(status='active').count(),
-        'for_renewal': partnerships.filter(status='for_renewal').count(),
-        'terminated': partnerships.filter(status='terminated').count(),
-        'expiring_soon': expiring_soon
-    }
-    
-    # User stats (only approved users)
-    users = User.objects.filter(is_approved=True)
-    user_stats = {
-        'total': users.count(),
-        'active': users.filter(is_active=True).count(),
-        'admin': users.filter(role='admin').count(),
-        'department': users.filter(role='department').count(),
-        'viewer': users.filter(role='viewer').count()
-    }
-    
-    # Department breakdown
-    dept_counts = partnerships.values('department').annotate(count=Count('id'))
-    by_department = {item['department']: item['count'] for item in dept_counts}
+    partnership_counts, by_department = partnership_summary(request)
     
     return Response({
         'success': True,
-        'data': {
-            'partnerships': partnership_stats,
-            'users': user_stats,
-            'by_department': by_department
+        'data': dashboard_stats(partnership_counts, by_department, user_summary())
+    })
+
+# ============= DASHBOARD BOOTSTRAP =============
+BOOTSTRAP_SECTIONS = ['profile', 'dashboard_stats', 'statistics', 'pending_users', 'audit_logs']
+BOOTSTRAP_PENDING_LIMIT = 20
+BOOTSTRAP_AUDIT_LIMIT = 100
+
+
+def section_etag(data):
+    encoded = json.dumps(data, sort_keys=True, default=str, separators=(',', ':')).encode()
+    return hashlib.sha256(encoded).hexdigest()[:32]
+
+
+def section_etags(request, sections, user):
+    """
+    ETag per section from cheap version queries, so unchanged sections are
+    recognised before they are built. Every partnership write adds an
+    outbox event, user changes bump updated_at and audit logs only grow.
+    """
+    wanted = set(sections)
+    partnerships = users = None
+    if wanted & {'dashboard_stats', 'statistics'}:
+        partnerships = [
+            OutboxEvent.objects.aggregate(last=Max('id'))['last'],
+            include_archived(request),
+            # expiring_soon moves with the date
+            timezone.localdate(),
+        ]
+    if wanted & {'dashboard_stats', 'pending_users', 'audit_logs'}:
+        users = User.objects.aggregate(count=Count('id'), last=Max('id'), updated=Max('updated_at'))
+
+    versions = {
+        'profile': lambda: [user.pk, user.updated_at],
+        'dashboard_stats': lambda: [partnerships, users],
+        'statistics': lambda: partnerships,
+        'pending_users': lambda: [
+            users, request.query_params.get('fields'), request.query_params.get('exclude')
+        ],
+        # Rows show their user's name
+        'audit_logs': lambda: [AuditLog.objects.aggregate(last=Max('id'))['last'], users],
+    }
+    return {name: section_etag([name, versions[name]()]) for name in sections}
+
+
+def parse_known_etags(value):
+    """`section:etag,section:etag` -> {section: etag}"""
+    known = {}
+    for item in (value or '').split(','):
+        section, _, etag = item.strip().partition(':')
+        if section and etag:
+            known[section] = etag.strip('"')
+    return known
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated, IsAdmin])
+def get_dashboard_bootstrap(request):
+    """
+    Everything the admin dashboard needs for first paint in one request:
+    profile, dashboard stats, partnership statistics, pending users and
+    recent audit logs. Each section carries an ETag; sections listed in
+    `etags=section:etag,...` that are unchanged come back without data.
+    `sections=` limits which sections are built.
+    """
+    requested = request.query_params.get('sections')
+    sections = [name.strip() for name in requested.split(',')] if requested else BOOTSTRAP_SECTIONS
+    unknown = [name for name in sections if name not in BOOTSTRAP_SECTIONS]
+    if unknown:
+        return Response({
+            'success': False,
+            'message': f"Unknown sections: {', '.join(unknown)}"
+        }, status=status.HTTP_400_BAD_REQUEST)
+
+    # request.user only has the columns authentication needs
+    user = User.objects.get(pk=request.user.pk) if 'profile' in sections else None
+    etags = section_etags(request, sections, user)
+    etag = '"' + section_etag(etags) + '"'
+    if if_none_match(request, etag):
+        response = Response(status=status.HTTP_304_NOT_MODIFIED)
+        response['ETag'] = etag
+        return response
+
+    known = parse_known_etags(request.query_params.get('etags'))
+    stale = [name for name in sections if known.get(name) != etags[name]]
+    payload = {}
+
+    if 'profile' in stale:
+        payload['profile'] = UserSerializer(user).data
+
+    if 'dashboard_stats' in stale or 'statistics' in stale:
+        partnership_counts, by_department = partnership_summary(request)
+
+    user_counts = None
+    if 'dashboard_stats' in stale or 'pending_users' in stale:
+        user_counts = user_summary()
+
+    if 'dashboard_stats' in stale:
+        payload['dashboard_stats'] = dashboard_stats(partnership_counts, by_department, user_counts)
+
+    if 'statistics' in stale:
+        payload['statistics'] = {
+            key: partnership_counts[key]
+            for key in ('total', 'active', 'terminated', 'for_renewal', 'non_renewal')
         }
-    })
\ No newline at end of file
+        payload['statistics']['by_department'] = by_department
+
+    if 'pending_users' in stale:
+        pending = User.objects.filter(USER_STATUSES['pending']).order_by('-created_at')
+        payload['pending_users'] = {
+            'count': user_counts['pending'],
+            'data': serialize_users(pending[:BOOTSTRAP_PENDING_LIMIT], request)
+        }
+
+    if 'audit_logs' in stale:
+        logs = AuditLogSerializer(
+            AuditLog.objects.select_related('user')[:BOOTSTRAP_AUDIT_LIMIT], many=True
+        ).data
+        payload['audit_logs'] = {'count': len(logs), 'data': logs}
+
+    data = {}
+    for name in sections:
+        if name in payload:
+            data[name] = {'etag': etags[name], 'data': payload[name]}
+        else:
+            data[name] = {'etag': etags[name], 'not_modified': True}
+
+    response = Response({
+        'success': True,
+        'data': data
+    })
+    response['ETag'] = etag
+    return response
+
+# ============= SLOW QUERIES =============
+@api_view(['GET', 'DELETE'])
+@permission_classes([IsAuthenticated, IsAdmin])
+def manage_slow_queries(request):
+    """
+    GET: Slow queries recorded by this process, grouped by SQL fingerprint
+         (`order=total|max|avg|count`, `limit`), or the individual entries
+         for one group with `fingerprint=`
+    DELETE: Clear the buffer
+    """
+    if request.method == 'DELETE':
+        slow_queries.clear()
+        return Response({
+            'success': True,
+            'message': 'Slow query log cleared'
+        })
+
+    fingerprint = request.query_params.get('fingerprint')
+    if fingerprint:
+        data = [entry for entry in slow_queries.entries() if entry['fingerprint'] == fingerprint]
+        data.sort(key=lambda entry: entry['duration_ms'], reverse=True)
+        return Response({
+            'success': True,
+            'count': len(data),
+            'data': data
+        })
+
+    order = request.query_params.get('order', 'total')
+    if order not in ('total', 'max', 'avg', 'count'):
+        return Response({
+            'success': False,
+            'message': 'order must be one of: total, max, avg, count'
+        }, status=status.HTTP_400_BAD_REQUEST)
+
+    try:
+        limit = min(max(int(request.query_params.get('limit', 50)), 1), settings.SLOW_QUERY_BUFFER_SIZE)
+    except ValueError:
+        return Response({
+            'success': False,
+            'message': 'limit must be an integer'
+        }, status=status.HTTP_400_BAD_REQUEST)
+
+    groups = slow_queries.grouped(order)
+    return Response({
+        'success': True,
+        'count': len(groups),
+        'threshold_ms': settings.SLOW_QUERY_THRESHOLD_MS,
+        'data': groups[:limit]
+    })
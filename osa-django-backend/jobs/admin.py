@@ -0,0 +1,13 @@
+from django.contrib import admin
+from admin_panel.admin import EstimatedCountPaginator, ReadOnlyAdminMixin
+from .models import Job
+
+
+@admin.register(Job)
+class JobAdmin(ReadOnlyAdminMixin, admin.ModelAdmin):
+    list_display = ('id', 'task', 'status', 'progress', 'attempts', 'locked_by', 'run_at', 'finished_at')
+    list_filter = ('status',)
+    search_fields = ('task', 'locked_by')
+    raw_id_fields = ('created_by',)
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
@@ -0,0 +1,63 @@
+import os
+import socket
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+import django
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connections
+from jobs.queue import claim, run_job
+
+
+def _init_process():
+    # Spawned children start without Django configured; forked ones inherit
+    # it. Either way, never reuse the parent's database connections.
+    django.setup()
+    connections.close_all()
+
+
+class Command(BaseCommand):
+    help = 'Run background jobs from the osa_jobs queue'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--concurrency', type=int, default=settings.JOB_WORKER_CONCURRENCY)
+        parser.add_argument('--pool', choices=['thread', 'process'], default=settings.JOB_WORKER_POOL)
+        parser.add_argument('--poll-interval', type=float, default=settings.JOB_POLL_INTERVAL_SECONDS)
+        parser.add_argument('--once', action='store_true', help='Exit once the queue is empty')
+
+    def handle(self, *args, **options):
+        concurrency = options['concurrency']
+        worker_id = f'{socket.gethostname()}:{os.getpid()}'
+
+        if options['pool'] == 'process':
+            connections.close_all()
+            executor = ProcessPoolExecutor(max_workers=concurrency, initializer=_init_process)
+        else:
+            executor = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix='osa-job')
+
+        self.stdout.write(f'Worker {worker_id} started ({options["pool"]} pool, concurrency {concurrency})')
+
+        running = set()
+        try:
+            while True:
+                while len(running) < concurrency:
+                    job = claim(worker_id)
+                    if job is None:
+                        break
+                    self.stdout.write(f'Running {job}')
+                    running.add(executor.submit(run_job, job.pk, job.attempts))
+
+                if not running:
+                    if options['once']:
+                        break
+                    time.sleep(options['poll_interval'])
+                    continue
+
+                done, running = wait(running, timeout=options['poll_interval'], return_when=FIRST_COMPLETED)
+                for future in done:
+                    if future.exception():
+                        self.stderr.write(f'Worker error: {future.exception()}')
+        except KeyboardInterrupt:
+            self.stdout.write('Shutting down, waiting for running jobs...')
+        finally:
+            executor.shutdown(wait=True)
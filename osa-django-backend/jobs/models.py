@@ -0,0 +1,65 @@
+from django.db import models
+from django.conf import settings
+from django.utils import timezone
+
+class Job(models.Model):
+    STATUS_CHOICES = [
+        ('queued', 'Queued'),
+        ('running', 'Running'),
+        ('succeeded', 'Succeeded'),
+        ('failed', 'Failed'),
+    ]
+
+    task = models.CharField(max_length=100)
+    payload = models.JSONField(default=dict, blank=True)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='queued')
+    progress = models.PositiveSmallIntegerField(default=0)
+    result = models.JSONField(null=True, blank=True)
+    error = models.TextField(null=True, blank=True)
+
+    attempts = models.PositiveIntegerField(default=0)
+    max_attempts = models.PositiveIntegerField(default=3)
+    run_at = models.DateTimeField(default=timezone.now)
+    locked_by = models.CharField(max_length=100, null=True, blank=True)
+    locked_at = models.DateTimeField(null=True, blank=True)
+
+    created_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='jobs'
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        db_table = 'osa_jobs'
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['status', 'run_at']),
+        ]
+
+    def __str__(self):
+        return f"{self.task} #{self.id} ({self.status})"
+
+    def claimed(self):
+        """
+        This run's claim on the row. Every claim bumps `attempts`, so a job
+        reclaimed by another worker no longer matches.
+        """
+        return Job.objects.filter(pk=self.pk, status='running', locked_by=self.locked_by, attempts=self.attempts)
+
+    def heartbeat(self, **values):
+        """
+        Refresh the lock so the job isn't reclaimed as abandoned, saving
+        `values` with it. Returns False once the claim has been lost.
+        """
+        now = timezone.now()
+        return bool(self.claimed().update(locked_at=now, updated_at=now, **values))
+
+    def set_progress(self, progress):
+        """Record progress (0-100) without touching the rest of the row"""
+        self.progress = max(0, min(100, int(progress)))
+        self.heartbeat(progress=self.progress)
@@ -0,0 +1,170 @@
+"""
+Database-backed job queue.
+
+Tasks are plain functions registered with `@task('name')` in an app's
+`tasks.py`; they receive the Job and return a JSON-serializable result.
+Jobs are claimed with `SELECT ... FOR UPDATE SKIP LOCKED` where the
+database supports it (Postgres) and with a conditional UPDATE elsewhere
+(SQLite), so any number of workers can share the table.
+
+A running job's lock is refreshed every JOB_HEARTBEAT_SECONDS and by each
+progress update. A job whose lock is older than JOB_LOCK_TIMEOUT_SECONDS
+is taken to have lost its worker and is claimed again. The outcome is only
+written while the run still holds its claim.
+"""
+import logging
+import threading
+import traceback
+from datetime import timedelta
+from django.conf import settings
+from django.db import DatabaseError, connection, connections, transaction
+from django.db.models import F, Q
+from django.utils import timezone
+from django.utils.module_loading import autodiscover_modules
+from .models import Job
+
+logger = logging.getLogger(__name__)
+
+_registry = {}
+
+
+def task(name):
+    """Register a function as a job task under `name`"""
+    def decorator(func):
+        _registry[name] = func
+        return func
+    return decorator
+
+
+def get_task(name):
+    if name not in _registry:
+        autodiscover_modules('tasks')
+    return _registry.get(name)
+
+
+def enqueue(task_name, payload=None, user=None, run_at=None, max_attempts=None):
+    """Queue a job and return it"""
+    return Job.objects.create(
+        task=task_name,
+        payload=payload or {},
+        created_by=user,
+        run_at=run_at or timezone.now(),
+        max_attempts=max_attempts or settings.JOB_MAX_ATTEMPTS,
+    )
+
+
+def _ready(now):
+    """Queued jobs that are due, plus running jobs whose worker went away"""
+    stale = now - timedelta(seconds=settings.JOB_LOCK_TIMEOUT_SECONDS)
+    return Q(status='queued', run_at__lte=now) | Q(status='running', locked_at__lt=stale)
+
+
+def claim(worker_id):
+    """Atomically take the next due job for `worker_id`, or return None"""
+    now = timezone.now()
+    candidates = Job.objects.filter(_ready(now)).order_by('run_at', 'id')
+    claim_values = {
+        'status': 'running',
+        'locked_by': worker_id,
+        'locked_at': now,
+        'attempts': F('attempts') + 1,
+        'updated_at': now,
+    }
+
+    if connection.features.has_select_for_update_skip_locked:
+        with transaction.atomic():
+            job = candidates.select_for_update(skip_locked=True).first()
+            if job is None:
+                return None
+            Job.objects.filter(pk=job.pk).update(**claim_values)
+        job.refresh_from_db()
+        return job
+
+    # No row locks: race on a conditional UPDATE, the loser moves on to the
+    # next candidate.
+    for pk in candidates.values_list('pk', flat=True)[:10]:
+        if Job.objects.filter(_ready(now), pk=pk).update(**claim_values):
+            return Job.objects.get(pk=pk)
+    return None
+
+
+def retry_delay(attempts):
+    """Exponential backoff: base, 2x base, 4x base, ... capped"""
+    delay = settings.JOB_RETRY_BASE_SECONDS * (2 ** max(attempts - 1, 0))
+    return timedelta(seconds=min(delay, settings.JOB_RETRY_MAX_SECONDS))
+
+
+def _keep_alive(job, stop):
+    """Heartbeat the job's lock until `stop` is set or the claim is lost"""
+    try:
+        while not stop.wait(settings.JOB_HEARTBEAT_SECONDS):
+            try:
+                if not job.heartbeat():
+                    break
+            except DatabaseError:
+                logger.warning('Job %s heartbeat failed', job.id, exc_info=True)
+    finally:
+        connections.close_all()
+
+
+def run_job(job_id, attempt=None):
+    """
+    Execute a claimed job and record the outcome. `attempt` is the claim's
+    attempt number, so a job claimed again before it started isn't run
+    twice. Runs inside a worker thread or process, which uses its own
+    database connection.
+    """
+    stop = threading.Event()
+    try:
+        job = Job.objects.get(pk=job_id)
+        if attempt is not None and job.attempts != attempt:
+            logger.warning('Job %s was claimed again before attempt %s started', job.id, attempt)
+            return
+        func = get_task(job.task)
+        threading.Thread(target=_keep_alive, args=(job, stop), daemon=True).start()
+
+        try:
+            if func is None:
+                raise LookupError(f'Unknown task {job.task!r}')
+            result = func(job)
+        except Exception:
+            error = traceback.format_exc()
+            logger.warning('Job %s (%s) failed on attempt %s', job.id, job.task, job.attempts)
+            now = timezone.now()
+            if func is not None and job.attempts < job.max_attempts:
+                updated = job.claimed().update(
+                    status='queued',
+                    error=error,
+                    run_at=now + retry_delay(job.attempts),
+                    locked_by=None,
+                    locked_at=None,
+                    updated_at=now,
+                )
+            else:
+                updated = job.claimed().update(
+                    status='failed',
+                    error=error,
+                    locked_by=None,
+                    locked_at=None,
+                    updated_at=now,
+                    finished_at=now,
+                )
+        else:
+            now = timezone.now()
+            updated = job.claimed().update(
+                status='succeeded',
+                progress=100,
+                result=result,
+                error=None,
+                locked_by=None,
+                locked_at=None,
+                updated_at=now,
+                finished_at=now,
+            )
+
+        if not updated:
+            logger.warning('Job %s (%s) lost its lock; outcome of attempt %s discarded', job.id, job.task, job.attempts)
+    finally:
+        stop.set()
+        # Connections are per thread; don't leave one open per pool thread
+        connections.close_all()
@@ -0,0 +1,11 @@
+from rest_framework import serializers
+from .models import Job
+
+class JobSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Job
+        fields = [
+            'id', 'task', 'status', 'progress', 'result', 'error',
+            'attempts', 'max_attempts', 'run_at', 'created_at', 'updated_at', 'finished_at'
+        ]
+        read_only_fields = fields
@@ -0,0 +1,71 @@
+from datetime import timedelta
+from django.conf import settings
+from django.test import TransactionTestCase
+from django.utils import timezone
+from .models import Job
+from .queue import claim, enqueue, run_job, task
+
+calls = []
+
+
+@task('tests.record')
+def record(job):
+    calls.append(job.attempts)
+    return {'attempt': job.attempts}
+
+
+@task('tests.reclaimed_midway')
+def reclaimed_midway(job):
+    # The worker stalls long enough for its lock to look abandoned
+    abandon(job)
+    claim('worker-2')
+    return {'attempt': job.attempts}
+
+
+def abandon(job):
+    stale = timezone.now() - timedelta(seconds=settings.JOB_LOCK_TIMEOUT_SECONDS + 1)
+    Job.objects.filter(pk=job.pk).update(locked_at=stale)
+
+
+# run_job closes the thread's connections when it finishes, which a
+# transaction-wrapped TestCase doesn't allow
+class ReclaimTests(TransactionTestCase):
+    def setUp(self):
+        calls.clear()
+
+    def test_abandoned_job_is_claimed_again_with_a_new_attempt(self):
+        enqueue('tests.record')
+        job = claim('worker-1')
+        self.assertIsNone(claim('worker-2'))
+
+        abandon(job)
+        reclaimed = claim('worker-2')
+
+        self.assertEqual((reclaimed.pk, reclaimed.locked_by, reclaimed.attempts), (job.pk, 'worker-2', 2))
+        self.assertFalse(job.heartbeat())
+        self.assertTrue(reclaimed.heartbeat())
+
+    def test_stale_claim_is_not_run(self):
+        enqueue('tests.record')
+        job = claim('worker-1')
+        abandon(job)
+        reclaimed = claim('worker-2')
+
+        with self.assertLogs('jobs.queue', 'WARNING'):
+            run_job(job.pk, job.attempts)
+        run_job(reclaimed.pk, reclaimed.attempts)
+
+        self.assertEqual(calls, [2])
+        reclaimed.refresh_from_db()
+        self.assertEqual((reclaimed.status, reclaimed.result), ('succeeded', {'attempt': 2}))
+
+    def test_outcome_of_a_lost_claim_is_discarded(self):
+        enqueue('tests.reclaimed_midway')
+        job = claim('worker-1')
+
+        with self.assertLogs('jobs.queue', 'WARNING') as logs:
+            run_job(job.pk, job.attempts)
+
+        self.assertIn('lost its lock', logs.output[0])
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.locked_by, job.attempts, job.result), ('running', 'worker-2', 2, None))
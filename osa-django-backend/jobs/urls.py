@@ -0,0 +1,9 @@
+from django.urls import path
+from . import views
+
+app_name = 'jobs'
+
+urlpatterns = [
+    path('', views.get_jobs, name='jobs'),
+    path('<int:pk>/', views.get_job, name='job-detail'),
+]
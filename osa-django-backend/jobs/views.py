@@ -0,0 +1,50 @@
+from rest_framework import status
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.response import Response
+from rest_framework.permissions import IsAuthenticated
+from .models import Job
+from .serializers import JobSerializer
+
+
+def visible_jobs(user):
+    """Admins see every job, everyone else only the jobs they started"""
+    jobs = Job.objects.all()
+    if user.role != 'admin':
+        jobs = jobs.filter(created_by=user)
+    return jobs
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def get_jobs(request):
+    """Get recent jobs"""
+    jobs = visible_jobs(request.user)
+
+    status_filter = request.query_params.get('status')
+    if status_filter:
+        jobs = jobs.filter(status=status_filter)
+
+    serializer = JobSerializer(jobs[:100], many=True)
+    return Response({
+        'success': True,
+        'count': len(serializer.data),
+        'data': serializer.data
+    })
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def get_job(request, pk):
+    """Get job status and progress"""
+    try:
+        job = visible_jobs(request.user).get(pk=pk)
+    except Job.DoesNotExist:
+        return Response({
+            'success': False,
+            'message': 'Job not found'
+        }, status=status.HTTP_404_NOT_FOUND)
+
+    return Response({
+        'success': True,
+        'data': JobSerializer(job).data
+    })
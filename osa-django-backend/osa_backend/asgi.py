@@ -2,6 +2,9 @@
 ASGI config for osa_backend project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
+Serve through this (e.g. ``uvicorn osa_backend.asgi:application``) for the
+Server-Sent Events stream at /api/events/stream, which keeps idle
+connections open on the event loop instead of holding a worker thread.
 
 For more information on this file, see
 https://docs.djangoproject.com/en/4.2/howto/deployment/asgi/
@@ -0,0 +1,261 @@
+"""
+Response compression.
+
+CompressionMiddleware picks the best encoding the client accepts, with
+preference order zstd, br, then gzip. zstd and br need the optional
+`zstandard` and `brotli` packages. Small bodies and bodies that are not
+text-like are sent unchanged. Streaming responses, sync or async, are
+compressed chunk by chunk and flushed after every chunk, so server-sent
+events still arrive as they happen. Responses marked `Cache-Control:
+no-store` are never compressed: views that hand out tokens or tickets mark
+theirs that way (`@never_cache`), which keeps their secrets out of reach of
+compression side channels such as BREACH.
+
+`@cache_compressed` caches a public GET view's rendered bytes together with
+each compressed variant built so far, so a cache hit is sent as stored
+without being rendered or compressed again.
+"""
+import gzip
+import hashlib
+import re
+import zlib
+from functools import wraps
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.utils.cache import patch_vary_headers
+from django.utils.deprecation import MiddlewareMixin
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - optional dependency
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - optional dependency
+    zstandard = None
+
+COMPRESSIBLE_TYPES = (
+    'text/',
+    'application/json',
+    'application/javascript',
+    'application/xml',
+    'application/msgpack',
+)
+
+# Levels for per-request compression, and higher ones for bodies that are
+# compressed once and then served from the cache many times
+LEVELS = {'zstd': 3, 'br': 4, 'gzip': 6}
+CACHED_LEVELS = {'zstd': 12, 'br': 9, 'gzip': 9}
+
+
+class _GzipStream:
+    def __init__(self, level):
+        self._compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+
+    def compress(self, data):
+        return self._compressor.compress(data) + self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self):
+        return self._compressor.flush()
+
+
+class _BrotliStream:
+    def __init__(self, level):
+        self._compressor = brotli.Compressor(quality=level)
+
+    def compress(self, data):
+        return self._compressor.process(data) + self._compressor.flush()
+
+    def finish(self):
+        return self._compressor.finish()
+
+
+class _ZstdStream:
+    def __init__(self, level):
+        self._compressor = zstandard.ZstdCompressor(level=level).compressobj()
+
+    def compress(self, data):
+        return self._compressor.compress(data) + self._compressor.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK)
+
+    def finish(self):
+        return self._compressor.flush()
+
+
+# encoding -> (one-shot compress(data, level), streaming compressor class)
+CODECS = {'gzip': (lambda data, level: gzip.compress(data, level, mtime=0), _GzipStream)}
+if brotli is not None:
+    CODECS['br'] = (lambda data, level: brotli.compress(data, quality=level), _BrotliStream)
+if zstandard is not None:
+    CODECS['zstd'] = (lambda data, level: zstandard.ZstdCompressor(level=level).compress(data), _ZstdStream)
+
+PREFERENCE = [encoding for encoding in ('zstd', 'br', 'gzip') if encoding in CODECS]
+
+
+def negotiate(request):
+    """The encoding to use for this request's Accept-Encoding, or None"""
+    header = request.META.get('HTTP_ACCEPT_ENCODING', '')
+    if not header:
+        return None
+
+    accepted = {}
+    for item in header.split(','):
+        name, _, params = item.strip().partition(';')
+        match = re.search(r'q\s*=\s*([0-9.]+)', params)
+        try:
+            accepted[name.strip().lower()] = float(match.group(1)) if match else 1.0
+        except ValueError:
+            continue
+
+    best = None
+    best_q = 0
+    for encoding in PREFERENCE:
+        q = accepted.get(encoding, accepted.get('*', 0))
+        if q > best_q:
+            best, best_q = encoding, q
+    return best
+
+
+def compress(data, encoding, level=None):
+    one_shot, _ = CODECS[encoding]
+    return one_shot(data, LEVELS[encoding] if level is None else level)
+
+
+def compressible(response):
+    content_type = response.get('Content-Type', '').lower()
+    cache_control = response.get('Cache-Control', '')
+    return (
+        not response.has_header('Content-Encoding')
+        and 'no-transform' not in cache_control
+        and 'no-store' not in cache_control
+        and content_type.startswith(COMPRESSIBLE_TYPES)
+    )
+
+
+class CompressionMiddleware(MiddlewareMixin):
+    """Compress responses with the best encoding the client accepts"""
+
+    def process_response(self, request, response):
+        if not compressible(response):
+            return response
+        if not response.streaming and len(response.content) < settings.COMPRESSION_MIN_SIZE:
+            return response
+
+        patch_vary_headers(response, ('Accept-Encoding',))
+        encoding = negotiate(request)
+        if encoding is None:
+            return response
+
+        if response.streaming:
+            stream_class = CODECS[encoding][1]
+            if response.is_async:
+                response.streaming_content = self._compress_async(response.streaming_content, stream_class(LEVELS[encoding]))
+            else:
+                response.streaming_content = self._compress_sync(response.streaming_content, stream_class(LEVELS[encoding]))
+            del response.headers['Content-Length']
+        else:
+            compressed = compress(response.content, encoding)
+            if len(compressed) >= len(response.content):
+                return response
+            response.content = compressed
+            response.headers['Content-Length'] = str(len(compressed))
+
+        set_encoding_headers(response, encoding)
+        return response
+
+    @staticmethod
+    def _compress_sync(chunks, stream):
+        for chunk in chunks:
+            data = stream.compress(chunk)
+            if data:
+                yield data
+        yield stream.finish()
+
+    @staticmethod
+    async def _compress_async(chunks, stream):
+        async for chunk in chunks:
+            data = stream.compress(chunk)
+            if data:
+                yield data
+        yield stream.finish()
+
+
+def set_encoding_headers(response, encoding):
+    # The compressed body differs byte for byte, so a strong ETag becomes weak
+    etag = response.get('ETag')
+    if etag and etag.startswith('"'):
+        response.headers['ETag'] = 'W/' + etag
+    response.headers['Content-Encoding'] = encoding
+    patch_vary_headers(response, ('Accept-Encoding',))
+
+
+def _generation_key(namespace):
+    return f'response_cache:{namespace}:generation'
+
+
+def invalidate_cached_responses(namespace):
+    """Drop every response cached under `namespace`"""
+    try:
+        cache.incr(_generation_key(namespace))
+    except ValueError:
+        pass  # Nothing cached yet
+
+
+def cache_compressed(namespace, timeout):
+    """
+    Cache a GET function view's rendered 200 responses for `timeout`
+    seconds, keyed by absolute URL (bodies hold absolute image URLs, so
+    scheme and host matter) and negotiated renderer, along
+    with each compressed variant of the body. Goes below @api_view and the
+    throttles, so those still run on cache hits. The browsable API is never
+    cached.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            renderer = getattr(request, 'accepted_renderer', None)
+            if request.method != 'GET' or renderer is None or renderer.format == 'api':
+                return view(request, *args, **kwargs)
+
+            generation = cache.get_or_set(_generation_key(namespace), 1, timeout=None)
+            raw = f'{request.build_absolute_uri()}|{request.accepted_media_type}'
+            key = f'response_cache:{namespace}:{generation}:{hashlib.sha256(raw.encode()).hexdigest()}'
+
+            entry = cache.get(key)
+            changed = False
+            if entry is None:
+                response = view(request, *args, **kwargs)
+                if response.status_code != 200 or not hasattr(response, 'data'):
+                    return response
+                content_type = request.accepted_media_type
+                if renderer.charset:
+                    content_type = f'{content_type}; charset={renderer.charset}'
+                entry = {
+                    'content': renderer.render(response.data, request.accepted_media_type, {'request': request}),
+                    'content_type': content_type,
+                    'variants': {},
+                }
+                changed = True
+
+            encoding = negotiate(request)
+            content = entry['content']
+            if encoding and len(content) >= settings.COMPRESSION_MIN_SIZE:
+                if encoding not in entry['variants']:
+                    entry['variants'][encoding] = compress(content, encoding, CACHED_LEVELS[encoding])
+                    changed = True
+                content = entry['variants'][encoding]
+            else:
+                encoding = None
+
+            if changed:
+                cache.set(key, entry, timeout)
+
+            response = HttpResponse(content, content_type=entry['content_type'])
+            if encoding:
+                set_encoding_headers(response, encoding)
+            elif len(entry['content']) >= settings.COMPRESSION_MIN_SIZE:
+                patch_vary_headers(response, ('Accept-Encoding',))
+            return response
+        return wrapper
+    return decorator
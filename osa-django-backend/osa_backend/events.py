@@ -0,0 +1,296 @@
+"""
+Server-Sent Events push channel.
+
+Change events reach every SSE subscriber, so dashboards can stop polling.
+Publishing appends the event to a short log in the default cache. Each
+process with open streams runs one relay thread that reads the new entries
+and hands them to its own subscribers. The cache must therefore be shared
+(redis, memcached, database) once more than one worker runs; with the
+default per-process local-memory cache only streams on the publishing
+worker see an event.
+
+The stream view is async and must be served through `osa_backend.asgi`
+(uvicorn, daphne, ...); under WSGI an endless stream would tie up a worker.
+
+EventSource can't send an Authorization header, and a JWT in the query
+string would end up in access logs and browser history. Clients therefore
+POST to the ticket endpoint with their token and open the stream with the
+returned `?ticket=`, which opens one stream and expires after
+EVENT_STREAM_TICKET_SECONDS; reconnecting takes a new ticket. Open streams
+re-check the token and the user every EVENT_STREAM_RECHECK_SECONDS, pick
+up a changed role or department, and close once the token is revoked or
+expired or the user is deactivated.
+"""
+import asyncio
+import json
+import logging
+import secrets
+import threading
+import time
+import jwt
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core import signing
+from django.core.cache import cache
+from django.db import transaction
+from django.http import JsonResponse, StreamingHttpResponse
+from django.views.decorators.cache import never_cache
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from accounts.authentication import JWTAuthentication
+
+logger = logging.getLogger(__name__)
+
+HEARTBEAT_SECONDS = 15
+SUBSCRIBER_QUEUE_SIZE = 100
+
+# Shared event log: entries live long enough for every relay to read them
+EVENT_LOG_SECONDS = 60
+RELAY_INTERVAL_SECONDS = 0.5
+RELAY_BATCH_SIZE = 500
+# An id handed out but not stored yet is waited for this long, then skipped
+MISSING_EVENT_GRACE_SECONDS = 2
+LAST_EVENT_ID_KEY = 'events:last_id'
+STREAM_TICKET_SALT = 'osa_backend.events.stream_ticket'
+# Token claims a ticket carries, so open streams can be re-checked
+TICKET_CLAIMS = ('userId', 'jti', 'iat', 'exp')
+
+
+def event_key(event_id):
+    return f'events:{event_id}'
+
+
+class Subscriber:
+    def __init__(self, user, loop):
+        self.update(user)
+        self.loop = loop
+        self.queue = asyncio.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+
+    def update(self, user):
+        """Follow a change of role or department; read by the relay thread"""
+        self.audience = (user.role, user.department)
+
+    def accepts(self, event):
+        role, department = self.audience
+        if role not in event['roles']:
+            return False
+        if role == 'department' and event['department'] is not None:
+            return event['department'] == department
+        return True
+
+    def put(self, event):
+        """Runs on the subscriber's event loop"""
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            # The client is too slow to keep up; drop the backlog and tell
+            # it to refetch instead of growing without bound.
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait({'id': event['id'], 'type': 'resync', 'data': {}})
+
+
+class EventBroker:
+    """
+    Publishes to the shared event log and relays new entries to this
+    process's subscribers, on their event loops
+    """
+
+    def __init__(self):
+        self._subscribers = set()
+        self._lock = threading.Lock()
+        self._poll_lock = threading.Lock()
+        self._relay = None
+        self._last_id = 0
+        self._missing_since = {}
+
+    def subscribe(self, user):
+        subscriber = Subscriber(user, asyncio.get_running_loop())
+        with self._lock:
+            self._subscribers.add(subscriber)
+            if self._relay is None:
+                # Only events published from now on
+                self._last_id = cache.get(LAST_EVENT_ID_KEY, 0)
+                self._missing_since.clear()
+                self._relay = threading.Thread(target=self._run_relay, daemon=True)
+                self._relay.start()
+        return subscriber
+
+    def unsubscribe(self, subscriber):
+        with self._lock:
+            self._subscribers.discard(subscriber)
+
+    def publish(self, event_type, data, roles=('admin', 'department', 'viewer'), department=None):
+        """
+        Append an event for subscribers with one of `roles` to the log.
+        Department users only receive events for their own department.
+        """
+        try:
+            event_id = cache.incr(LAST_EVENT_ID_KEY)
+        except ValueError:
+            cache.add(LAST_EVENT_ID_KEY, 0, timeout=None)
+            event_id = cache.incr(LAST_EVENT_ID_KEY)
+        cache.set(event_key(event_id), {
+            'id': event_id,
+            'type': event_type,
+            'data': data,
+            'roles': roles,
+            'department': department,
+        }, timeout=EVENT_LOG_SECONDS)
+
+    def poll(self):
+        """Relay the events published since the last poll, in id order"""
+        with self._poll_lock:
+            self._poll()
+
+    def _poll(self):
+        last_id = cache.get(LAST_EVENT_ID_KEY, 0)
+        if last_id < self._last_id:
+            # The counter was evicted and started over
+            self._last_id = 0
+        ids = range(self._last_id + 1, min(last_id, self._last_id + RELAY_BATCH_SIZE) + 1)
+        if not ids:
+            return
+
+        stored = cache.get_many([event_key(event_id) for event_id in ids])
+        now = time.monotonic()
+        for event_id in ids:
+            event = stored.get(event_key(event_id))
+            if event is None:
+                # Numbered but not stored yet, or already expired
+                if now - self._missing_since.setdefault(event_id, now) < MISSING_EVENT_GRACE_SECONDS:
+                    break
+            else:
+                self._deliver(event)
+            self._missing_since.pop(event_id, None)
+            self._last_id = event_id
+
+    def _deliver(self, event):
+        with self._lock:
+            subscribers = list(self._subscribers)
+
+        for subscriber in subscribers:
+            if subscriber.accepts(event):
+                try:
+                    subscriber.loop.call_soon_threadsafe(subscriber.put, event)
+                except RuntimeError:
+                    # Loop already closed, the stream is going away
+                    self.unsubscribe(subscriber)
+
+    def _run_relay(self):
+        """Poll the log until this process has no subscribers left"""
+        while True:
+            time.sleep(RELAY_INTERVAL_SECONDS)
+            with self._lock:
+                if not self._subscribers:
+                    self._relay = None
+                    return
+            try:
+                self.poll()
+            except Exception:
+                logger.warning('Could not read the shared event log', exc_info=True)
+
+
+broker = EventBroker()
+
+
+def publish_on_commit(event_type, data, **kwargs):
+    """Publish once the surrounding transaction (if any) has committed"""
+    transaction.on_commit(lambda: broker.publish(event_type, data, **kwargs))
+
+
+def format_event(event):
+    return f"id: {event['id']}\nevent: {event['type']}\ndata: {json.dumps(event['data'])}\n\n"
+
+
+@never_cache
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def stream_ticket(request):
+    """Short-lived ticket for opening the event stream without a JWT in the URL"""
+    payload = JWTAuthentication.decode_token(request.auth)
+    claims = {claim: payload.get(claim) for claim in TICKET_CLAIMS}
+    claims['nonce'] = secrets.token_urlsafe(16)
+    ticket = signing.dumps(claims, salt=STREAM_TICKET_SALT)
+    return Response({
+        'success': True,
+        'data': {
+            'ticket': ticket,
+            'expires_in': settings.EVENT_STREAM_TICKET_SECONDS
+        }
+    })
+
+
+def stream_claims(request):
+    """
+    Token claims from `?ticket=` or a Bearer header; raises
+    AuthenticationFailed. A ticket is spent the first time it is used.
+    """
+    ticket = request.GET.get('ticket')
+    if ticket:
+        try:
+            claims = signing.loads(ticket, salt=STREAM_TICKET_SALT, max_age=settings.EVENT_STREAM_TICKET_SECONDS)
+        except signing.BadSignature:
+            raise AuthenticationFailed('Invalid or expired stream ticket')
+        nonce = claims.pop('nonce', None)
+        if not nonce or not cache.add(f'events:ticket:{nonce}', True, timeout=settings.EVENT_STREAM_TICKET_SECONDS):
+            raise AuthenticationFailed('Stream ticket has already been used')
+        return claims
+
+    auth_header = request.headers.get('Authorization', '')
+    if auth_header.lower().startswith('bearer '):
+        try:
+            return JWTAuthentication.decode_token(auth_header.split(' ', 1)[1])
+        except jwt.InvalidTokenError:
+            raise AuthenticationFailed('Invalid or expired token')
+
+    raise AuthenticationFailed('Authentication credentials were not provided.')
+
+
+def check_stream_claims(claims):
+    """The stream's user, as long as its token is unexpired and not revoked"""
+    if not claims.get('exp') or claims['exp'] <= time.time():
+        raise AuthenticationFailed('Token has expired')
+    return JWTAuthentication().authenticate_payload(claims)
+
+
+async def event_stream(request):
+    """SSE stream of partnership and registration events for the current user"""
+    try:
+        claims = await sync_to_async(stream_claims)(request)
+        user = await sync_to_async(check_stream_claims)(claims)
+    except AuthenticationFailed as exc:
+        return JsonResponse({'success': False, 'message': str(exc.detail)}, status=401)
+
+    async def stream():
+        subscriber = broker.subscribe(user)
+        checked_at = time.monotonic()
+        try:
+            yield 'retry: 5000\n\n'
+            while True:
+                if time.monotonic() - checked_at >= settings.EVENT_STREAM_RECHECK_SECONDS:
+                    try:
+                        subscriber.update(await sync_to_async(check_stream_claims)(claims))
+                    except AuthenticationFailed as exc:
+                        # Tell EventSource not to reconnect with the same ticket
+                        yield format_event({'id': 0, 'type': 'unauthorized', 'data': {'message': str(exc.detail)}})
+                        return
+                    checked_at = time.monotonic()
+                try:
+                    event = await asyncio.wait_for(
+                        subscriber.queue.get(),
+                        timeout=min(HEARTBEAT_SECONDS, settings.EVENT_STREAM_RECHECK_SECONDS)
+                    )
+                except asyncio.TimeoutError:
+                    yield ': keep-alive\n\n'
+                    continue
+                yield format_event(event)
+        finally:
+            broker.unsubscribe(subscriber)
+
+    response = StreamingHttpResponse(stream(), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
@@ -0,0 +1,118 @@
+"""
+Idempotency-Key support for create endpoints.
+
+The first POST with a given key runs the view and, if it succeeds, the
+response is kept in the cache for IDEMPOTENCY_TTL_SECONDS. Retries with
+the same key get the stored response back without the view running again.
+A duplicate that arrives while the first request is still in flight waits
+for it (up to IDEMPOTENCY_WAIT_SECONDS) rather than running in parallel.
+Keys are scoped per user and path. Reusing a key with a different payload
+is rejected with 422.
+
+The lock and the stored responses live in the default cache, so a shared
+cache (redis, memcached, database) is required once more than one worker
+runs: with the per-process default, a retry that lands on another worker
+runs the view again.
+"""
+import hashlib
+import json
+import secrets
+import time
+from functools import wraps
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework import status
+from rest_framework.response import Response
+
+HEADER = 'Idempotency-Key'
+MAX_KEY_LENGTH = 255
+POLL_INTERVAL = 0.1
+
+
+def request_fingerprint(request):
+    """Hash of the submitted data; uploaded files count by name and size"""
+    data = request.data
+    items = data.lists() if hasattr(data, 'lists') else data.items()
+    normalized = {}
+    for name, value in items:
+        values = value if isinstance(value, list) else [value]
+        normalized[name] = [
+            {'file': item.name, 'size': item.size} if hasattr(item, 'size') and hasattr(item, 'name') else item
+            for item in values
+        ]
+    encoded = json.dumps(normalized, sort_keys=True, default=str).encode()
+    return hashlib.sha256(encoded).hexdigest()
+
+
+def _replay(stored, fingerprint):
+    if stored['fingerprint'] != fingerprint:
+        return Response({
+            'success': False,
+            'message': f'{HEADER} was already used with a different request'
+        }, status=status.HTTP_422_UNPROCESSABLE_ENTITY)
+
+    response = Response(stored['data'], status=stored['status'])
+    response['Idempotent-Replayed'] = 'true'
+    return response
+
+
+def idempotent(view):
+    """
+    Make POSTs to a function view safe to retry with an Idempotency-Key
+    header. Goes below @api_view so the request is already authenticated.
+    """
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        key = request.headers.get(HEADER)
+        if request.method != 'POST' or not key:
+            return view(request, *args, **kwargs)
+
+        if len(key) > MAX_KEY_LENGTH:
+            return Response({
+                'success': False,
+                'message': f'{HEADER} must be at most {MAX_KEY_LENGTH} characters'
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+        user = request.user.pk if request.user.is_authenticated else 'anon'
+        scope = hashlib.sha256(f'{user}:{request.path}:{key}'.encode()).hexdigest()
+        result_key = f'idempotency:result:{scope}'
+        lock_key = f'idempotency:lock:{scope}'
+        fingerprint = request_fingerprint(request)
+        token = secrets.token_hex(16)
+
+        deadline = time.monotonic() + settings.IDEMPOTENCY_WAIT_SECONDS
+        while True:
+            stored = cache.get(result_key)
+            if stored is not None:
+                return _replay(stored, fingerprint)
+            if cache.add(lock_key, token, timeout=settings.IDEMPOTENCY_LOCK_SECONDS):
+                break
+            if time.monotonic() >= deadline:
+                return Response({
+                    'success': False,
+                    'message': f'A request with this {HEADER} is still being processed'
+                }, status=status.HTTP_409_CONFLICT)
+            time.sleep(POLL_INTERVAL)
+
+        try:
+            # Checked again under the lock: the first request may have just finished
+            stored = cache.get(result_key)
+            if stored is not None:
+                return _replay(stored, fingerprint)
+
+            response = view(request, *args, **kwargs)
+            # Failures aren't kept, so a corrected retry can reuse the key
+            if status.is_success(response.status_code):
+                cache.set(result_key, {
+                    'fingerprint': fingerprint,
+                    'status': response.status_code,
+                    'data': response.data,
+                }, timeout=settings.IDEMPOTENCY_TTL_SECONDS)
+            return response
+        finally:
+            # A view that outlived IDEMPOTENCY_LOCK_SECONDS may have lost the
+            # lock to a retry; only release it while it is still ours
+            if cache.get(lock_key) == token:
+                cache.delete(lock_key)
+
+    return wrapper
@@ -0,0 +1,39 @@
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import BaseParser, JSONParser
+from .renderers import FastJSONRenderer, MessagePackRenderer, orjson, msgpack
+
+
+class FastJSONParser(JSONParser):
+    """
+    JSON parser backed by orjson when it is installed, falling back
+    to DRF's JSONParser otherwise.
+    """
+    renderer_class = FastJSONRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        if orjson is None:
+            return super().parse(stream, media_type, parser_context)
+
+        try:
+            return orjson.loads(stream.read())
+        except orjson.JSONDecodeError as exc:
+            raise ParseError('JSON parse error - %s' % str(exc))
+
+
+class MessagePackParser(BaseParser):
+    """
+    Parses `application/msgpack` request bodies.
+    """
+    media_type = 'application/msgpack'
+    renderer_class = MessagePackRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        try:
+            return msgpack.unpackb(stream.read(), raw=False)
+        except Exception as exc:
+            raise ParseError('MessagePack parse error - %s' % str(exc))
+
+
+# Parsers enabled only when their optional package is installed, for views
+# that set their own parser_classes
+OPTIONAL_PARSERS = [MessagePackParser] if msgpack is not None else []
@@ -11,8 +11,9 @@ https://docs.djangoproject.com/en/4.2/ref/settings/
 """
 
 from pathlib import Path
-from decouple import config
+from decouple import config, Csv
 from datetime import timedelta
+import importlib.util
 import os
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -46,10 +47,12 @@ INSTALLED_APPS = [
     'accounts',
     'partnerships',
     'admin_panel',  
+    'jobs',
 ]
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'osa_backend.compression.CompressionMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -93,6 +96,21 @@ DATABASES = {
 AUTH_USER_MODEL = 'accounts.User'
 
 
+# Cache
+# Use a shared backend (memcached, redis, database) in production so cached
+# state is consistent across worker processes.
+
+CACHES = {
+    'default': {
+        'BACKEND': config('CACHE_BACKEND', default='django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': config('CACHE_LOCATION', default='osa-backend'),
+    }
+}
+# Whether every worker sees the same cache. Caches that must be invalidated
+# across workers are only enabled by default when this holds.
+CACHE_IS_SHARED = not CACHES['default']['BACKEND'].endswith(('LocMemCache', 'DummyCache'))
+
+
 # Password validation
 # https://docs.djangoproject.com/en/4.2/ref/settings/#auth-password-validators
 
@@ -135,6 +153,31 @@ STATIC_ROOT = BASE_DIR / 'staticfiles'
 
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
+
+# Generated department reports; private, downloaded through the API
+REPORTS_ROOT = config('REPORTS_ROOT', default=str(BASE_DIR / 'private' / 'reports'))
+
+# Partnership images (chunked uploads are assembled under FILE_UPLOAD_TEMP_DIR)
+PARTNERSHIP_IMAGE_MAX_SIZE = config('PARTNERSHIP_IMAGE_MAX_SIZE', default=5 * 1024 * 1024, cast=int)
+IMAGE_UPLOAD_CHUNK_SIZE = 512 * 1024
+IMAGE_UPLOAD_EXPIRY_HOURS = 24
+# Terminated/non-renewed partnerships untouched this long move to the archive table
+PARTNERSHIP_ARCHIVE_AFTER_DAYS = config('PARTNERSHIP_ARCHIVE_AFTER_DAYS', default=365, cast=int)
+PARTNERSHIP_ARCHIVE_BATCH_SIZE = 1000
+
+# Outgoing mail (console backend unless configured)
+EMAIL_BACKEND = config('EMAIL_BACKEND', default='django.core.mail.backends.console.EmailBackend')
+EMAIL_HOST = config('EMAIL_HOST', default='localhost')
+EMAIL_PORT = config('EMAIL_PORT', default=25, cast=int)
+EMAIL_HOST_USER = config('EMAIL_HOST_USER', default='')
+EMAIL_HOST_PASSWORD = config('EMAIL_HOST_PASSWORD', default='')
+EMAIL_USE_TLS = config('EMAIL_USE_TLS', default=False, cast=bool)
+EMAIL_TIMEOUT = 30
+DEFAULT_FROM_EMAIL = config('DEFAULT_FROM_EMAIL', default='OSA Partnerships <noreply@localhost>')
+
+# Renewal reminders go out this many days before expiration_date (partnerships.reminders)
+RENEWAL_REMINDER_DAYS = config('RENEWAL_REMINDER_DAYS', default='60,30,7', cast=Csv(int))
+RENEWAL_REMINDER_BATCH_SIZE = 100
 # Default primary key field type
 # https://docs.djangoproject.com/en/4.2/ref/settings/#default-auto-field
 
@@ -147,11 +190,33 @@ REST_FRAMEWORK = {
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
     ],
+    'DEFAULT_RENDERER_CLASSES': [
+        'osa_backend.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'osa_backend.parsers.FastJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ],
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
     'PAGE_SIZE': 100,
+    # Per-view limits for osa_backend.throttling, counted in the shared cache
+    'DEFAULT_THROTTLE_RATES': {
+        'login_ip': config('THROTTLE_LOGIN_IP', default='20/min'),
+        'login_email': config('THROTTLE_LOGIN_EMAIL', default='5/min'),
+        'email_check': config('THROTTLE_EMAIL_CHECK', default='30/min'),
+        'public': config('THROTTLE_PUBLIC', default='120/min'),
+    },
+    'NUM_PROXIES': config('NUM_PROXIES', default=0, cast=int) or None,
     'EXCEPTION_HANDLER': 'osa_backend.utils.custom_exception_handler',
 }
 
+# MessagePack is negotiated only when the optional msgpack package is installed
+if importlib.util.find_spec('msgpack'):
+    REST_FRAMEWORK['DEFAULT_RENDERER_CLASSES'].append('osa_backend.renderers.MessagePackRenderer')
+    REST_FRAMEWORK['DEFAULT_PARSER_CLASSES'].append('osa_backend.parsers.MessagePackParser')
+
 CORS_ALLOWED_ORIGINS = [
     "http://localhost:3000",
     "http://127.0.0.1:3000",
@@ -163,12 +228,120 @@ CORS_ALLOW_HEADERS = [
     'authorization',
     'content-type',
     'dnt',
+    'idempotency-key',
+    'if-match',
+    'if-none-match',
     'origin',
     'user-agent',
     'x-csrftoken',
     'x-requested-with',
 ]
 
+CORS_EXPOSE_HEADERS = [
+    'etag',
+    'idempotent-replayed',
+]
+
+# Slow-query log (admin_panel.slow_queries); a threshold of 0 disables it
+SLOW_QUERY_THRESHOLD_MS = config('SLOW_QUERY_THRESHOLD_MS', default=500, cast=float)
+SLOW_QUERY_EXPLAIN = config('SLOW_QUERY_EXPLAIN', default=True, cast=bool)
+SLOW_QUERY_BUFFER_SIZE = 500
+SLOW_QUERY_LOG_FILE = config('SLOW_QUERY_LOG_FILE', default=str(BASE_DIR / 'logs' / 'slow_queries.log'))
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'formatters': {
+        'timestamped': {
+            'format': '%(asctime)s %(levelname)s %(name)s %(message)s',
+        },
+    },
+    'handlers': {
+        'slow_queries_file': {
+            'class': 'logging.handlers.RotatingFileHandler',
+            'filename': SLOW_QUERY_LOG_FILE,
+            'maxBytes': 10 * 1024 * 1024,
+            'backupCount': 5,
+            'delay': True,
+            'formatter': 'timestamped',
+        },
+    },
+    'loggers': {
+        'osa_backend.slow_queries': {
+            'handlers': ['slow_queries_file'],
+            'level': 'WARNING',
+            'propagate': False,
+        },
+    },
+}
+
+# Partnership change events for other systems (partnerships.outbox), as
+# {name: {'class': sink class path, **options}}
+OUTBOX_SINKS = {}
+if config('OUTBOX_WEBHOOK_URL', default=''):
+    OUTBOX_SINKS['webhook'] = {
+        'class': 'partnerships.outbox.WebhookSink',
+        'url': config('OUTBOX_WEBHOOK_URL'),
+        'secret': config('OUTBOX_WEBHOOK_SECRET', default=''),
+    }
+if config('OUTBOX_FILE', default=''):
+    OUTBOX_SINKS['file'] = {
+        'class': 'partnerships.outbox.FileSink',
+        'path': config('OUTBOX_FILE'),
+    }
+OUTBOX_BATCH_SIZE = 100
+OUTBOX_SETTLE_SECONDS = 5
+OUTBOX_RETENTION_DAYS = config('OUTBOX_RETENTION_DAYS', default=30, cast=int)
+OUTBOX_POLL_INTERVAL_SECONDS = 2
+# A drainer holds a sink's lease while it sends; must outlast a sink's timeout
+OUTBOX_LEASE_SECONDS = 60
+# A failing sink waits base * 2^(failures - 1) seconds, up to the max, before the next try
+OUTBOX_RETRY_BASE_SECONDS = 2
+OUTBOX_RETRY_MAX_SECONDS = 300
+
+# Response compression (osa_backend.compression); smaller bodies go out as-is
+COMPRESSION_MIN_SIZE = 1024
+# Public partnership list responses are cached, compressed variants included
+PUBLIC_PARTNERSHIPS_CACHE_SECONDS = config('PUBLIC_PARTNERSHIPS_CACHE_SECONDS', default=60, cast=int)
+
+# Idempotency-Key handling for create endpoints (osa_backend.idempotency)
+# The in-flight lock and stored responses live in the cache, so with more
+# than one worker process CACHE_BACKEND must be a shared cache; with the
+# default local-memory cache a retry that lands on another worker runs again.
+IDEMPOTENCY_TTL_SECONDS = 24 * 60 * 60
+IDEMPOTENCY_LOCK_SECONDS = 60
+IDEMPOTENCY_WAIT_SECONDS = 10
+
 JWT_SECRET_KEY = config('JWT_SECRET_KEY', default='your-jwt-secret-key-change-in-production')
 JWT_ALGORITHM = 'HS256'
 JWT_EXPIRATION_DAYS = 7
+# Seconds an authenticated user's role/approval columns are cached (0 = off).
+# Off by default with a per-process cache: a deactivation or role change
+# would only reach the worker that made it.
+AUTH_USER_CACHE_SECONDS = config('AUTH_USER_CACHE_SECONDS', default=60 if CACHE_IS_SHARED else 0, cast=int)
+# Revoked token ids are mirrored into a per-process Bloom filter
+REVOCATION_REFRESH_SECONDS = config('REVOCATION_REFRESH_SECONDS', default=15, cast=int)
+REVOCATION_REBUILD_SECONDS = 60 * 60
+REVOCATION_FILTER_CAPACITY = 10000
+# Server-sent events (osa_backend.events), relayed between workers through
+# the cache: stream tickets are good for this long (and once), and open
+# streams re-check their token and user this often
+EVENT_STREAM_TICKET_SECONDS = 30
+EVENT_STREAM_RECHECK_SECONDS = 60
+
+
+# Cached monthly rollups for closed months (partnerships.analytics)
+ANALYTICS_CACHE_SECONDS = config('ANALYTICS_CACHE_SECONDS', default=6 * 60 * 60, cast=int)
+
+
+# Background jobs (python manage.py runworker)
+JOB_WORKER_POOL = config('JOB_WORKER_POOL', default='thread')
+JOB_WORKER_CONCURRENCY = config('JOB_WORKER_CONCURRENCY', default=4, cast=int)
+JOB_POLL_INTERVAL_SECONDS = 1.0
+JOB_MAX_ATTEMPTS = 3
+JOB_RETRY_BASE_SECONDS = 30
+JOB_RETRY_MAX_SECONDS = 3600
+# Running jobs refresh their lock this often; one not refreshed for the
+# timeout is taken to have lost its worker and is run again
+JOB_HEARTBEAT_SECONDS = 60
+JOB_LOCK_TIMEOUT_SECONDS = 10 * 60
@@ -0,0 +1,252 @@
+import asyncio
+import gzip
+import hashlib
+import json
+import unittest
+from datetime import date, datetime, timezone as dt_timezone
+from decimal import Decimal
+from unittest import mock
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework.permissions import AllowAny
+from rest_framework.renderers import JSONRenderer
+from rest_framework.response import Response
+from rest_framework.test import APIClient
+from accounts.authentication import JWTAuthentication
+from accounts.models import User
+from partnerships.models import Partnership
+from .compression import CompressionMiddleware, cache_compressed, negotiate
+from .events import EventBroker, stream_claims
+from .idempotency import idempotent
+from .renderers import FastJSONRenderer, orjson
+
+
+@unittest.skipIf(orjson is None, 'orjson is not installed')
+class FastJSONRendererTests(SimpleTestCase):
+    def test_output_matches_drf(self):
+        data = {
+            'created_at': datetime(2024, 9, 1, 8, 30, 15, 123456, tzinfo=dt_timezone.utc),
+            'expiration_date': date(2027, 9, 1),
+            'rate': Decimal('12.50'),
+            'items': [1, 'two', None],
+        }
+
+        fast = json.loads(FastJSONRenderer().render(data))
+
+        self.assertEqual(fast, json.loads(JSONRenderer().render(data)))
+        self.assertEqual(fast['created_at'], '2024-09-01T08:30:15.123456Z')
+
+
+class EventBrokerTests(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_events_published_by_another_worker_are_relayed(self):
+        publisher, relay = EventBroker(), EventBroker()
+        cet = User(role='department', department='CET')
+
+        async def receive():
+            subscriber = relay.subscribe(cet)
+            try:
+                publisher.publish('partnership.created', {'id': 1}, department='CET')
+                publisher.publish('partnership.created', {'id': 2}, department='CAS')
+                publisher.publish('registration.pending', {'id': 3}, roles=('admin',))
+                relay.poll()
+                first = await asyncio.wait_for(subscriber.queue.get(), 1)
+
+                # Moved to another department: the next recheck updates it
+                subscriber.update(User(role='department', department='CAS'))
+                publisher.publish('partnership.created', {'id': 4}, department='CET')
+                publisher.publish('partnership.created', {'id': 5}, department='CAS')
+                relay.poll()
+                second = await asyncio.wait_for(subscriber.queue.get(), 1)
+                return first, second, subscriber.queue.qsize()
+            finally:
+                relay.unsubscribe(subscriber)
+
+        first, second, left = asyncio.run(receive())
+
+        self.assertEqual((first['data'], second['data'], left), ({'id': 1}, {'id': 5}, 0))
+
+
+class StreamTicketTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        user = User.objects.create_user(
+            'dept@example.com', 'Dept-passw0rd!', full_name='Dept User',
+            role='department', department='CET', is_approved=True
+        )
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f'Bearer {JWTAuthentication.generate_token(user)}')
+        self.user = user
+        self.ticket = client.post('/api/events/ticket').data['data']['ticket']
+
+    def test_ticket_opens_one_stream(self):
+        request = RequestFactory().get('/api/events/stream', {'ticket': self.ticket})
+
+        self.assertEqual(stream_claims(request)['userId'], self.user.pk)
+        with self.assertRaisesMessage(AuthenticationFailed, 'already been used'):
+            stream_claims(request)
+
+
+@override_settings(REST_FRAMEWORK={
+    **settings.REST_FRAMEWORK,
+    'DEFAULT_THROTTLE_RATES': {**settings.REST_FRAMEWORK['DEFAULT_THROTTLE_RATES'], 'login_email': '2/min'},
+})
+class ThrottleTests(TestCase):
+    # 15 seconds into a one-minute window
+    start = 60 * 1000 + 15
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+
+    def login(self, email='dept@example.com', at=start):
+        with mock.patch('osa_backend.throttling.time.time', return_value=at):
+            return self.client.post('/api/auth/login', {'email': email, 'password': 'wrong'}, format='json')
+
+    def test_over_the_limit_gets_429_with_retry_after(self):
+        self.assertNotEqual(self.login().status_code, 429)
+        self.assertNotEqual(self.login().status_code, 429)
+
+        response = self.login()
+
+        self.assertEqual(response.status_code, 429)
+        # This window is full on its own, so the wait is the 45s until it ends
+        self.assertEqual(response['Retry-After'], '45')
+        self.assertNotEqual(self.login('other@example.com').status_code, 429)
+
+    def test_previous_window_slides_out(self):
+        self.login()
+        self.login()
+
+        # Next window: both earlier requests still count in full at its start
+        next_window = 60 * 1001
+        self.assertEqual(self.login(at=next_window)['Retry-After'], '1')
+        self.assertNotEqual(self.login(at=next_window + 30).status_code, 429)
+
+
+class IdempotencyTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        admin = User.objects.create_superuser('admin@example.com', 'Adm1n-passw0rd!', full_name='Admin')
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {JWTAuthentication.generate_token(admin)}')
+        self.payload = {
+            'business_name': 'Acme Widgets',
+            'department': 'CET',
+            'address': 'Cebu City',
+            'contact_person': 'Ana Cruz',
+            'manager_supervisor_1': 'Ben Reyes',
+            'email': 'hr@acme.example.com',
+            'contact_number': '09170000000',
+            'date_established': '2024-09-01',
+            'expiration_date': '2027-09-01',
+            'school_year': '2024-2025',
+        }
+
+    def create(self, payload, key='create-acme'):
+        return self.client.post('/api/partnerships/', payload, format='json', HTTP_IDEMPOTENCY_KEY=key)
+
+    def test_retry_replays_the_first_response(self):
+        first = self.create(self.payload)
+        retry = self.create(self.payload)
+
+        self.assertEqual(first.status_code, 201)
+        self.assertEqual((retry.status_code, retry.data), (201, first.data))
+        self.assertEqual(retry['Idempotent-Replayed'], 'true')
+        self.assertEqual(Partnership.objects.count(), 1)
+
+    def test_key_reused_with_another_payload_is_rejected(self):
+        self.create(self.payload)
+
+        response = self.create(dict(self.payload, business_name='Bolt Logistics'))
+
+        self.assertEqual(response.status_code, 422)
+        self.assertEqual(Partnership.objects.count(), 1)
+
+    def test_failed_request_can_be_retried_with_the_same_key(self):
+        self.assertEqual(self.create(dict(self.payload, email='')).status_code, 400)
+
+        self.assertEqual(self.create(self.payload).status_code, 201)
+
+    def test_lock_taken_over_by_a_retry_is_left_alone(self):
+        lock_key = 'idempotency:lock:' + hashlib.sha256(b'anon:/slow:slow').hexdigest()
+
+        @api_view(['POST'])
+        @permission_classes([AllowAny])
+        @idempotent
+        def slow_view(request):
+            # Outlived IDEMPOTENCY_LOCK_SECONDS, and a retry holds the lock now
+            self.assertIsNotNone(cache.get(lock_key))
+            cache.set(lock_key, 'retry')
+            return Response({'success': True}, status=201)
+
+        slow_view(RequestFactory().post('/slow', HTTP_IDEMPOTENCY_KEY='slow'))
+
+        self.assertEqual(cache.get(lock_key), 'retry')
+
+
+class CompressionTests(TestCase):
+    body = json.dumps({'data': ['partnership'] * 500})
+
+    def setUp(self):
+        cache.clear()
+
+    def compressed(self, response, accept='gzip'):
+        request = RequestFactory().get('/', HTTP_ACCEPT_ENCODING=accept)
+        return CompressionMiddleware(lambda request: response).process_response(request, response)
+
+    def test_negotiation_honours_q_values(self):
+        def negotiated(header):
+            return negotiate(RequestFactory().get('/', HTTP_ACCEPT_ENCODING=header))
+
+        self.assertEqual(negotiated('deflate, gzip;q=0.5'), 'gzip')
+        self.assertIsNone(negotiated('gzip;q=0'))
+        self.assertIsNone(negotiated('identity'))
+        self.assertIsNotNone(negotiated('*'))
+
+    def test_large_json_is_gzipped(self):
+        response = self.compressed(HttpResponse(self.body, content_type='application/json'))
+
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertIn('Accept-Encoding', response['Vary'])
+        self.assertEqual(gzip.decompress(response.content).decode(), self.body)
+
+    def test_small_and_no_store_responses_are_sent_as_is(self):
+        small = self.compressed(HttpResponse('{}', content_type='application/json'))
+        secret = HttpResponse(self.body, content_type='application/json')
+        secret['Cache-Control'] = 'no-store'
+        secret = self.compressed(secret)
+
+        self.assertFalse(small.has_header('Content-Encoding'))
+        self.assertFalse(secret.has_header('Content-Encoding'))
+        self.assertEqual(secret.content.decode(), self.body)
+
+    def test_token_responses_are_not_stored_or_compressed(self):
+        User.objects.create_superuser('admin@example.com', 'Adm1n-passw0rd!', full_name='Admin')
+
+        response = APIClient().post(
+            '/api/auth/login', {'email': 'admin@example.com', 'password': 'Adm1n-passw0rd!'},
+            format='json', HTTP_ACCEPT_ENCODING='gzip'
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('no-store', response['Cache-Control'])
+        self.assertFalse(response.has_header('Content-Encoding'))
+
+    @override_settings(ALLOWED_HOSTS=['a.example', 'b.example'])
+    def test_cached_responses_are_kept_per_host(self):
+        @api_view(['GET'])
+        @permission_classes([AllowAny])
+        @cache_compressed('tests', 60)
+        def absolute(request):
+            return Response({'url': request.build_absolute_uri('/media/logo.png')})
+
+        for host in ('a.example', 'b.example', 'a.example'):
+            response = absolute(RequestFactory().get('/absolute', HTTP_HOST=host))
+            self.assertEqual(json.loads(response.content)['url'], f'http://{host}/media/logo.png')
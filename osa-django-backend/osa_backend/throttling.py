@@ -0,0 +1,128 @@
+"""
+Sliding-window rate limits kept in Django's cache, so every worker process
+shares the same counters when a shared cache backend is configured.
+
+Each scope counts requests in fixed windows and estimates the rolling rate
+as `previous * (1 - elapsed / window) + current`, which only needs two
+counters per client instead of a timestamp log. Rates are read from
+REST_FRAMEWORK['DEFAULT_THROTTLE_RATES'] by scope, e.g. '5/min' or
+'20/15m'. Throttled requests get 429 with a Retry-After header.
+"""
+import math
+import re
+import time
+from django.core.cache import cache
+from django.core.exceptions import ImproperlyConfigured
+from rest_framework.settings import api_settings
+from rest_framework.throttling import BaseThrottle
+
+PERIODS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}
+RATE_PATTERN = re.compile(r'^\s*(\d+)\s*/\s*(\d*)\s*([smhd])[a-z]*\s*$')
+
+
+def parse_rate(rate):
+    """'5/min' -> (5, 60), '20/15m' -> (20, 900); None disables the limit"""
+    if rate is None:
+        return None, None
+    match = RATE_PATTERN.match(rate)
+    if not match:
+        raise ImproperlyConfigured(f'Invalid throttle rate {rate!r}')
+    num, multiplier, unit = match.groups()
+    return int(num), int(multiplier or 1) * PERIODS[unit]
+
+
+class SlidingWindowThrottle(BaseThrottle):
+    """Base class: subclasses set `scope` and implement `get_cache_ident`"""
+    scope = None
+    cache_prefix = 'throttle'
+
+    def __init__(self):
+        rates = api_settings.DEFAULT_THROTTLE_RATES
+        if self.scope not in rates:
+            raise ImproperlyConfigured(f'No throttle rate set for scope {self.scope!r}')
+        self.num_requests, self.duration = parse_rate(rates[self.scope])
+        self.retry_after = None
+
+    def get_cache_ident(self, request, view):
+        raise NotImplementedError
+
+    def cache_key(self, ident, window):
+        return f'{self.cache_prefix}:{self.scope}:{ident}:{window}'
+
+    def allow_request(self, request, view):
+        if self.num_requests is None:
+            return True
+
+        ident = self.get_cache_ident(request, view)
+        if ident is None:
+            return True
+
+        now = time.time()
+        window = int(now // self.duration)
+        elapsed = now - window * self.duration
+        current_key = self.cache_key(ident, window)
+        previous_key = self.cache_key(ident, window - 1)
+
+        counts = cache.get_many([current_key, previous_key])
+        current = counts.get(current_key, 0)
+        previous = counts.get(previous_key, 0)
+        weight = 1 - elapsed / self.duration
+
+        if previous * weight + current >= self.num_requests:
+            self.retry_after = self._wait(current, previous, elapsed)
+            return False
+
+        # add() is a no-op if the key exists; incr() is atomic on shared backends
+        cache.add(current_key, 0, timeout=self.duration * 2)
+        try:
+            cache.incr(current_key)
+        except ValueError:
+            # Expired between add() and incr()
+            cache.set(current_key, 1, timeout=self.duration * 2)
+        return True
+
+    def _wait(self, current, previous, elapsed):
+        """Seconds until the estimated rate drops below the limit"""
+        if current < self.num_requests:
+            # Wait for enough of the previous window to slide out
+            seconds = self.duration * (1 - (self.num_requests - current) / previous) - elapsed
+        else:
+            # This window is full on its own; it has to become the previous one
+            seconds = (self.duration - elapsed) + self.duration * (1 - self.num_requests / current)
+        return max(1, math.ceil(seconds))
+
+    def wait(self):
+        return self.retry_after
+
+
+class IPRateThrottle(SlidingWindowThrottle):
+    """Limit per client IP (honours NUM_PROXIES for X-Forwarded-For)"""
+
+    def get_cache_ident(self, request, view):
+        return self.get_ident(request)
+
+
+class EmailRateThrottle(SlidingWindowThrottle):
+    """Limit per submitted email address, whichever IP it comes from"""
+
+    def get_cache_ident(self, request, view):
+        email = request.data.get('email') if hasattr(request.data, 'get') else None
+        if not isinstance(email, str) or not email.strip():
+            return None
+        return email.strip().lower()
+
+
+class LoginIPThrottle(IPRateThrottle):
+    scope = 'login_ip'
+
+
+class LoginEmailThrottle(EmailRateThrottle):
+    scope = 'login_email'
+
+
+class EmailCheckThrottle(IPRateThrottle):
+    scope = 'email_check'
+
+
+class PublicThrottle(IPRateThrottle):
+    scope = 'public'
@@ -18,12 +18,16 @@ from django.contrib import admin
 from django.urls import path, include
 from django.conf import settings
 from django.conf.urls.static import static
+from .events import event_stream, stream_ticket
 
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('api/auth/', include('accounts.urls')),
     path('api/partnerships/', include('partnerships.urls')),
     path('api/admin/', include('admin_panel.urls')),
+    path('api/jobs/', include('jobs.urls')),
+    path('api/events/ticket', stream_ticket, name='event-stream-ticket'),
+    path('api/events/stream', event_stream, name='event-stream'),
 ]
 
 if settings.DEBUG:
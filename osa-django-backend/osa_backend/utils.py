@@ -18,4 +18,69 @@ def custom_exception_handler(exc, context):
         
         response.data = custom_response
     
-    return response
\ No newline at end of file
+    return response
+
+def if_none_match(request, etag):
+    """
+    Whether If-None-Match lists `etag`. Compared weakly: responses that were
+    compressed on the way out carry the weak form of the ETag.
+    """
+    header = request.headers.get('If-None-Match', '').strip()
+    if header == '*':
+        return True
+    tags = [tag.strip() for tag in header.split(',')]
+    return etag.removeprefix('W/') in [tag.removeprefix('W/') for tag in tags]
+
+def get_sparse_fieldset(request):
+    """
+    Read the `fields=` / `exclude=` query parameters as lists of field names
+    """
+    def parse(param):
+        value = request.query_params.get(param)
+        if not value:
+            return None
+        return [name.strip() for name in value.split(',') if name.strip()]
+
+    return parse('fields'), parse('exclude')
+
+
+class SparseFieldsMixin:
+    """
+    Serializer mixin that accepts `fields` / `exclude` keyword arguments and
+    knows which model columns the remaining fields need, so views can pass
+    the same selection to `.only()`.
+    """
+    # Serializer fields that read from differently named model columns
+    field_sources = {}
+
+    def __init__(self, *args, **kwargs):
+        fields = kwargs.pop('fields', None)
+        exclude = kwargs.pop('exclude', None)
+        super().__init__(*args, **kwargs)
+
+        if fields is not None or exclude:
+            allowed = set(self.sparse_field_names(fields, exclude))
+            for name in list(self.fields):
+                if name not in allowed:
+                    self.fields.pop(name)
+
+    @classmethod
+    def sparse_field_names(cls, fields=None, exclude=None):
+        """Field names left after applying `fields` / `exclude` (id is always kept)"""
+        names = list(cls.Meta.fields)
+        if fields is not None:
+            names = [name for name in names if name in fields or name == 'id']
+        if exclude:
+            names = [name for name in names if name not in exclude or name == 'id']
+        return names
+
+    @classmethod
+    def model_columns(cls, field_names):
+        """Model columns needed to render `field_names`"""
+        concrete = {field.name for field in cls.Meta.model._meta.concrete_fields}
+        columns = {'id'}
+        for name in field_names:
+            for source in cls.field_sources.get(name, [name]):
+                if source in concrete:
+                    columns.add(source)
+        return columns
@@ -1,3 +1,112 @@
-from django.contrib import admin
+from django import forms
+from django.contrib import admin, messages
+from django.db import transaction
+from django.http import HttpResponseRedirect
+from admin_panel.admin import EstimatedCountPaginator, KeysetPaginatedAdmin, ReadOnlyAdminMixin
+from .archive import restore
+from .models import ArchivedPartnership, AuditLog, Partnership, VersionConflict
+from .serializers import PartnershipSerializer
+from .views import record_partnership_change
 
-# Register your models here.
+
+class PartnershipAdminForm(forms.ModelForm):
+    # The version the form was opened at, so saving over someone else's
+    # later edit is refused instead of silently overwriting it
+    seen_version = forms.IntegerField(widget=forms.HiddenInput, required=False)
+
+    class Meta:
+        model = Partnership
+        fields = '__all__'
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        if self.instance.pk:
+            self.fields['seen_version'].initial = self.instance.version
+
+
+@admin.register(Partnership)
+class PartnershipAdmin(admin.ModelAdmin):
+    form = PartnershipAdminForm
+    list_display = ('business_name', 'department', 'status', 'school_year', 'expiration_date', 'created_by')
+    # Each filter is backed by a single-column index
+    list_filter = ('status', 'department', 'school_year')
+    search_fields = ('business_name', 'email')
+    list_select_related = ('created_by',)
+    raw_id_fields = ('created_by',)
+    readonly_fields = ('version', 'created_at', 'updated_at')
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+    # Changes made here are audited, queued in the outbox and invalidate the
+    # caches exactly like the API's, through record_partnership_change
+
+    def serialize(self, request, partnership):
+        return PartnershipSerializer(partnership, context={'request': request}).data
+
+    def changeform_view(self, request, object_id=None, form_url='', extra_context=None):
+        # Both are raised inside the admin's transaction, so nothing was saved or logged
+        try:
+            return super().changeform_view(request, object_id, form_url, extra_context)
+        except VersionConflict:
+            self.message_user(
+                request,
+                'Someone else changed this partnership while you were editing it. '
+                'Review the current values and apply your changes again.',
+                messages.ERROR
+            )
+        except Partnership.DoesNotExist:
+            self.message_user(request, 'This partnership was deleted while you were editing it.', messages.ERROR)
+        return HttpResponseRedirect(request.get_full_path())
+
+    def save_model(self, request, obj, form, change):
+        old_values = self.serialize(request, Partnership.objects.get(pk=obj.pk)) if change else None
+        if change and form.cleaned_data.get('seen_version') is not None:
+            obj.version = form.cleaned_data['seen_version']
+        with transaction.atomic():
+            super().save_model(request, obj, form, change)
+            record_partnership_change(
+                request, 'UPDATE' if change else 'CREATE', obj,
+                old_values=old_values,
+                new_values=self.serialize(request, obj)
+            )
+
+    def delete_model(self, request, obj):
+        old_values = self.serialize(request, obj)
+        with transaction.atomic():
+            # A queryset delete leaves obj.pk set for the audit row
+            Partnership.objects.filter(pk=obj.pk).delete()
+            record_partnership_change(request, 'DELETE', obj, old_values=old_values)
+
+    def delete_queryset(self, request, queryset):
+        with transaction.atomic():
+            for partnership in queryset:
+                self.delete_model(request, partnership)
+
+
+@admin.register(ArchivedPartnership)
+class ArchivedPartnershipAdmin(ReadOnlyAdminMixin, admin.ModelAdmin):
+    list_display = ('business_name', 'department', 'status', 'school_year', 'expiration_date', 'archived_at')
+    list_filter = ('status', 'department')
+    search_fields = ('business_name', 'email')
+    list_select_related = ('created_by',)
+    raw_id_fields = ('created_by',)
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    actions = ['restore_selected']
+
+    @admin.action(description='Restore selected partnerships to the live table', permissions=['restore'])
+    def restore_selected(self, request, queryset):
+        restored = restore(list(queryset.values_list('id', flat=True)), user=request.user)
+        self.message_user(request, f'Restored {len(restored)} partnership(s)')
+
+    def has_restore_permission(self, request):
+        return request.user.is_superuser
+
+
+@admin.register(AuditLog)
+class AuditLogAdmin(ReadOnlyAdminMixin, KeysetPaginatedAdmin):
+    list_display = ('id', 'created_at', 'user', 'action', 'table_name', 'record_id')
+    # action has fixed choices, so the sidebar needs no DISTINCT query
+    list_filter = ('action',)
+    list_select_related = ('user',)
+    raw_id_fields = ('user',)
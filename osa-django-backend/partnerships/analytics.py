@@ -0,0 +1,229 @@
+"""
+Time-bucketed partnership analytics.
+
+Monthly rollups per department are computed in one grouped UNION query
+over live and archived partnerships using database-side month truncation.
+Rollups for closed months (before the current month) are cached for
+ANALYTICS_CACHE_SECONDS; the open and future months are always recomputed.
+A partnership write drops the months it touched once it commits. Writes
+that bypass record_partnership_change (bulk updates, data fixes) call
+invalidate_all_months(), which bumps a generation number kept in the
+cache. Invalidation only reaches other workers through a shared cache
+backend; with the per-process default the TTL bounds how stale they get.
+"""
+from datetime import date, timedelta
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, Q, Value, CharField
+from django.db.models.functions import TruncDate, TruncMonth
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+from .models import ArchivedPartnership, Partnership
+
+CACHE_PREFIX = 'partnership_analytics:month:'
+GENERATION_KEY = 'partnership_analytics:generation'
+
+METRICS = ['established', 'expiring', 'terminated', 'created']
+
+EXPIRING_SOON_DAYS = 30
+
+
+def status_summary(partnerships, archived=None):
+    """
+    Totals for a partnership queryset in two queries: one conditional
+    aggregate (total, per status, expiring within EXPIRING_SOON_DAYS) and
+    one grouped count per department. The `archived` queryset, if given,
+    is added in with two more.
+    """
+    today = timezone.localdate()
+    counts = {}
+    by_department = {}
+    for queryset in [partnerships] if archived is None else [partnerships, archived]:
+        totals = queryset.order_by().aggregate(
+            total=Count('id'),
+            expiring_soon=Count('id', filter=Q(
+                expiration_date__gte=today,
+                expiration_date__lte=today + timedelta(days=EXPIRING_SOON_DAYS)
+            )),
+            **{code: Count('id', filter=Q(status=code)) for code, _ in Partnership.STATUS_CHOICES}
+        )
+        for key, value in totals.items():
+            counts[key] = counts.get(key, 0) + value
+        for row in queryset.order_by().values('department').annotate(count=Count('id')):
+            by_department[row['department']] = by_department.get(row['department'], 0) + row['count']
+    return counts, by_department
+
+
+def month_start(value):
+    return value.replace(day=1)
+
+
+def add_months(value, months):
+    index = value.year * 12 + value.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def month_range(start, end):
+    months = []
+    current = start
+    while current <= end:
+        months.append(current)
+        current = add_months(current, 1)
+    return months
+
+
+def school_year_for(value):
+    """Same convention as Partnership.save: the school year starts in August"""
+    if value.month >= 8:
+        return f"{value.year}-{value.year + 1}"
+    return f"{value.year - 1}-{value.year}"
+
+
+def cache_generation():
+    return cache.get_or_set(GENERATION_KEY, 1, timeout=None)
+
+
+def cache_key(month, generation):
+    return f'{CACHE_PREFIX}{generation}:{month:%Y-%m}'
+
+
+def query_rollups(start, end):
+    """
+    {month: {department: {metric: count}}} for months in [start, end],
+    fetched in a single round trip over live and archived partnerships.
+    """
+    last_day = add_months(end, 1)
+
+    def grouped(model, series, period, date_filter, **aggregates):
+        return (
+            model.objects.order_by()
+            .filter(date_filter)
+            .annotate(series=Value(series, output_field=CharField()), period=period)
+            .values('series', 'period', 'department')
+            .annotate(**aggregates)
+        )
+
+    queries = []
+    for model in (Partnership, ArchivedPartnership):
+        queries += [
+            grouped(
+                model,
+                'established',
+                TruncMonth('date_established'),
+                Q(date_established__gte=start, date_established__lt=last_day),
+                total=Count('id'),
+                terminated=Value(0),
+            ),
+            grouped(
+                model,
+                'expiring',
+                TruncMonth('expiration_date'),
+                Q(expiration_date__gte=start, expiration_date__lt=last_day),
+                total=Count('id'),
+                terminated=Count('id', filter=Q(status='terminated')),
+            ),
+            grouped(
+                model,
+                'created',
+                TruncMonth(TruncDate('created_at')),
+                Q(created_at__date__gte=start, created_at__date__lt=last_day),
+                total=Count('id'),
+                terminated=Value(0),
+            ),
+        ]
+
+    rollups = {}
+    for row in queries[0].union(*queries[1:], all=True):
+        period = row['period']
+        if isinstance(period, str):
+            period = parse_date(period[:10])
+        counts = rollups.setdefault(period, {}).setdefault(
+            row['department'], dict.fromkeys(METRICS, 0)
+        )
+        counts[row['series']] += row['total']
+        if row['series'] == 'expiring':
+            counts['terminated'] += row['terminated']
+    return rollups
+
+
+def monthly_rollups(start, end):
+    """Monthly rollups for [start, end], served from cache for closed months"""
+    months = month_range(start, end)
+    current = month_start(timezone.localdate())
+    closed = [month for month in months if month < current]
+
+    generation = cache_generation()
+    keys = {month: cache_key(month, generation) for month in closed}
+    cached = cache.get_many(list(keys.values()))
+    missing = [month for month in closed if keys[month] not in cached]
+    to_compute = missing + [month for month in months if month >= current]
+
+    computed = {}
+    if to_compute:
+        computed = query_rollups(min(to_compute), max(to_compute))
+        cache.set_many(
+            {keys[month]: computed.get(month, {}) for month in missing},
+            timeout=settings.ANALYTICS_CACHE_SECONDS
+        )
+
+    return {
+        month: cached.get(keys.get(month), computed.get(month, {}))
+        for month in months
+    }
+
+
+def invalidate_partnership_months(partnership=None, old_values=None):
+    """
+    Drop cached rollups for the months a partnership write touched, using
+    the saved instance and/or the serialized values from before the write.
+    """
+    dates = []
+    if partnership is not None:
+        dates += [partnership.date_established, partnership.expiration_date]
+        if partnership.created_at:
+            dates.append(timezone.localdate(partnership.created_at))
+    if old_values:
+        dates += [
+            parse_date(old_values.get('date_established') or ''),
+            parse_date(old_values.get('expiration_date') or ''),
+        ]
+        created_at = parse_datetime(old_values.get('created_at') or '')
+        if created_at:
+            dates.append(timezone.localdate(created_at))
+
+    generation = cache_generation()
+    keys = {cache_key(month_start(value), generation) for value in dates if value}
+    if keys:
+        cache.delete_many(list(keys))
+
+
+def invalidate_all_months():
+    """Drop every cached rollup, for writes that can't name the months they touched"""
+    try:
+        cache.incr(GENERATION_KEY)
+    except ValueError:
+        pass  # Nothing cached yet
+
+
+def build_timeseries(start, end, bucket='month', department=None):
+    """
+    Bucketed series between two months, as a list of
+    {'period', 'totals', 'by_department'} entries.
+    """
+    buckets = {}
+    for month, by_department in monthly_rollups(start, end).items():
+        period = f'{month:%Y-%m}' if bucket == 'month' else school_year_for(month)
+        entry = buckets.setdefault(period, {
+            'period': period,
+            'totals': dict.fromkeys(METRICS, 0),
+            'by_department': {},
+        })
+        for dept, counts in by_department.items():
+            if department and dept != department:
+                continue
+            dept_counts = entry['by_department'].setdefault(dept, dict.fromkeys(METRICS, 0))
+            for metric in METRICS:
+                dept_counts[metric] += counts[metric]
+                entry['totals'][metric] += counts[metric]
+
+    return list(buckets.values())
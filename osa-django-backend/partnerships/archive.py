@@ -0,0 +1,124 @@
+"""
+Archive tier for closed partnerships.
+
+Terminated and non-renewed partnerships that nobody has touched for
+PARTNERSHIP_ARCHIVE_AFTER_DAYS move from `partnerships` to
+`archived_partnerships` in batches of PARTNERSHIP_ARCHIVE_BATCH_SIZE, one
+transaction per batch, so the live table behind every list, count and
+dashboard only holds partnerships people still work with. Rows keep their
+id and timestamps. List, detail, statistics and sync endpoints read the
+archive too when called with `?include_archived=true`; analytics and
+reports always cover both tables.
+"""
+from datetime import timedelta
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from osa_backend.compression import invalidate_cached_responses
+from .analytics import invalidate_all_months
+from .models import ArchivedPartnership, AuditLog, Partnership
+from .outbox import add_events
+from .serializers import PartnershipSerializer
+
+CLOSED_STATUSES = ['terminated', 'non_renewal']
+
+INCLUDE_ARCHIVED_PARAM = 'include_archived'
+
+# Cached public list responses; dropped whenever the live set changes
+PUBLIC_CACHE_NAMESPACE = 'public_partnerships'
+
+# Columns copied between the two tables (archived_at is set on insert)
+COPIED_FIELDS = [
+    field.attname for field in ArchivedPartnership._meta.concrete_fields
+    if field.name != 'archived_at'
+]
+
+
+def include_archived(request):
+    return request.query_params.get(INCLUDE_ARCHIVED_PARAM, '').lower() in ('1', 'true')
+
+
+def archivable(older_than_days=None):
+    """Closed partnerships last updated more than `older_than_days` ago"""
+    if older_than_days is None:
+        older_than_days = settings.PARTNERSHIP_ARCHIVE_AFTER_DAYS
+    cutoff = timezone.now() - timedelta(days=older_than_days)
+    return Partnership.objects.filter(status__in=CLOSED_STATUSES, updated_at__lt=cutoff)
+
+
+def archive_batch(partnerships):
+    """
+    Move one batch of partnerships to the archive in a single transaction.
+    Rows are re-read under lock so a partnership reopened in the meantime
+    stays live. Returns the number of rows moved.
+    """
+    with transaction.atomic():
+        rows = list(partnerships.select_for_update().order_by().values(*COPIED_FIELDS))
+        if not rows:
+            return 0
+        ArchivedPartnership.objects.bulk_create([ArchivedPartnership(**row) for row in rows])
+        # Cascades to pending image uploads; trigram postings stay, so
+        # duplicate checks still see archived partners
+        Partnership.objects.filter(id__in=[row['id'] for row in rows]).delete()
+        add_events('partnership.archived', {
+            row['id']: {'department': row['department'], 'status': row['status']} for row in rows
+        })
+    invalidate_cached_responses(PUBLIC_CACHE_NAMESPACE)
+    invalidate_all_months()
+    return len(rows)
+
+
+def archive_closed(older_than_days=None, batch_size=None, limit=None, progress=None):
+    """
+    Archive every archivable partnership, walking the ids in batches.
+    `progress(moved)` is called after each batch. Returns the number moved.
+    """
+    batch_size = batch_size or settings.PARTNERSHIP_ARCHIVE_BATCH_SIZE
+    candidates = archivable(older_than_days)
+
+    moved = 0
+    last_id = 0
+    while limit is None or moved < limit:
+        size = batch_size if limit is None else min(batch_size, limit - moved)
+        ids = list(
+            candidates.filter(id__gt=last_id).order_by('id').values_list('id', flat=True)[:size]
+        )
+        if not ids:
+            break
+        last_id = ids[-1]
+        moved += archive_batch(candidates.filter(id__in=ids))
+        if progress:
+            progress(moved)
+    return moved
+
+
+def restore(ids, user=None):
+    """
+    Move archived partnerships back to the live table, with a RESTORE audit
+    row each attributed to `user`. They come back with a fresh `updated_at`,
+    so syncing clients pick them up as changed. Returns the restored ids.
+    """
+    with transaction.atomic():
+        rows = list(
+            ArchivedPartnership.objects.select_for_update().filter(id__in=ids).values(*COPIED_FIELDS)
+        )
+        if not rows:
+            return []
+        Partnership.objects.bulk_create([Partnership(**row) for row in rows])
+        # bulk_create stamps created_at as now; put the originals back in one UPDATE
+        Partnership.objects.bulk_update(
+            [Partnership(id=row['id'], created_at=row['created_at']) for row in rows],
+            ['created_at']
+        )
+        restored = [row['id'] for row in rows]
+        AuditLog.objects.bulk_create([
+            AuditLog(user=user, action='RESTORE', table_name='partnerships', record_id=data['id'], new_values=data)
+            for data in PartnershipSerializer(Partnership.objects.filter(id__in=restored), many=True).data
+        ])
+        ArchivedPartnership.objects.filter(id__in=restored).delete()
+        add_events('partnership.restored', {
+            row['id']: {'department': row['department'], 'status': row['status']} for row in rows
+        })
+    invalidate_cached_responses(PUBLIC_CACHE_NAMESPACE)
+    invalidate_all_months()
+    return restored
@@ -0,0 +1,172 @@
+"""
+Fuzzy duplicate-partner detection.
+
+Business names and the local part of emails are split into pg_trgm-style
+trigrams and kept in the `partnership_trigrams` posting table, indexed on
+(field, trigram). Candidates are the partnerships sharing the most
+trigrams with the input, found through the index instead of comparing
+against every row, and are then ranked by trigram similarity.
+
+Archived partnerships keep their postings, so a new partner is also
+checked against closed ones; those matches are flagged `archived`.
+
+Email domains are left out of the index: a shared `gmail.com` would
+otherwise dominate the score and make the candidate lookup walk most of
+the table. Two emails are only compared when their domains match.
+Trigrams posted for more than COMMON_TRIGRAM_SHARE of all partnerships
+are skipped when looking up candidates, for the same reason.
+"""
+import re
+from django.core.cache import cache
+from django.db.models import Count
+from .models import ArchivedPartnership, Partnership, PartnershipTrigram
+
+# Suffixes that don't tell two companies apart
+NAME_STOPWORDS = {'inc', 'corp', 'corporation', 'co', 'company', 'ltd', 'llc', 'the', 'and'}
+
+DUPLICATE_THRESHOLD = 0.6
+CANDIDATE_LIMIT = 50
+
+# Trigrams posted for a larger share of partnerships than this don't narrow
+# the candidates down; tables below COMMON_TRIGRAM_MIN_ROWS are too small to tell
+COMMON_TRIGRAM_SHARE = 0.05
+COMMON_TRIGRAM_MIN_ROWS = 1000
+COMMON_TRIGRAM_CACHE_SECONDS = 60 * 60
+COMMON_TRIGRAM_CACHE_KEY = 'partnership_trigrams:common'
+
+
+def split_email(value):
+    """(local part, domain) of a normalized email"""
+    local, _, domain = (value or '').lower().strip().rpartition('@')
+    return (local, domain) if local else (domain, '')
+
+
+def normalize(field, value):
+    value = (value or '').lower().strip()
+    if field == 'email':
+        return split_email(value)[0]
+    words = re.findall(r'[a-z0-9]+', value)
+    return ' '.join(word for word in words if word not in NAME_STOPWORDS)
+
+
+def trigrams(field, value):
+    """Trigrams of each word padded like pg_trgm ('  w', ' wo', 'wor', ...)"""
+    value = normalize(field, value)
+    words = [value] if field == 'email' else value.split()
+    grams = set()
+    for word in words:
+        padded = f'  {word} '
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+def common_trigrams():
+    """
+    {field: trigrams too frequent to look candidates up by}. Counted over
+    the whole posting table at most once per COMMON_TRIGRAM_CACHE_SECONDS.
+    """
+    common = cache.get(COMMON_TRIGRAM_CACHE_KEY)
+    if common is None:
+        total = Partnership.objects.count() + ArchivedPartnership.objects.count()
+        common = {field: set() for field, _ in PartnershipTrigram.FIELD_CHOICES}
+        if total >= COMMON_TRIGRAM_MIN_ROWS:
+            rows = (
+                PartnershipTrigram.objects.order_by()
+                .values('field', 'trigram')
+                .annotate(count=Count('id'))
+                .filter(count__gt=total * COMMON_TRIGRAM_SHARE)
+            )
+            for row in rows:
+                common[row['field']].add(row['trigram'])
+        cache.set(COMMON_TRIGRAM_CACHE_KEY, common, COMMON_TRIGRAM_CACHE_SECONDS)
+    return common
+
+
+def similarity(a, b):
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+
+def index_partnership(partnership):
+    """(Re)build the posting rows for one partnership"""
+    PartnershipTrigram.objects.filter(partnership=partnership).delete()
+    PartnershipTrigram.objects.bulk_create([
+        PartnershipTrigram(partnership=partnership, field=field, trigram=gram)
+        for field in ('business_name', 'email')
+        for gram in trigrams(field, getattr(partnership, field))
+    ])
+
+
+def unindex_partnership(partnership_id):
+    """Drop the posting rows of a deleted partnership"""
+    PartnershipTrigram.objects.filter(partnership_id=partnership_id).delete()
+
+
+def rebuild_index(batch_size=1000):
+    """Rebuild the posting table for live and archived partnerships"""
+    PartnershipTrigram.objects.all().delete()
+    batch = []
+    for model in (Partnership, ArchivedPartnership):
+        rows = model.objects.order_by().values_list('id', 'business_name', 'email').iterator(chunk_size=batch_size)
+        for partnership_id, business_name, email in rows:
+            for field, value in (('business_name', business_name), ('email', email)):
+                batch.extend(
+                    PartnershipTrigram(partnership_id=partnership_id, field=field, trigram=gram)
+                    for gram in trigrams(field, value)
+                )
+            if len(batch) >= batch_size:
+                PartnershipTrigram.objects.bulk_create(batch)
+                batch = []
+    PartnershipTrigram.objects.bulk_create(batch)
+
+
+def find_duplicates(business_name=None, email=None, exclude_id=None,
+                    threshold=DUPLICATE_THRESHOLD, limit=10):
+    """
+    Ranked likely duplicates as dicts with id, business_name, email,
+    department, archived and score (0-1).
+    """
+    query = {
+        'business_name': trigrams('business_name', business_name),
+        'email': trigrams('email', email),
+    }
+    domain = split_email(email)[1]
+    common = common_trigrams()
+
+    candidate_ids = set()
+    for field, grams in query.items():
+        # Fall back to every trigram when the input is made of common ones only
+        grams = (grams - common[field]) or grams
+        if not grams:
+            continue
+        postings = (
+            PartnershipTrigram.objects.filter(field=field, trigram__in=grams)
+            .exclude(partnership_id=exclude_id)
+            .values('partnership_id')
+            .annotate(shared=Count('id'))
+            .order_by('-shared')[:CANDIDATE_LIMIT]
+        )
+        candidate_ids.update(row['partnership_id'] for row in postings)
+
+    if not candidate_ids:
+        return []
+
+    matches = []
+    fields = ('id', 'business_name', 'email', 'department')
+    candidates = [
+        dict(candidate, archived=archived)
+        for model, archived in ((Partnership, False), (ArchivedPartnership, True))
+        for candidate in model.objects.filter(id__in=candidate_ids).values(*fields)
+    ]
+    for candidate in candidates:
+        name_score = similarity(query['business_name'], trigrams('business_name', candidate['business_name']))
+        email_score = 0.0
+        if split_email(candidate['email'])[1] == domain:
+            email_score = similarity(query['email'], trigrams('email', candidate['email']))
+        score = max(name_score, email_score)
+        if score >= threshold:
+            matches.append(dict(candidate, score=round(score, 3)))
+
+    matches.sort(key=lambda match: match['score'], reverse=True)
+    return matches[:limit]
@@ -0,0 +1,33 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from partnerships.archive import archivable, archive_closed, restore
+
+
+class Command(BaseCommand):
+    help = 'Move terminated and non-renewed partnerships to the archive table, or restore them'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--older-than-days', type=int, default=settings.PARTNERSHIP_ARCHIVE_AFTER_DAYS)
+        parser.add_argument('--batch-size', type=int, default=settings.PARTNERSHIP_ARCHIVE_BATCH_SIZE)
+        parser.add_argument('--limit', type=int, default=None, help='Stop after this many rows')
+        parser.add_argument('--dry-run', action='store_true', help='Only count what would be archived')
+        parser.add_argument('--restore', type=int, nargs='+', metavar='ID', help='Move these ids back instead')
+
+    def handle(self, *args, **options):
+        if options['restore']:
+            restored = restore(options['restore'])
+            self.stdout.write(f'Restored {len(restored)} partnership(s)')
+            return
+
+        if options['dry_run']:
+            count = archivable(options['older_than_days']).count()
+            self.stdout.write(f'{count} partnership(s) would be archived')
+            return
+
+        moved = archive_closed(
+            older_than_days=options['older_than_days'],
+            batch_size=options['batch_size'],
+            limit=options['limit'],
+            progress=lambda moved: self.stdout.write(f'  {moved} archived')
+        )
+        self.stdout.write(f'Archived {moved} partnership(s)')
@@ -0,0 +1,79 @@
+import gzip
+import time
+from datetime import date, timedelta
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+from accounts.models import User
+from osa_backend.renderers import FastJSONRenderer
+from partnerships.models import Partnership
+from partnerships.views import columnar_partnerships, serialize_partnerships
+
+
+class Command(BaseCommand):
+    help = 'Compare row and ?shape=columnar partnership list payloads (rows are rolled back afterwards)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=50000)
+        parser.add_argument('--repeat', type=int, default=3)
+
+    def handle(self, *args, **options):
+        rows = options['rows']
+        repeat = options['repeat']
+        renderer = FastJSONRenderer()
+
+        with transaction.atomic():
+            self.create_rows(rows)
+
+            request = Request(APIRequestFactory().get('/api/partnerships/'))
+            request.user = User(email='benchmark@example.com', role='admin')
+            partnerships = Partnership.objects.all()
+
+            def as_rows():
+                data = serialize_partnerships(partnerships, request)
+                return {'success': True, 'count': len(data), 'data': data}
+
+            def as_columns():
+                count, data = columnar_partnerships(partnerships, request)
+                return {'success': True, 'count': count, 'shape': 'columnar', 'data': data}
+
+            self.stdout.write(f'partnerships ({rows} rows)')
+            for name, build in (('rows', as_rows), ('columnar', as_columns)):
+                best = None
+                for _ in range(repeat):
+                    start = time.perf_counter()
+                    body = renderer.render(build())
+                    elapsed = time.perf_counter() - start
+                    best = elapsed if best is None else min(best, elapsed)
+                self.stdout.write(
+                    f'  {name:<10} {best * 1000:8.1f} ms  {len(body) / 1024:10.1f} KiB'
+                    f'  {len(gzip.compress(body, 6)) / 1024:8.1f} KiB gzip'
+                )
+
+            transaction.set_rollback(True)
+
+    def create_rows(self, rows):
+        departments = [code for code, _ in Partnership.DEPARTMENT_CHOICES]
+        statuses = [code for code, _ in Partnership.STATUS_CHOICES]
+        batch = []
+        for i in range(rows):
+            established = date(2020, 1, 1) + timedelta(days=i % 1500)
+            batch.append(Partnership(
+                business_name=f'Partner Company {i}',
+                department=departments[i % len(departments)],
+                address=f'{i} Rizal Avenue, Zamboanga City, Philippines',
+                contact_person=f'Contact Person {i}',
+                manager_supervisor_1=f'Manager {i}',
+                email=f'partner{i}@example.com',
+                contact_number='09171234567',
+                date_established=established,
+                expiration_date=established + timedelta(days=730),
+                school_year=f'{2020 + i % 5}-{2021 + i % 5}',
+                status=statuses[i % len(statuses)],
+                remarks='Memorandum of agreement on file.',
+            ))
+            if len(batch) >= 5000:
+                Partnership.objects.bulk_create(batch)
+                batch = []
+        Partnership.objects.bulk_create(batch)
@@ -0,0 +1,97 @@
+import time
+from datetime import date, timedelta
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+from osa_backend.renderers import FastJSONRenderer, MessagePackRenderer, orjson, msgpack
+
+
+class Command(BaseCommand):
+    help = 'Benchmark the JSON/MessagePack renderers on large partnership and audit-log payloads'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=10000)
+        parser.add_argument('--repeat', type=int, default=5)
+
+    def handle(self, *args, **options):
+        rows = options['rows']
+        repeat = options['repeat']
+
+        renderers = [('drf-json', JSONRenderer())]
+        if orjson is not None:
+            renderers.append(('orjson', FastJSONRenderer()))
+        else:
+            self.stdout.write('orjson not installed, FastJSONRenderer uses the stdlib fallback')
+        if msgpack is not None:
+            renderers.append(('msgpack', MessagePackRenderer()))
+        else:
+            self.stdout.write('msgpack not installed, skipping MessagePackRenderer')
+
+        payloads = {
+            'partnerships': self.partnership_payload(rows),
+            'audit-logs': self.audit_log_payload(rows),
+        }
+
+        for payload_name, payload in payloads.items():
+            self.stdout.write(f'\n{payload_name} ({rows} rows)')
+            for name, renderer in renderers:
+                best = None
+                for _ in range(repeat):
+                    start = time.perf_counter()
+                    body = renderer.render(payload)
+                    elapsed = time.perf_counter() - start
+                    best = elapsed if best is None else min(best, elapsed)
+                self.stdout.write(
+                    f'  {name:<10} {best * 1000:8.1f} ms  {len(body) / 1024:10.1f} KiB'
+                )
+
+    def partnership_row(self, i):
+        established = date(2020, 1, 1) + timedelta(days=i % 1500)
+        return {
+            'id': i,
+            'business_name': f'Partner Company {i}',
+            'department': 'CET',
+            'address': f'{i} Rizal Avenue, Zamboanga City, Philippines',
+            'contact_person': f'Contact Person {i}',
+            'manager_supervisor_1': f'Manager {i}',
+            'manager_supervisor_2': None,
+            'email': f'partner{i}@example.com',
+            'contact_number': '09171234567',
+            'date_established': established,
+            'expiration_date': established + timedelta(days=730),
+            'school_year': '2024-2025',
+            'status': 'active',
+            'remarks': 'Memorandum of agreement on file.',
+            'image': None,
+            'image_url': None,
+            'created_at': timezone.now(),
+            'updated_at': timezone.now(),
+        }
+
+    def partnership_payload(self, rows):
+        return {
+            'success': True,
+            'count': rows,
+            'data': [self.partnership_row(i) for i in range(rows)],
+        }
+
+    def audit_log_payload(self, rows):
+        data = []
+        for i in range(rows):
+            row = self.partnership_row(i)
+            row['date_established'] = row['date_established'].isoformat()
+            row['expiration_date'] = row['expiration_date'].isoformat()
+            row['created_at'] = row['updated_at'] = row['created_at'].isoformat()
+            data.append({
+                'id': i,
+                'user': 1,
+                'user_email': 'admin@example.com',
+                'user_name': 'Administrator',
+                'action': 'UPDATE',
+                'table_name': 'partnerships',
+                'record_id': i,
+                'old_values': row,
+                'new_values': dict(row, status='for_renewal'),
+                'created_at': timezone.now(),
+            })
+        return {'success': True, 'count': rows, 'data': data}
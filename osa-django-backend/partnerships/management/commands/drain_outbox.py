@@ -0,0 +1,41 @@
+import time
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from partnerships.outbox import drain, get_sinks, prune
+
+
+class Command(BaseCommand):
+    help = 'Deliver partnership outbox events to the configured sinks'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sink', action='append', dest='sinks', help='Only drain this sink (repeatable)')
+        parser.add_argument('--batch-size', type=int, default=settings.OUTBOX_BATCH_SIZE)
+        parser.add_argument('--poll-interval', type=float, default=settings.OUTBOX_POLL_INTERVAL_SECONDS)
+        parser.add_argument('--once', action='store_true', help='Exit once every sink is caught up')
+
+    def handle(self, *args, **options):
+        try:
+            names = list(get_sinks(options['sinks']))
+        except ValueError as exc:
+            raise CommandError(str(exc))
+        if not names:
+            raise CommandError('No outbox sinks configured (see OUTBOX_SINKS)')
+
+        self.stdout.write(f"Draining outbox to {', '.join(names)}")
+        try:
+            while True:
+                delivered = drain(names, batch_size=options['batch_size'])
+                for name, count in delivered.items():
+                    if count:
+                        self.stdout.write(f'{name}: delivered {count} event(s)')
+
+                pruned = prune()
+                if pruned:
+                    self.stdout.write(f'Pruned {pruned} delivered event(s)')
+
+                if options['once']:
+                    break
+                if not any(delivered.values()):
+                    time.sleep(options['poll_interval'])
+        except KeyboardInterrupt:
+            self.stdout.write('Stopped')
@@ -0,0 +1,36 @@
+from django.core.management.base import BaseCommand
+from partnerships.duplicates import DUPLICATE_THRESHOLD, find_duplicates, rebuild_index
+from partnerships.models import Partnership
+
+
+class Command(BaseCommand):
+    help = 'Scan partnerships for likely duplicate partners'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rebuild', action='store_true', help='Rebuild the trigram index first')
+        parser.add_argument('--threshold', type=float, default=DUPLICATE_THRESHOLD)
+        parser.add_argument('--department')
+
+    def handle(self, *args, **options):
+        if options['rebuild']:
+            rebuild_index()
+            self.stdout.write('Trigram index rebuilt')
+
+        partnerships = Partnership.objects.order_by('id').values_list('id', 'business_name', 'email')
+        if options['department']:
+            partnerships = partnerships.filter(department=options['department'])
+
+        pairs = 0
+        for partnership_id, business_name, email in partnerships.iterator():
+            for match in find_duplicates(business_name, email, exclude_id=partnership_id,
+                                         threshold=options['threshold']):
+                # Each pair is found from both sides; report it once
+                if match['id'] < partnership_id:
+                    continue
+                pairs += 1
+                self.stdout.write(
+                    f"{match['score']:.2f}  #{partnership_id} {business_name} <-> "
+                    f"#{match['id']} {match['business_name']} ({match['department']})"
+                )
+
+        self.stdout.write(f'{pairs} likely duplicate pair(s)')
@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand, CommandError
+from partnerships.reports import available_formats, generate_reports, valid_school_year
+
+
+class Command(BaseCommand):
+    help = 'Generate per-department partnership reports for a school year'
+
+    def add_arguments(self, parser):
+        parser.add_argument('school_year', help='e.g. 2024-2025')
+        parser.add_argument('--format', default=available_formats()[0])
+        parser.add_argument('--department', action='append', dest='departments')
+        parser.add_argument('--workers', type=int, default=None)
+
+    def handle(self, *args, **options):
+        if not valid_school_year(options['school_year']):
+            raise CommandError('School year must look like 2024-2025')
+        if options['format'] not in available_formats():
+            raise CommandError(f"Format must be one of: {', '.join(available_formats())}")
+
+        reports = generate_reports(
+            options['school_year'],
+            options['format'],
+            departments=options['departments'],
+            max_workers=options['workers']
+        )
+        for report in reports:
+            self.stdout.write(f'{report.department:<8} {report.row_count:>6} rows  {report.file.name}')
@@ -0,0 +1,39 @@
+import json
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from django.core.management.base import BaseCommand
+
+
+class Command(BaseCommand):
+    help = 'Local stand-in for a webhook consumer: prints the outbox batches it receives'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--port', type=int, default=8099)
+        parser.add_argument('--status', type=int, default=200, help='Status to answer with, e.g. 500 to test retries')
+
+    def handle(self, *args, **options):
+        stdout = self.stdout
+        status = options['status']
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers.get('Content-Length', 0)))
+                try:
+                    events = json.loads(body)['events']
+                except (ValueError, KeyError):
+                    events = []
+                for event in events:
+                    stdout.write(f"#{event['id']} {event['type']} partnership {event['partnership_id']}")
+                self.send_response(status)
+                self.end_headers()
+
+            def log_message(self, format, *args):
+                pass
+
+        server = ThreadingHTTPServer(('127.0.0.1', options['port']), Handler)
+        self.stdout.write(f"Listening on http://127.0.0.1:{options['port']}/ (answering {status})")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
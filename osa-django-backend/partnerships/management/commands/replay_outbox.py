@@ -0,0 +1,36 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from partnerships.outbox import drain, get_sinks, rewind
+
+
+class Command(BaseCommand):
+    help = "Rewind an outbox sink's cursor so events are delivered again"
+
+    def add_arguments(self, parser):
+        parser.add_argument('sink')
+        start = parser.add_mutually_exclusive_group(required=True)
+        start.add_argument('--from-id', type=int, help='Re-deliver from this event id')
+        start.add_argument('--since', help='Re-deliver events created at or after this ISO datetime')
+        parser.add_argument('--drain', action='store_true', help='Deliver the replayed events now')
+
+    def handle(self, *args, **options):
+        try:
+            get_sinks([options['sink']])
+        except ValueError as exc:
+            raise CommandError(str(exc))
+
+        since = None
+        if options['since']:
+            since = parse_datetime(options['since'])
+            if since is None:
+                raise CommandError('--since must be an ISO datetime')
+            if timezone.is_naive(since):
+                since = timezone.make_aware(since)
+
+        position = rewind(options['sink'], from_id=options['from_id'], since=since)
+        self.stdout.write(f"{options['sink']}: cursor rewound to event {position}")
+
+        if options['drain']:
+            delivered = drain([options['sink']])[options['sink']]
+            self.stdout.write(f"{options['sink']}: delivered {delivered} event(s)")
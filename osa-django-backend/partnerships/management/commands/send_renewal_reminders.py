@@ -0,0 +1,26 @@
+from datetime import date
+from django.core.management.base import BaseCommand, CommandError
+from partnerships.reminders import send_reminders
+
+
+class Command(BaseCommand):
+    help = 'Email renewal reminders for partnerships nearing their expiration date'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--date', help='Treat this day (YYYY-MM-DD) as today')
+        parser.add_argument('--batch-size', type=int, default=None)
+        parser.add_argument('--dry-run', action='store_true', help='Only count what would be sent')
+
+    def handle(self, *args, **options):
+        today = None
+        if options['date']:
+            try:
+                today = date.fromisoformat(options['date'])
+            except ValueError:
+                raise CommandError('--date must be in YYYY-MM-DD format')
+
+        result = send_reminders(today=today, batch_size=options['batch_size'], dry_run=options['dry_run'])
+        verb = 'would be sent' if options['dry_run'] else 'sent'
+        self.stdout.write(
+            f"{result['reminders']} reminder(s) to {result['recipients']} recipient(s) {verb}"
+        )
@@ -0,0 +1,23 @@
+# Generated by Django 5.0.1 on 2026-10-19 16:58
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('partnerships', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='auditlog',
+            index=models.Index(fields=['table_name', 'action', 'created_at'], name='audit_logs_table_n_55ad44_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='partnership',
+            index=models.Index(fields=['updated_at'], name='partnership_updated_7b6737_idx'),
+        ),
+    ]
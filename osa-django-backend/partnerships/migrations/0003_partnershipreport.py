@@ -0,0 +1,35 @@
+# Generated by Django 5.0.1 on 2026-10-19 17:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('partnerships', '0002_sync_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PartnershipReport',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('department', models.CharField(choices=[('STE', 'School of Teacher Education'), ('CET', 'College of Engineering and Technology'), ('CCJE', 'College of Criminal Justice Education'), ('HuSoCom', 'Humanities, Social Sciences and Communication'), ('BSMT', 'Bachelor of Science in Marine Transportation'), ('SBME', 'School of Business and Management Education'), ('CHATME', 'College of Hospitality and Tourism Management Education')], max_length=50)),
+                ('school_year', models.CharField(max_length=20)),
+                ('format', models.CharField(choices=[('xlsx', 'Excel'), ('csv', 'CSV')], max_length=10)),
+                ('fingerprint', models.CharField(max_length=64)),
+                ('row_count', models.PositiveIntegerField(default=0)),
+                ('file', models.FileField(upload_to='reports/')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'db_table': 'partnership_reports',
+                'ordering': ['school_year', 'department'],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='partnershipreport',
+            constraint=models.UniqueConstraint(fields=('department', 'school_year', 'format'), name='unique_partnership_report'),
+        ),
+    ]
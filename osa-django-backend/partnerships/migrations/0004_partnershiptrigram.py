@@ -0,0 +1,60 @@
+# Generated by Django 5.0.1 on 2026-10-19 17:03
+
+import re
+import django.db.models.deletion
+from django.db import migrations, models
+
+# Frozen copy of partnerships.duplicates as of this migration, so later
+# changes to the live module don't change what this migration does
+NAME_STOPWORDS = {'inc', 'corp', 'corporation', 'co', 'company', 'ltd', 'llc', 'the', 'and'}
+
+
+def trigrams(field, value):
+    value = (value or '').lower().strip()
+    if field == 'email':
+        words = [value]
+    else:
+        words = [word for word in re.findall(r'[a-z0-9]+', value) if word not in NAME_STOPWORDS]
+    grams = set()
+    for word in words:
+        padded = f'  {word} '
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+def build_trigram_index(apps, schema_editor):
+    Partnership = apps.get_model('partnerships', 'Partnership')
+    PartnershipTrigram = apps.get_model('partnerships', 'PartnershipTrigram')
+
+    rows = []
+    for partnership_id, business_name, email in Partnership.objects.values_list('id', 'business_name', 'email'):
+        for field, value in (('business_name', business_name), ('email', email)):
+            rows.extend(
+                PartnershipTrigram(partnership_id=partnership_id, field=field, trigram=gram)
+                for gram in trigrams(field, value)
+            )
+    PartnershipTrigram.objects.bulk_create(rows, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('partnerships', '0003_partnershipreport'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PartnershipTrigram',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('field', models.CharField(choices=[('business_name', 'Business Name'), ('email', 'Email')], max_length=20)),
+                ('trigram', models.CharField(max_length=3)),
+                ('partnership', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='trigrams', to='partnerships.partnership')),
+            ],
+            options={
+                'db_table': 'partnership_trigrams',
+                'indexes': [models.Index(fields=['field', 'trigram'], name='partnership_field_fb2613_idx')],
+            },
+        ),
+        migrations.RunPython(build_trigram_index, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.0.1 on 2026-10-19 17:13
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('partnerships', '0005_imageupload'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='partnership',
+            name='version',
+            field=models.PositiveIntegerField(default=1),
+        ),
+    ]
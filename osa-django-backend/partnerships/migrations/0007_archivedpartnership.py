@@ -0,0 +1,48 @@
+# Generated by Django 5.0.1 on 2026-10-19 17:23
+
+import django.core.validators
+import django.db.models.deletion
+import partnerships.models
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('partnerships', '0006_partnership_version'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedPartnership',
+            fields=[
+                ('business_name', models.CharField(max_length=255)),
+                ('department', models.CharField(choices=[('STE', 'School of Teacher Education'), ('CET', 'College of Engineering and Technology'), ('CCJE', 'College of Criminal Justice Education'), ('HuSoCom', 'Humanities, Social Sciences and Communication'), ('BSMT', 'Bachelor of Science in Marine Transportation'), ('SBME', 'School of Business and Management Education'), ('CHATME', 'College of Hospitality and Tourism Management Education')], max_length=50)),
+                ('address', models.TextField()),
+                ('contact_person', models.CharField(max_length=255)),
+                ('manager_supervisor_1', models.CharField(max_length=255)),
+                ('manager_supervisor_2', models.CharField(blank=True, max_length=255, null=True)),
+                ('email', models.EmailField(max_length=254, validators=[django.core.validators.EmailValidator()])),
+                ('contact_number', models.CharField(max_length=50)),
+                ('date_established', models.DateField()),
+                ('expiration_date', models.DateField()),
+                ('school_year', models.CharField(max_length=20)),
+                ('status', models.CharField(choices=[('active', 'Active'), ('terminated', 'Terminated'), ('for_renewal', 'For Renewal'), ('non_renewal', 'Non-Renewal')], default='active', max_length=20)),
+                ('remarks', models.TextField(blank=True, null=True)),
+                ('image', models.ImageField(blank=True, null=True, upload_to=partnerships.models.partnership_image_path)),
+                ('version', models.PositiveIntegerField(default=1)),
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('created_at', models.DateTimeField()),
+                ('updated_at', models.DateTimeField()),
+                ('archived_at', models.DateTimeField(auto_now_add=True, db_index=True)),
+                ('created_by', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='archived_partnerships', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'db_table': 'archived_partnerships',
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['department', 'school_year'], name='archived_pa_departm_7b0608_idx'), models.Index(fields=['status'], name='archived_pa_status_a3c287_idx')],
+            },
+        ),
+    ]
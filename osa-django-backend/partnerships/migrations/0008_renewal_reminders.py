@@ -0,0 +1,42 @@
+# Generated by Django 5.0.1 on 2026-10-19 17:26
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('partnerships', '0007_archivedpartnership'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RenewalReminder',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('expiration_date', models.DateField()),
+                ('days_before', models.PositiveSmallIntegerField()),
+                ('recipient', models.EmailField(max_length=254)),
+                ('sent_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'db_table': 'partnership_renewal_reminders',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='partnership',
+            index=models.Index(fields=['expiration_date'], name='partnership_expirat_b9cc0d_idx'),
+        ),
+        migrations.AddField(
+            model_name='renewalreminder',
+            name='partnership',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='renewal_reminders', to='partnerships.partnership'),
+        ),
+        migrations.AddConstraint(
+            model_name='renewalreminder',
+            constraint=models.UniqueConstraint(fields=('partnership', 'expiration_date', 'days_before', 'recipient'), name='renewal_reminder_uniq'),
+        ),
+    ]
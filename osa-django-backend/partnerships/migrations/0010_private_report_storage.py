@@ -0,0 +1,19 @@
+# Generated by Django 5.0.1 on 2026-10-19 17:41
+
+import partnerships.models
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('partnerships', '0009_outbox'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='partnershipreport',
+            name='file',
+            field=models.FileField(storage=partnerships.models.report_storage, upload_to=''),
+        ),
+    ]
@@ -0,0 +1,40 @@
+# Generated by Django 5.0.1 on 2026-10-19 17:52
+
+from django.db import migrations
+
+
+def local_part_trigrams(email):
+    """Frozen copy of partnerships.duplicates.trigrams('email', ...) as of this migration"""
+    value = (email or '').lower().strip()
+    local, _, domain = value.rpartition('@')
+    padded = f'  {local or domain} '
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def reindex_emails(apps, schema_editor):
+    """Email postings now cover the local part only"""
+    Partnership = apps.get_model('partnerships', 'Partnership')
+    PartnershipTrigram = apps.get_model('partnerships', 'PartnershipTrigram')
+
+    PartnershipTrigram.objects.filter(field='email').delete()
+    batch = []
+    for partnership_id, email in Partnership.objects.order_by().values_list('id', 'email').iterator(chunk_size=1000):
+        batch.extend(
+            PartnershipTrigram(partnership_id=partnership_id, field='email', trigram=gram)
+            for gram in local_part_trigrams(email)
+        )
+        if len(batch) >= 1000:
+            PartnershipTrigram.objects.bulk_create(batch)
+            batch = []
+    PartnershipTrigram.objects.bulk_create(batch)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('partnerships', '0010_private_report_storage'),
+    ]
+
+    operations = [
+        migrations.RunPython(reindex_emails, migrations.RunPython.noop),
+    ]
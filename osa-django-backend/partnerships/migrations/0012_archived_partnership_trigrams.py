@@ -0,0 +1,69 @@
+# Generated by Django 5.0.1 on 2026-10-19 17:50
+
+import re
+import django.db.models.deletion
+from django.db import migrations, models
+
+# Frozen copy of partnerships.duplicates.trigrams as of this migration
+NAME_STOPWORDS = {'inc', 'corp', 'corporation', 'co', 'company', 'ltd', 'llc', 'the', 'and'}
+
+
+def trigrams(field, value):
+    value = (value or '').lower().strip()
+    if field == 'email':
+        local, _, domain = value.rpartition('@')
+        words = [local or domain]
+    else:
+        words = [word for word in re.findall(r'[a-z0-9]+', value) if word not in NAME_STOPWORDS]
+    grams = set()
+    for word in words:
+        padded = f'  {word} '
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+def index_archived(apps, schema_editor):
+    """Archiving used to cascade the postings away; put them back"""
+    ArchivedPartnership = apps.get_model('partnerships', 'ArchivedPartnership')
+    PartnershipTrigram = apps.get_model('partnerships', 'PartnershipTrigram')
+
+    batch = []
+    rows = ArchivedPartnership.objects.order_by().values_list('id', 'business_name', 'email').iterator(chunk_size=1000)
+    for partnership_id, business_name, email in rows:
+        PartnershipTrigram.objects.filter(partnership_id=partnership_id).delete()
+        for field, value in (('business_name', business_name), ('email', email)):
+            batch.extend(
+                PartnershipTrigram(partnership_id=partnership_id, field=field, trigram=gram)
+                for gram in trigrams(field, value)
+            )
+        if len(batch) >= 1000:
+            PartnershipTrigram.objects.bulk_create(batch)
+            batch = []
+    PartnershipTrigram.objects.bulk_create(batch)
+
+
+def unindex_archived(apps, schema_editor):
+    ArchivedPartnership = apps.get_model('partnerships', 'ArchivedPartnership')
+    PartnershipTrigram = apps.get_model('partnerships', 'PartnershipTrigram')
+    PartnershipTrigram.objects.filter(
+        partnership_id__in=ArchivedPartnership.objects.values('id')
+    ).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('partnerships', '0011_email_local_part_trigrams'),
+    ]
+
+    operations = [
+        # Reverse order matters: archived postings must go before the
+        # foreign key constraint comes back
+        migrations.RunPython(migrations.RunPython.noop, unindex_archived),
+        migrations.AlterField(
+            model_name='partnershiptrigram',
+            name='partnership',
+            field=models.ForeignKey(db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, related_name='trigrams', to='partnerships.partnership'),
+        ),
+        migrations.RunPython(index_archived, migrations.RunPython.noop),
+    ]
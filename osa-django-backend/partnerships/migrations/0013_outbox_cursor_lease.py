@@ -0,0 +1,28 @@
+# Generated by Django 5.0.1 on 2026-10-19 17:51
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('partnerships', '0012_archived_partnership_trigrams'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='outboxcursor',
+            name='leased_by',
+            field=models.CharField(blank=True, max_length=32, null=True),
+        ),
+        migrations.AddField(
+            model_name='outboxcursor',
+            name='leased_until',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='outboxcursor',
+            name='retry_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.0.1 on 2026-10-19 18:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('partnerships', '0013_outbox_cursor_lease'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='partnershipreport',
+            name='format',
+            field=models.CharField(choices=[('xlsx', 'Excel'), ('pdf', 'PDF'), ('csv', 'CSV')], max_length=10),
+        ),
+    ]
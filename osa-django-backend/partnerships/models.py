@@ -1,7 +1,13 @@
 from django.db import models
 from django.conf import settings
+from django.core.files.storage import FileSystemStorage
 from django.core.validators import EmailValidator
 import os
+import uuid
+
+class VersionConflict(Exception):
+    """The row was changed by someone else since it was read"""
+
 
 def partnership_image_path(instance, filename):
     """Generate upload path for partnership images"""
@@ -9,7 +15,8 @@ def partnership_image_path(instance, filename):
     filename = f"{instance.business_name.replace(' ', '_')}_{instance.id}.{ext}"
     return os.path.join('partnership_images', filename)
 
-class Partnership(models.Model):
+class PartnershipFields(models.Model):
+    """Columns shared by live partnerships and the archive"""
     STATUS_CHOICES = [
         ('active', 'Active'),
         ('terminated', 'Terminated'),
@@ -45,6 +52,24 @@ class Partnership(models.Model):
     remarks = models.TextField(blank=True, null=True)
     image = models.ImageField(upload_to=partnership_image_path, blank=True, null=True)
 
+    # Bumped on every save; updates only apply to the version they were read at
+    version = models.PositiveIntegerField(default=1)
+
+    class Meta:
+        abstract = True
+    
+    def __str__(self):
+        return f"{self.business_name} - {self.department}"
+    
+    @property
+    def image_url(self):
+        """Return full URL for the image"""
+        if self.image:
+            return self.image.url
+        return None
+
+
+class Partnership(PartnershipFields):
     created_by = models.ForeignKey(
         settings.AUTH_USER_MODEL,
         on_delete=models.SET_NULL,
@@ -61,11 +86,10 @@ class Partnership(models.Model):
             models.Index(fields=['department']),
             models.Index(fields=['status']),
             models.Index(fields=['school_year']),
+            models.Index(fields=['updated_at']),
+            models.Index(fields=['expiration_date']),
         ]
     
-    def __str__(self):
-        return f"{self.business_name} - {self.department}"
-    
     def save(self, *args, **kwargs):
         if not self.school_year:
             year = self.date_established.year
@@ -74,14 +98,92 @@ class Partnership(models.Model):
                 self.school_year = f"{year}-{year + 1}"
             else:
                 self.school_year = f"{year - 1}-{year}"
-        super().save(*args, **kwargs)
+        
+        if self._state.adding:
+            super().save(*args, **kwargs)
+            return
+        
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None:
+            kwargs['update_fields'] = {*update_fields, 'version'}
+        
+        expected = self.version
+        self.version = expected + 1
+        self._expected_version = expected
+        try:
+            super().save(*args, **kwargs)
+        except Exception:
+            self.version = expected
+            raise
+        finally:
+            self._expected_version = None
     
-    @property
-    def image_url(self):
-        """Return full URL for the image"""
-        if self.image:
-            return self.image.url
-        return None
+    def _do_update(self, base_qs, using, pk_val, values, update_fields, forced_update):
+        """UPDATE ... WHERE id = %s AND version = %s; raise if the version moved on"""
+        expected = getattr(self, '_expected_version', None)
+        if expected is None:
+            return super()._do_update(base_qs, using, pk_val, values, update_fields, forced_update)
+        
+        updated = super()._do_update(
+            base_qs.filter(version=expected), using, pk_val, values, update_fields, forced_update
+        )
+        if not updated:
+            if base_qs.filter(pk=pk_val).exists():
+                raise VersionConflict(f'Partnership {pk_val} is no longer at version {expected}')
+            # Deleted meanwhile; don't let save() fall back to re-inserting it
+            raise self.DoesNotExist(f'Partnership {pk_val} no longer exists')
+        return updated
+
+
+class ArchivedPartnership(PartnershipFields):
+    """
+    Cold tier: terminated and non-renewed partnerships moved out of the
+    live table by `partnerships.archive`. Rows keep their original id and
+    timestamps and are read-only.
+    """
+    id = models.BigIntegerField(primary_key=True)
+    created_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        related_name='archived_partnerships'
+    )
+    created_at = models.DateTimeField()
+    updated_at = models.DateTimeField()
+    archived_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    class Meta:
+        db_table = 'archived_partnerships'
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['department', 'school_year']),
+            models.Index(fields=['status']),
+        ]
+
+
+class RenewalReminder(models.Model):
+    """A renewal reminder sent for one expiration date, step and recipient"""
+    partnership = models.ForeignKey(
+        Partnership,
+        on_delete=models.CASCADE,
+        related_name='renewal_reminders'
+    )
+    expiration_date = models.DateField()
+    days_before = models.PositiveSmallIntegerField()
+    recipient = models.EmailField()
+    sent_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = 'partnership_renewal_reminders'
+        constraints = [
+            models.UniqueConstraint(
+                fields=['partnership', 'expiration_date', 'days_before', 'recipient'],
+                name='renewal_reminder_uniq'
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.partnership_id} -> {self.recipient} ({self.days_before} days)"
 
 
 class AuditLog(models.Model):
@@ -89,6 +191,7 @@ class AuditLog(models.Model):
         ('CREATE', 'Create'),
         ('UPDATE', 'Update'),
         ('DELETE', 'Delete'),
+        ('RESTORE', 'Restore'),
     ]
     
     user = models.ForeignKey(
@@ -107,6 +210,172 @@ class AuditLog(models.Model):
     class Meta:
         db_table = 'audit_logs'
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['table_name', 'action', 'created_at']),
+        ]
     
     def __str__(self):
-        return f"{self.user.email if self.user else 'Unknown'} - {self.action} - {self.table_name}"
\ No newline at end of file
+        return f"{self.user.email if self.user else 'Unknown'} - {self.action} - {self.table_name}"
+
+
+class OutboxEvent(models.Model):
+    """
+    Partnership change event for other systems, written in the same
+    transaction as the change and delivered later by partnerships.outbox
+    """
+    event_type = models.CharField(max_length=50)
+    partnership_id = models.BigIntegerField()
+    payload = models.JSONField()
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    class Meta:
+        db_table = 'partnership_outbox'
+        ordering = ['id']
+
+    def __str__(self):
+        return f"#{self.id} {self.event_type} {self.partnership_id}"
+
+
+class OutboxCursor(models.Model):
+    """
+    Last outbox event delivered to a sink, the drainer currently holding
+    the sink's lease, and when a failing sink may be tried again
+    """
+    sink = models.CharField(max_length=100, unique=True)
+    last_event_id = models.BigIntegerField(default=0)
+    failures = models.PositiveIntegerField(default=0)
+    last_error = models.TextField(blank=True, null=True)
+    leased_by = models.CharField(max_length=32, blank=True, null=True)
+    leased_until = models.DateTimeField(blank=True, null=True)
+    retry_at = models.DateTimeField(blank=True, null=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'partnership_outbox_cursors'
+
+    def __str__(self):
+        return f"{self.sink} @ {self.last_event_id}"
+
+
+class PartnershipTrigram(models.Model):
+    """
+    Trigram posting list for fuzzy duplicate detection. Covers live and
+    archived partnerships alike, so the id may point into either table:
+    there is no database constraint, and postings are removed when a
+    partnership is deleted rather than when it is archived.
+    """
+    FIELD_CHOICES = [
+        ('business_name', 'Business Name'),
+        ('email', 'Email'),
+    ]
+
+    partnership = models.ForeignKey(
+        Partnership,
+        on_delete=models.DO_NOTHING,
+        db_constraint=False,
+        related_name='trigrams'
+    )
+    field = models.CharField(max_length=20, choices=FIELD_CHOICES)
+    trigram = models.CharField(max_length=3)
+
+    class Meta:
+        db_table = 'partnership_trigrams'
+        indexes = [
+            models.Index(fields=['field', 'trigram']),
+        ]
+
+    def __str__(self):
+        return f"{self.partnership_id} {self.field} {self.trigram!r}"
+
+
+class ImageUpload(models.Model):
+    """Chunked, resumable upload of a partnership image"""
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('completed', 'Completed'),
+    ]
+
+    upload_id = models.UUIDField(default=uuid.uuid4, unique=True, editable=False)
+    partnership = models.ForeignKey(
+        Partnership,
+        on_delete=models.CASCADE,
+        related_name='image_uploads'
+    )
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        related_name='image_uploads'
+    )
+    filename = models.CharField(max_length=255)
+    total_size = models.PositiveBigIntegerField()
+    chunk_size = models.PositiveIntegerField()
+    checksum = models.CharField(max_length=64, blank=True, null=True)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'partnership_image_uploads'
+        ordering = ['-created_at']
+
+    def __str__(self):
+        return f"{self.filename} ({self.upload_id})"
+
+    @property
+    def chunk_count(self):
+        return max(1, -(-self.total_size // self.chunk_size))
+
+    def expected_chunk_size(self, index):
+        if index == self.chunk_count - 1:
+            return self.total_size - index * self.chunk_size
+        return self.chunk_size
+
+
+class ImageUploadChunk(models.Model):
+    upload = models.ForeignKey(ImageUpload, on_delete=models.CASCADE, related_name='chunks')
+    index = models.PositiveIntegerField()
+    size = models.PositiveIntegerField()
+    checksum = models.CharField(max_length=64)
+
+    class Meta:
+        db_table = 'partnership_image_upload_chunks'
+        constraints = [
+            models.UniqueConstraint(fields=['upload', 'index'], name='unique_image_upload_chunk'),
+        ]
+
+
+def report_storage():
+    """Reports hold partner contact details: kept outside MEDIA_ROOT, served by an authenticated view"""
+    return FileSystemStorage(location=settings.REPORTS_ROOT, base_url=None)
+
+
+class PartnershipReport(models.Model):
+    """Generated end-of-school-year report for one department"""
+    FORMAT_CHOICES = [
+        ('xlsx', 'Excel'),
+        ('pdf', 'PDF'),
+        ('csv', 'CSV'),
+    ]
+
+    department = models.CharField(max_length=50, choices=Partnership.DEPARTMENT_CHOICES)
+    school_year = models.CharField(max_length=20)
+    format = models.CharField(max_length=10, choices=FORMAT_CHOICES)
+    fingerprint = models.CharField(max_length=64)
+    row_count = models.PositiveIntegerField(default=0)
+    file = models.FileField(storage=report_storage)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'partnership_reports'
+        ordering = ['school_year', 'department']
+        constraints = [
+            models.UniqueConstraint(
+                fields=['department', 'school_year', 'format'],
+                name='unique_partnership_report'
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.department} {self.school_year} ({self.format})"
\ No newline at end of file
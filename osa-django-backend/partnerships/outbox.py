@@ -0,0 +1,333 @@
+"""
+Transactional outbox for partnership change events.
+
+Every partnership create, update, delete, archive and restore writes an
+OutboxEvent in the same transaction as the change and its AuditLog row. An
+event therefore exists exactly when the change committed. Other campus
+systems never sit on the write path: `manage.py drain_outbox` delivers the
+events afterwards.
+
+Sinks are configured in OUTBOX_SINKS as {name: {'class': dotted path,
+**options}}. Each sink keeps its own OutboxCursor and receives events in
+id order, in batches of OUTBOX_BATCH_SIZE. The cursor only moves after a
+sink accepts a batch, so delivery is at-least-once: a crash between the
+send and the cursor update sends that batch again, and consumers should
+de-duplicate on the event `id`. A failing sink stops at the failed batch
+and retries it after an exponential backoff (OUTBOX_RETRY_BASE_SECONDS,
+doubling up to OUTBOX_RETRY_MAX_SECONDS); the other sinks carry on.
+`manage.py replay_outbox` rewinds a sink's cursor.
+
+The same log gives `/api/partnerships/sync` its tokens: a token is an event
+position, and a client asks for the partnerships touched by the settled
+events after it. The newest event is never pruned, so a token from before
+the retention window is recognized and answered with a full resync.
+
+A drainer takes a lease on the sink's cursor (OUTBOX_LEASE_SECONDS, renewed
+after each batch) and sends outside any transaction, so no row lock is held
+while a slow sink answers. The cursor only moves if the drainer still holds
+the lease and nobody rewound it in the meantime.
+
+Ids are allocated on insert, not on commit, so a lower id can become
+visible after a higher one. A drain stops at a gap in the ids until the
+event after it is OUTBOX_SETTLE_SECONDS old. After that the gap is taken
+to be a rolled-back insert.
+"""
+import hashlib
+import hmac
+import json
+import logging
+import os
+import urllib.request
+import uuid
+from datetime import timedelta
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Max, Min, Q
+from django.utils import timezone
+from django.utils.module_loading import import_string
+from .models import OutboxCursor, OutboxEvent
+
+logger = logging.getLogger(__name__)
+
+
+def event_payload(event):
+    return {
+        'id': event.id,
+        'type': event.event_type,
+        'partnership_id': event.partnership_id,
+        'occurred_at': event.created_at.isoformat(),
+        'data': event.payload,
+    }
+
+
+def add_event(event_type, partnership_id, payload):
+    """Queue an event; call inside the transaction that makes the change"""
+    return OutboxEvent.objects.create(
+        event_type=event_type,
+        partnership_id=partnership_id,
+        payload=json.loads(json.dumps(payload, cls=DjangoJSONEncoder))
+    )
+
+
+def add_events(event_type, payloads):
+    """Queue one event per {partnership id: payload}, in a single insert"""
+    OutboxEvent.objects.bulk_create([
+        OutboxEvent(
+            event_type=event_type,
+            partnership_id=partnership_id,
+            payload=json.loads(json.dumps(payload, cls=DjangoJSONEncoder))
+        )
+        for partnership_id, payload in payloads.items()
+    ])
+
+
+class Sink:
+    """Receives batches of event payloads; raises if a batch wasn't accepted"""
+
+    def send(self, events):
+        raise NotImplementedError
+
+
+class WebhookSink(Sink):
+    """
+    POSTs {"events": [...]} as JSON. With a secret, the body's HMAC-SHA256
+    is sent in X-OSA-Signature. Any non-2xx status counts as a failure.
+    """
+
+    def __init__(self, url, secret='', timeout=10):
+        self.url = url
+        self.secret = secret
+        self.timeout = timeout
+
+    def send(self, events):
+        body = json.dumps({'events': events}).encode()
+        request = urllib.request.Request(self.url, data=body, method='POST')
+        request.add_header('Content-Type', 'application/json')
+        if self.secret:
+            signature = hmac.new(self.secret.encode(), body, hashlib.sha256).hexdigest()
+            request.add_header('X-OSA-Signature', f'sha256={signature}')
+        # urlopen raises HTTPError for 4xx/5xx
+        with urllib.request.urlopen(request, timeout=self.timeout) as response:
+            response.read()
+
+
+class FileSink(Sink):
+    """Appends one JSON line per event and syncs the file to disk"""
+
+    def __init__(self, path):
+        self.path = path
+
+    def send(self, events):
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(self.path, 'a', encoding='utf-8') as file:
+            for event in events:
+                file.write(json.dumps(event) + '\n')
+            file.flush()
+            os.fsync(file.fileno())
+
+
+class CallableSink(Sink):
+    """Calls a function (or its dotted path) with each batch"""
+
+    def __init__(self, function):
+        self.function = import_string(function) if isinstance(function, str) else function
+
+    def send(self, events):
+        self.function(events)
+
+
+def get_sinks(names=None):
+    """{name: Sink} for the configured sinks, or only `names`"""
+    configured = settings.OUTBOX_SINKS
+    unknown = [name for name in names or [] if name not in configured]
+    if unknown:
+        raise ValueError(f"Unknown outbox sinks: {', '.join(unknown)}")
+
+    sinks = {}
+    for name, options in configured.items():
+        if names and name not in names:
+            continue
+        options = dict(options)
+        sinks[name] = import_string(options.pop('class'))(**options)
+    return sinks
+
+
+def settled(events, last_event_id):
+    """The leading events that can't still have an uncommitted event before them"""
+    horizon = timezone.now() - timedelta(seconds=settings.OUTBOX_SETTLE_SECONDS)
+    expected = last_event_id + 1
+    for index, event in enumerate(events):
+        if event.id != expected and event.created_at > horizon:
+            return events[:index]
+        expected = event.id + 1
+    return events
+
+
+def current_position():
+    """
+    Event position a snapshot taken now covers: just before the first event
+    recent enough to still have an uncommitted one before it
+    """
+    horizon = timezone.now() - timedelta(seconds=settings.OUTBOX_SETTLE_SECONDS)
+    recent = OutboxEvent.objects.filter(created_at__gt=horizon).aggregate(first=Min('id'))['first']
+    if recent is not None:
+        return recent - 1
+    return OutboxEvent.objects.aggregate(last=Max('id'))['last'] or 0
+
+
+def changes_since(position):
+    """
+    (ids of partnerships touched by the settled events after `position`,
+    position after them), or None when events after `position` may have
+    been pruned already
+    """
+    first = OutboxEvent.objects.aggregate(first=Min('id'))['first']
+    if (first is None and position > 0) or (first is not None and position < first - 1):
+        return None
+
+    events = settled(
+        list(OutboxEvent.objects.filter(id__gt=position).order_by('id').only('id', 'partnership_id', 'created_at')),
+        position
+    )
+    if not events:
+        return set(), position
+    return {event.partnership_id for event in events}, events[-1].id
+
+
+def retry_delay(failures):
+    """Seconds to wait before retrying a sink after `failures` failed batches in a row"""
+    return min(
+        settings.OUTBOX_RETRY_BASE_SECONDS * 2 ** min(failures - 1, 20),
+        settings.OUTBOX_RETRY_MAX_SECONDS
+    )
+
+
+def claim(name, token):
+    """
+    Take the sink's lease unless another drainer holds it or the sink is
+    backing off. Returns the cursor, or None if it wasn't claimed.
+    """
+    now = timezone.now()
+    claimed = OutboxCursor.objects.filter(
+        Q(leased_until__isnull=True) | Q(leased_until__lt=now),
+        Q(retry_at__isnull=True) | Q(retry_at__lte=now),
+        sink=name
+    ).update(
+        leased_by=token,
+        leased_until=now + timedelta(seconds=settings.OUTBOX_LEASE_SECONDS),
+        updated_at=now
+    )
+    return OutboxCursor.objects.get(sink=name) if claimed else None
+
+
+def drain_sink(name, sink, batch_size=None, max_batches=None):
+    """
+    Deliver pending events to one sink while holding its lease, so two
+    drainers never deliver to the same sink at once. Returns the number of
+    events delivered; 0 when the sink is leased elsewhere or backing off.
+    """
+    batch_size = batch_size or settings.OUTBOX_BATCH_SIZE
+    OutboxCursor.objects.get_or_create(sink=name)
+    token = uuid.uuid4().hex
+    cursor = claim(name, token)
+    if cursor is None:
+        return 0
+
+    leased = OutboxCursor.objects.filter(sink=name, leased_by=token)
+    delivered = 0
+    batches = 0
+    try:
+        while max_batches is None or batches < max_batches:
+            events = settled(
+                list(OutboxEvent.objects.filter(id__gt=cursor.last_event_id).order_by('id')[:batch_size]),
+                cursor.last_event_id
+            )
+            if not events:
+                break
+            try:
+                sink.send([event_payload(event) for event in events])
+            except Exception as exc:
+                failures = cursor.failures + 1
+                now = timezone.now()
+                leased.update(
+                    failures=failures,
+                    last_error=f'{type(exc).__name__}: {exc}',
+                    retry_at=now + timedelta(seconds=retry_delay(failures)),
+                    updated_at=now
+                )
+                logger.warning(
+                    'Outbox sink %s failed at event %s (%s in a row): %s',
+                    name, events[0].id, failures, exc
+                )
+                break
+
+            now = timezone.now()
+            moved = leased.filter(last_event_id=cursor.last_event_id).update(
+                last_event_id=events[-1].id,
+                failures=0,
+                last_error=None,
+                retry_at=None,
+                leased_until=now + timedelta(seconds=settings.OUTBOX_LEASE_SECONDS),
+                updated_at=now
+            )
+            if not moved:
+                # The lease ran out and another drainer took over, or the
+                # cursor was rewound; either way this batch goes out again
+                logger.warning('Outbox sink %s: lost the cursor lease after event %s', name, events[-1].id)
+                break
+            cursor.last_event_id = events[-1].id
+            cursor.failures = 0
+            delivered += len(events)
+            batches += 1
+    finally:
+        leased.update(leased_by=None, leased_until=None)
+    return delivered
+
+
+def drain(names=None, batch_size=None, max_batches=None):
+    """Drain every configured sink (or `names`); returns {sink: delivered}"""
+    return {
+        name: drain_sink(name, sink, batch_size, max_batches)
+        for name, sink in get_sinks(names).items()
+    }
+
+
+def rewind(name, from_id=None, since=None):
+    """
+    Point a sink's cursor just before event `from_id`, or before the first
+    event created at or after `since`, so the next drain re-delivers from
+    there. Returns the new cursor position.
+    """
+    if since is not None:
+        first = OutboxEvent.objects.filter(created_at__gte=since).aggregate(first=Min('id'))['first']
+        if first is None:
+            first = (OutboxEvent.objects.order_by('-id').values_list('id', flat=True).first() or 0) + 1
+        from_id = first
+    position = max(from_id - 1, 0)
+    # A replay is retried straight away, even if the sink was backing off
+    OutboxCursor.objects.update_or_create(
+        sink=name, defaults={'last_event_id': position, 'failures': 0, 'retry_at': None}
+    )
+    return position
+
+
+def prune(days=None):
+    """
+    Delete events older than OUTBOX_RETENTION_DAYS that every configured
+    sink has received (all of them when no sink is configured), except the
+    newest event. Returns the number deleted.
+    """
+    days = settings.OUTBOX_RETENTION_DAYS if days is None else days
+    newest = OutboxEvent.objects.aggregate(last=Max('id'))['last']
+    events = OutboxEvent.objects.filter(
+        created_at__lt=timezone.now() - timedelta(days=days)
+    ).exclude(id=newest)
+
+    names = list(settings.OUTBOX_SINKS)
+    if names:
+        cursors = dict(OutboxCursor.objects.filter(sink__in=names).values_list('sink', 'last_event_id'))
+        events = events.filter(id__lte=min(cursors.get(name, 0) for name in names))
+    deleted, _ = events.delete()
+    return deleted
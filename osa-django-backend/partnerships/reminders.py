@@ -0,0 +1,156 @@
+"""
+Renewal reminders.
+
+A partnership expiring within one of RENEWAL_REMINDER_DAYS (60, 30 and 7
+days out by default) gets a reminder at each step. The reminder goes to
+the partner's email, addressed to the contact person, and to every active
+user of the owning department. Due partnerships are found with one range
+query on the indexed expiration_date. Messages are grouped per recipient,
+so a department user with ten partnerships coming up gets a single email
+listing all ten. Everything is sent in batches of
+RENEWAL_REMINDER_BATCH_SIZE over one reused mail connection.
+
+Each sent (partnership, expiration date, step, recipient) is stored as a
+RenewalReminder. A re-run only sends what is still missing, and a renewed
+partnership (new expiration date) starts again from the first step.
+"""
+from datetime import timedelta
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.utils import timezone
+from accounts.models import User
+from .models import Partnership, RenewalReminder
+
+REMINDER_STATUSES = ['active', 'for_renewal']
+
+
+def reminder_step(days_left, steps):
+    """The tightest step `days_left` has reached, or None"""
+    due = [step for step in steps if days_left <= step]
+    return min(due) if due else None
+
+
+def due_partnerships(today, steps):
+    """Partnerships expiring between today and the widest step"""
+    return (
+        Partnership.objects.filter(
+            status__in=REMINDER_STATUSES,
+            expiration_date__gte=today,
+            expiration_date__lte=today + timedelta(days=max(steps))
+        )
+        .order_by('expiration_date', 'business_name')
+        .only('id', 'business_name', 'department', 'contact_person', 'email', 'expiration_date')
+    )
+
+
+def department_recipients(departments):
+    """{department: [(email, full_name)]} of active, approved department users"""
+    recipients = {}
+    users = User.objects.filter(
+        role='department', department__in=departments, is_active=True, is_approved=True
+    ).values_list('department', 'email', 'full_name')
+    for department, email, full_name in users:
+        recipients.setdefault(department, []).append((email, full_name))
+    return recipients
+
+
+def pending_reminders(today=None, steps=None):
+    """
+    Reminders not sent yet, grouped by recipient:
+    {email: {'name': str, 'items': [(partnership, step)]}}
+    """
+    today = today or timezone.localdate()
+    steps = steps or settings.RENEWAL_REMINDER_DAYS
+
+    due = []
+    for partnership in due_partnerships(today, steps):
+        step = reminder_step((partnership.expiration_date - today).days, steps)
+        if step is not None:
+            due.append((partnership, step))
+    if not due:
+        return {}
+
+    sent = {
+        (partnership_id, expiration_date, step, recipient.lower())
+        for partnership_id, expiration_date, step, recipient in RenewalReminder.objects.filter(
+            partnership_id__in=[partnership.id for partnership, _ in due]
+        ).values_list('partnership_id', 'expiration_date', 'days_before', 'recipient')
+    }
+    by_department = department_recipients({partnership.department for partnership, _ in due})
+
+    groups = {}
+    for partnership, step in due:
+        recipients = [(partnership.email, partnership.contact_person)]
+        recipients += by_department.get(partnership.department, [])
+        for email, name in recipients:
+            key = email.lower()
+            if (partnership.id, partnership.expiration_date, step, key) in sent:
+                continue
+            group = groups.setdefault(key, {'email': email, 'name': name, 'items': []})
+            # A user can be both the partner contact and in the department
+            if (partnership, step) not in group['items']:
+                group['items'].append((partnership, step))
+    return groups
+
+
+def build_message(group, today, connection=None):
+    items = group['items']
+    if len(items) == 1:
+        subject = f'Partnership renewal: {items[0][0].business_name} expires on {items[0][0].expiration_date:%B %d, %Y}'
+    else:
+        subject = f'{len(items)} partnerships are due for renewal'
+
+    lines = [f"Dear {group['name']},", '', 'The following partnerships are due for renewal:', '']
+    for partnership, _ in items:
+        days_left = (partnership.expiration_date - today).days
+        lines.append(
+            f'- {partnership.business_name} ({partnership.department}): expires on '
+            f'{partnership.expiration_date:%B %d, %Y}, in {days_left} day(s)'
+        )
+    lines += ['', 'Please get in touch with the OSA office to arrange the renewal.']
+
+    return EmailMessage(
+        subject=subject,
+        body='\n'.join(lines),
+        from_email=settings.DEFAULT_FROM_EMAIL,
+        to=[group['email']],
+        connection=connection
+    )
+
+
+def send_reminders(today=None, steps=None, batch_size=None, dry_run=False, progress=None):
+    """
+    Send every pending reminder and record it. Batches go out over a
+    single connection; a batch is recorded once the backend accepted it,
+    so a failure part-way leaves the rest for the next run. Returns counts
+    of recipients messaged and reminders recorded.
+    """
+    today = today or timezone.localdate()
+    batch_size = batch_size or settings.RENEWAL_REMINDER_BATCH_SIZE
+    groups = list(pending_reminders(today, steps).values())
+    result = {
+        'recipients': len(groups),
+        'reminders': sum(len(group['items']) for group in groups),
+        'sent': 0,
+    }
+    if dry_run or not groups:
+        return result
+
+    with get_connection() as connection:
+        for start in range(0, len(groups), batch_size):
+            batch = groups[start:start + batch_size]
+            connection.send_messages([build_message(group, today, connection) for group in batch])
+            RenewalReminder.objects.bulk_create([
+                RenewalReminder(
+                    partnership=partnership,
+                    expiration_date=partnership.expiration_date,
+                    days_before=step,
+                    recipient=group['email'].lower()
+                )
+                for group in batch
+                for partnership, step in group['items']
+            ], ignore_conflicts=True)
+            result['sent'] += len(batch)
+            if progress:
+                progress(result['sent'], len(groups))
+    return result
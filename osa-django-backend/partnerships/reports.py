@@ -0,0 +1,259 @@
+"""
+End-of-school-year partnership reports, one file per department.
+
+Each department's report is rendered in its own ProcessPoolExecutor worker
+with its own database connection, streaming rows from `.iterator()`.
+A report is only rebuilt when its inputs changed: the fingerprint covers
+the row count, the id sum and the latest `updated_at` of the department's
+partnerships for that school year. Archived partnerships are included, so
+archiving rows neither changes a report nor invalidates it.
+
+Reports are written as XLSX or CSV, and as PDF when reportlab is
+installed. Reports list partner contact details, so files go to private storage under
+REPORTS_ROOT with an unguessable name and are only served through the
+authenticated download endpoint.
+"""
+import csv
+import hashlib
+import multiprocessing
+import os
+import re
+import secrets
+import tempfile
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from xml.sax.saxutils import escape
+import django
+import openpyxl
+from django.core.files import File
+from django.db import connections
+from django.db.models import Count, Max, Sum
+from .models import ArchivedPartnership, Partnership, PartnershipReport, report_storage
+
+try:
+    from reportlab.lib import colors
+    from reportlab.lib.pagesizes import A4, landscape
+    from reportlab.lib.styles import getSampleStyleSheet
+    from reportlab.platypus import LongTable, Paragraph, SimpleDocTemplate, TableStyle
+except ImportError:  # pragma: no cover - optional dependency
+    SimpleDocTemplate = None
+
+REPORT_COLUMNS = [
+    ('business_name', 'Business Name'),
+    ('address', 'Address'),
+    ('contact_person', 'Contact Person'),
+    ('manager_supervisor_1', 'Manager/Supervisor 1'),
+    ('manager_supervisor_2', 'Manager/Supervisor 2'),
+    ('email', 'Email'),
+    ('contact_number', 'Contact Number'),
+    ('date_established', 'Date Established'),
+    ('expiration_date', 'Expiration Date'),
+    ('status', 'Status'),
+    ('remarks', 'Remarks'),
+]
+
+STATUS_LABELS = dict(Partnership.STATUS_CHOICES)
+
+
+def available_formats():
+    return ['xlsx', 'pdf', 'csv'] if SimpleDocTemplate is not None else ['xlsx', 'csv']
+
+
+def valid_school_year(value):
+    """True for 'YYYY-YYYY' spanning consecutive years, the format Partnership.save writes"""
+    match = re.fullmatch(r'(\d{4})-(\d{4})', value or '')
+    return bool(match) and int(match.group(2)) == int(match.group(1)) + 1
+
+
+def can_download(user, report):
+    """Same scoping as the partnership API: admins see every department, department users their own"""
+    return user.role == 'admin' or (user.role == 'department' and report.department == user.department)
+
+
+def department_fingerprints(school_year):
+    """{department: fingerprint} for every department, in one grouped query"""
+    stats = {}
+    for model in (Partnership, ArchivedPartnership):
+        rows = (
+            model.objects.order_by()
+            .filter(school_year=school_year)
+            .values('department')
+            .annotate(count=Count('id'), id_sum=Sum('id'), last_updated=Max('updated_at'))
+        )
+        for row in rows:
+            merged = stats.setdefault(row['department'], {'count': 0, 'id_sum': 0, 'last_updated': None})
+            merged['count'] += row['count']
+            merged['id_sum'] += row['id_sum']
+            if merged['last_updated'] is None or row['last_updated'] > merged['last_updated']:
+                merged['last_updated'] = row['last_updated']
+
+    fingerprints = {}
+    for department, _ in Partnership.DEPARTMENT_CHOICES:
+        row = stats.get(department, {})
+        raw = f"{school_year}|{row.get('count', 0)}|{row.get('id_sum', 0)}|{row.get('last_updated')}"
+        fingerprints[department] = hashlib.sha256(raw.encode()).hexdigest()
+    return fingerprints
+
+
+def report_file_exists(report):
+    return bool(report.file) and report.file.storage.exists(report.file.name)
+
+
+def _report_rows(department, school_year):
+    fields = [name for name, _ in REPORT_COLUMNS]
+    rows = (
+        Partnership.objects.filter(department=department, school_year=school_year)
+        .order_by()
+        .values_list(*fields)
+        .union(
+            ArchivedPartnership.objects.filter(department=department, school_year=school_year)
+            .order_by()
+            .values_list(*fields),
+            all=True
+        )
+        .order_by('business_name')
+        .iterator(chunk_size=500)
+    )
+    status_index = fields.index('status')
+    for row in rows:
+        row = list(row)
+        row[status_index] = STATUS_LABELS.get(row[status_index], row[status_index])
+        yield row
+
+
+def _write_csv(path, rows):
+    with open(path, 'w', newline='', encoding='utf-8') as handle:
+        writer = csv.writer(handle)
+        writer.writerow([label for _, label in REPORT_COLUMNS])
+        count = 0
+        for row in rows:
+            writer.writerow(row)
+            count += 1
+    return count
+
+
+def _write_xlsx(path, rows, title):
+    # write_only mode streams rows to disk instead of building the sheet in memory
+    workbook = openpyxl.Workbook(write_only=True)
+    sheet = workbook.create_sheet(title=title[:31])
+    sheet.append([label for _, label in REPORT_COLUMNS])
+    count = 0
+    for row in rows:
+        sheet.append(row)
+        count += 1
+    workbook.save(path)
+    return count
+
+
+def _write_pdf(path, rows, title):
+    # Unlike the other formats the table is laid out in memory, which a
+    # department's partnerships for one school year easily fit
+    styles = getSampleStyleSheet()
+    cell = styles['BodyText'].clone('ReportCell', fontSize=7, leading=8.5)
+    heading = cell.clone('ReportHeading', fontName='Helvetica-Bold')
+    document = SimpleDocTemplate(
+        path, pagesize=landscape(A4), title=title,
+        leftMargin=24, rightMargin=24, topMargin=24, bottomMargin=24
+    )
+
+    data = [[Paragraph(escape(label), heading) for _, label in REPORT_COLUMNS]]
+    for row in rows:
+        data.append([Paragraph(escape('' if value is None else str(value)), cell) for value in row])
+
+    table = LongTable(data, colWidths=document.width / len(REPORT_COLUMNS), repeatRows=1)
+    table.setStyle(TableStyle([
+        ('GRID', (0, 0), (-1, -1), 0.25, colors.grey),
+        ('BACKGROUND', (0, 0), (-1, 0), colors.lightgrey),
+        ('VALIGN', (0, 0), (-1, -1), 'TOP'),
+    ]))
+    document.build([Paragraph(escape(title), styles['Title']), table])
+    return len(data) - 1
+
+
+def _init_worker():
+    django.setup()
+    connections.close_all()
+
+
+def render_department_report(department, school_year, fmt):
+    """
+    Runs in a worker process: render one department's report to storage
+    and return (storage name, row count).
+    """
+    try:
+        fd, path = tempfile.mkstemp(suffix=f'.{fmt}')
+        os.close(fd)
+        try:
+            rows = _report_rows(department, school_year)
+            if fmt == 'xlsx':
+                count = _write_xlsx(path, rows, f'{department} {school_year}')
+            elif fmt == 'pdf':
+                count = _write_pdf(path, rows, f'{department} partnerships {school_year}')
+            else:
+                count = _write_csv(path, rows)
+
+            name = f'{school_year}/{department}-{secrets.token_urlsafe(16)}.{fmt}'
+            with open(path, 'rb') as handle:
+                name = report_storage().save(name, File(handle))
+            return name, count
+        finally:
+            os.remove(path)
+    finally:
+        connections.close_all()
+
+
+def generate_reports(school_year, fmt, departments=None, max_workers=None, progress=None):
+    """
+    Build (or reuse) the per-department reports for a school year and return
+    the PartnershipReport rows. `progress` is called with 0-100 as
+    departments finish.
+    """
+    if not valid_school_year(school_year):
+        raise ValueError(f'Invalid school year {school_year!r}; expected e.g. 2024-2025')
+
+    departments = departments or [code for code, _ in Partnership.DEPARTMENT_CHOICES]
+    fingerprints = department_fingerprints(school_year)
+    existing = {
+        report.department: report
+        for report in PartnershipReport.objects.filter(school_year=school_year, format=fmt)
+    }
+
+    stale = [
+        department for department in departments
+        if department not in existing
+        or existing[department].fingerprint != fingerprints[department]
+        or not report_file_exists(existing[department])
+    ]
+
+    if stale:
+        # Children must open their own connections, never share the parent's
+        connections.close_all()
+        workers = min(len(stale), max_workers or os.cpu_count() or 1)
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context('spawn'),
+            initializer=_init_worker
+        ) as executor:
+            futures = {
+                executor.submit(render_department_report, department, school_year, fmt): department
+                for department in stale
+            }
+            for done, future in enumerate(as_completed(futures), start=1):
+                department = futures[future]
+                name, count = future.result()
+
+                report = existing.get(department) or PartnershipReport(
+                    department=department, school_year=school_year, format=fmt
+                )
+                previous = report.file.name
+                report.file.name = name
+                report.fingerprint = fingerprints[department]
+                report.row_count = count
+                report.save()
+                existing[department] = report
+                if previous and report.file.storage.exists(previous):
+                    report.file.storage.delete(previous)
+
+                if progress:
+                    progress(done * 100 // len(stale))
+
+    return [existing[department] for department in departments]
@@ -1,7 +1,13 @@
+from django.conf import settings
+from django.urls import reverse
 from rest_framework import serializers
-from .models import Partnership, AuditLog
+from osa_backend.utils import SparseFieldsMixin
+from .models import Partnership, AuditLog, PartnershipReport
+from .reports import can_download
+
+class PartnershipSerializer(SparseFieldsMixin, serializers.ModelSerializer):
+    field_sources = {'image_url': ['image']}
 
-class PartnershipSerializer(serializers.ModelSerializer):
     image_url = serializers.SerializerMethodField()
     
     image = serializers.ImageField(required=False, allow_null=True)
@@ -13,9 +19,9 @@ class PartnershipSerializer(serializers.ModelSerializer):
             'contact_person', 'manager_supervisor_1', 'manager_supervisor_2',
             'email', 'contact_number', 'date_established', 'expiration_date',
             'school_year', 'status', 'remarks', 'image', 'image_url',
-            'created_at', 'updated_at'
+            'created_at', 'updated_at', 'version'
         ]
-        read_only_fields = ['id', 'created_at', 'updated_at', 'image_url']
+        read_only_fields = ['id', 'created_at', 'updated_at', 'image_url', 'version']
 
         extra_kwargs = {
             'manager_supervisor_2': {'required': False, 'allow_blank': True, 'allow_null': True},
@@ -30,6 +36,13 @@ class PartnershipSerializer(serializers.ModelSerializer):
                 return request.build_absolute_uri(obj.image.url)
         return None
     
+    def validate_image(self, image):
+        if image and image.size > settings.PARTNERSHIP_IMAGE_MAX_SIZE:
+            raise serializers.ValidationError(
+                f'Image must be at most {settings.PARTNERSHIP_IMAGE_MAX_SIZE} bytes'
+            )
+        return image
+    
     def validate(self, attrs):
         date_established = attrs.get('date_established')
         expiration_date = attrs.get('expiration_date')
@@ -48,8 +61,10 @@ class PartnershipSerializer(serializers.ModelSerializer):
         
         return attrs
 
-class PartnershipLimitedSerializer(serializers.ModelSerializer):
+class PartnershipLimitedSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     """Limited serializer for viewers and other departments"""
+    field_sources = {'image_url': ['image']}
+
     image_url = serializers.SerializerMethodField()
     
     class Meta:
@@ -76,4 +91,21 @@ class AuditLogSerializer(serializers.ModelSerializer):
             'id', 'user', 'user_email', 'user_name', 'action',
             'table_name', 'record_id', 'old_values', 'new_values', 'created_at'
         ]
-        read_only_fields = ['id', 'created_at']
\ No newline at end of file
+        read_only_fields = ['id', 'created_at']
+
+class PartnershipReportSerializer(serializers.ModelSerializer):
+    file_url = serializers.SerializerMethodField()
+
+    class Meta:
+        model = PartnershipReport
+        fields = [
+            'id', 'department', 'school_year', 'format', 'row_count',
+            'file_url', 'created_at', 'updated_at'
+        ]
+
+    def get_file_url(self, obj):
+        """Authenticated download link, for users allowed to fetch this report"""
+        request = self.context.get('request')
+        if obj.file and request and can_download(request.user, obj):
+            return request.build_absolute_uri(reverse('partnerships:report-download', args=[obj.pk]))
+        return None
\ No newline at end of file
@@ -0,0 +1,21 @@
+from jobs.queue import task
+from .reminders import send_reminders
+from .reports import generate_reports
+
+
+@task('partnerships.generate_reports')
+def generate_reports_task(job):
+    """Build the per-department reports for a school year"""
+    reports = generate_reports(
+        job.payload['school_year'],
+        job.payload['format'],
+        departments=job.payload.get('departments'),
+        progress=job.set_progress
+    )
+    return {'reports': [report.id for report in reports]}
+
+
+@task('partnerships.send_renewal_reminders')
+def send_renewal_reminders_task(job):
+    """Send the renewal reminders that are due today"""
+    return send_reminders(progress=lambda sent, total: job.set_progress(sent * 100 / total))
@@ -1,3 +1,362 @@
-from django.test import TestCase
+import os
+import tempfile
+from datetime import date
+from django.test import SimpleTestCase, TestCase, override_settings
+from rest_framework.test import APIClient
+from accounts.authentication import JWTAuthentication
+from accounts.models import User
+from .admin import PartnershipAdminForm
+from .archive import archive_batch, restore
+from .duplicates import find_duplicates, index_partnership
+from .models import ArchivedPartnership, AuditLog, OutboxCursor, OutboxEvent, Partnership, VersionConflict
+from .outbox import CallableSink, add_event, drain_sink
+from .reports import REPORT_COLUMNS, _write_csv, _write_pdf, _write_xlsx, available_formats
 
-# Create your tests here.
+
+def create_partnership(user, **values):
+    fields = {
+        'business_name': 'Acme Widgets',
+        'department': 'CET',
+        'address': 'Cebu City',
+        'contact_person': 'Ana Cruz',
+        'manager_supervisor_1': 'Ben Reyes',
+        'email': 'hr@acme.example.com',
+        'contact_number': '09170000000',
+        'date_established': date(2024, 9, 1),
+        'expiration_date': date(2027, 9, 1),
+        'school_year': '2024-2025',
+        'created_by': user,
+    }
+    fields.update(values)
+    return Partnership.objects.create(**fields)
+
+
+class ConditionalWriteTests(TestCase):
+    def setUp(self):
+        self.admin = User.objects.create_superuser('admin@example.com', 'Adm1n-passw0rd!', full_name='Admin')
+        self.partnership = create_partnership(self.admin)
+        self.url = f'/api/partnerships/{self.partnership.pk}/'
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {JWTAuthentication.generate_token(self.admin)}')
+
+    def test_put_with_current_version_applies_and_bumps_it(self):
+        response = self.client.put(self.url, {'remarks': 'Renewed'}, format='json', HTTP_IF_MATCH='"1"')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['ETag'], '"2"')
+        self.partnership.refresh_from_db()
+        self.assertEqual((self.partnership.remarks, self.partnership.version), ('Renewed', 2))
+
+    def test_put_with_stale_version_is_refused_with_current_state(self):
+        self.client.put(self.url, {'remarks': 'First'}, format='json', HTTP_IF_MATCH='"1"')
+
+        response = self.client.put(self.url, {'remarks': 'Second'}, format='json', HTTP_IF_MATCH='"1"')
+
+        self.assertEqual(response.status_code, 412)
+        self.assertEqual(response['ETag'], '"2"')
+        self.assertEqual(response.data['data']['remarks'], 'First')
+        self.partnership.refresh_from_db()
+        self.assertEqual(self.partnership.remarks, 'First')
+
+    def test_delete_with_stale_version_keeps_the_row(self):
+        self.client.put(self.url, {'remarks': 'Edited'}, format='json')
+
+        response = self.client.delete(self.url, HTTP_IF_MATCH='"1"')
+
+        self.assertEqual(response.status_code, 412)
+        self.assertTrue(Partnership.objects.filter(pk=self.partnership.pk).exists())
+
+    def test_delete_with_current_version(self):
+        response = self.client.delete(self.url, HTTP_IF_MATCH='"1"')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(Partnership.objects.filter(pk=self.partnership.pk).exists())
+
+    def test_save_of_a_stale_instance_raises_version_conflict(self):
+        first = Partnership.objects.get(pk=self.partnership.pk)
+        second = Partnership.objects.get(pk=self.partnership.pk)
+        first.remarks = 'First'
+        first.save()
+
+        second.remarks = 'Second'
+        with self.assertRaises(VersionConflict):
+            second.save()
+
+
+class FacetTests(TestCase):
+    def setUp(self):
+        self.admin = User.objects.create_superuser('admin@example.com', 'Adm1n-passw0rd!', full_name='Admin')
+        create_partnership(self.admin, business_name='Acme Widgets')
+        create_partnership(self.admin, business_name='Bolt Logistics', status='for_renewal')
+        create_partnership(self.admin, business_name='Cobalt Foods', department='CAS', school_year='2023-2024')
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {JWTAuthentication.generate_token(self.admin)}')
+
+    def facets(self, **params):
+        response = self.client.get('/api/partnerships/', params)
+        self.assertEqual(response.status_code, 200)
+        return response.data.get('facets')
+
+    def test_facets_are_opt_in(self):
+        self.assertIsNone(self.facets())
+        self.assertIsNone(self.facets(facets='unknown'))
+
+    def test_counts_per_value_over_the_filtered_list(self):
+        self.assertEqual(self.facets(facets='department,status'), {
+            'department': {'CET': 2, 'CAS': 1},
+            'status': {'active': 2, 'for_renewal': 1},
+        })
+        self.assertEqual(
+            self.facets(facets='status,school_year', department='CET'),
+            {'status': {'active': 1, 'for_renewal': 1}, 'school_year': {'2024-2025': 2}}
+        )
+
+    def test_archived_rows_count_only_when_included(self):
+        archive_batch(Partnership.objects.filter(department='CAS'))
+
+        self.assertEqual(self.facets(facets='department'), {'department': {'CET': 2}})
+        self.assertEqual(
+            self.facets(facets='department', include_archived='true'),
+            {'department': {'CET': 2, 'CAS': 1}}
+        )
+
+
+class PartnershipAdminTests(TestCase):
+    def setUp(self):
+        self.admin = User.objects.create_superuser('admin@example.com', 'Adm1n-passw0rd!', full_name='Admin')
+        self.partnership = create_partnership(self.admin)
+        self.url = f'/admin/partnerships/partnership/{self.partnership.pk}/change/'
+        self.client.force_login(self.admin)
+
+    def form_data(self, **values):
+        """The change form as opened now, with `values` edited"""
+        initial = PartnershipAdminForm(instance=Partnership.objects.get(pk=self.partnership.pk)).initial
+        data = {name: value for name, value in initial.items() if value is not None and name != 'image'}
+        data['seen_version'] = initial['version']
+        data.update(values)
+        return data
+
+    def test_edit_is_audited_and_bumps_the_version(self):
+        response = self.client.post(self.url, self.form_data(remarks='Renewed'))
+
+        self.assertEqual(response.status_code, 302)
+        self.partnership.refresh_from_db()
+        self.assertEqual((self.partnership.remarks, self.partnership.version), ('Renewed', 2))
+        self.assertEqual(AuditLog.objects.get(action='UPDATE').record_id, self.partnership.pk)
+
+    def test_saving_over_a_later_edit_is_refused(self):
+        stale = self.form_data(remarks='Mine')
+        self.client.post(self.url, self.form_data(remarks='Theirs'))
+
+        response = self.client.post(self.url, stale, follow=True)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'Someone else changed this partnership')
+        self.partnership.refresh_from_db()
+        self.assertEqual((self.partnership.remarks, self.partnership.version), ('Theirs', 2))
+        self.assertEqual(AuditLog.objects.filter(action='UPDATE').count(), 1)
+
+
+class ArchiveTests(TestCase):
+    def setUp(self):
+        self.admin = User.objects.create_superuser('admin@example.com', 'Adm1n-passw0rd!', full_name='Admin')
+        self.partnership = create_partnership(self.admin, status='terminated')
+        index_partnership(self.partnership)
+        self.created_at = self.partnership.created_at
+
+    def test_archived_partner_still_counts_as_a_duplicate(self):
+        archive_batch(Partnership.objects.filter(pk=self.partnership.pk))
+
+        self.assertFalse(Partnership.objects.filter(pk=self.partnership.pk).exists())
+        matches = find_duplicates(business_name='Acme Widgets')
+        self.assertEqual([(match['id'], match['archived']) for match in matches], [(self.partnership.pk, True)])
+
+    def test_restore_keeps_the_row_and_audits_it(self):
+        archive_batch(Partnership.objects.filter(pk=self.partnership.pk))
+
+        self.assertEqual(restore([self.partnership.pk], user=self.admin), [self.partnership.pk])
+
+        restored = Partnership.objects.get(pk=self.partnership.pk)
+        self.assertEqual((restored.business_name, restored.created_at), ('Acme Widgets', self.created_at))
+        self.assertFalse(ArchivedPartnership.objects.exists())
+        log = AuditLog.objects.get(action='RESTORE')
+        self.assertEqual((log.user, log.record_id, log.new_values['business_name']), (self.admin, restored.pk, 'Acme Widgets'))
+        self.assertEqual(OutboxEvent.objects.latest('id').event_type, 'partnership.restored')
+        self.assertEqual(find_duplicates(business_name='Acme Widgets')[0]['archived'], False)
+
+    def test_restoring_unknown_ids_does_nothing(self):
+        self.assertEqual(restore([self.partnership.pk + 1], user=self.admin), [])
+        self.assertFalse(AuditLog.objects.filter(action='RESTORE').exists())
+
+
+@override_settings(OUTBOX_SETTLE_SECONDS=0)
+class SyncTests(TestCase):
+    def setUp(self):
+        self.admin = User.objects.create_superuser('admin@example.com', 'Adm1n-passw0rd!', full_name='Admin')
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {JWTAuthentication.generate_token(self.admin)}')
+        self.kept = self.create('Acme Widgets')
+        self.edited = self.create('Bolt Logistics')
+        self.removed = self.create('Cobalt Foods')
+
+    def create(self, name):
+        response = self.client.post('/api/partnerships/', {
+            'business_name': name,
+            'department': 'CET',
+            'address': 'Cebu City',
+            'contact_person': 'Ana Cruz',
+            'manager_supervisor_1': 'Ben Reyes',
+            'email': f'hr@{name.split()[0].lower()}.example.com',
+            'contact_number': '09170000000',
+            'date_established': '2024-09-01',
+            'expiration_date': '2027-09-01',
+            'school_year': '2024-2025',
+        }, format='json')
+        self.assertEqual(response.status_code, 201, response.data)
+        return response.data['data']['id']
+
+    def sync(self, since=None):
+        response = self.client.get('/api/partnerships/sync', {'since': since} if since is not None else {})
+        self.assertEqual(response.status_code, 200)
+        return response.data['data']
+
+    def test_changes_and_tombstones_since_a_token(self):
+        full = self.sync()
+        self.assertTrue(full['full'])
+        self.assertEqual(len(full['changed']), 3)
+
+        self.client.put(f'/api/partnerships/{self.edited}/', {'remarks': 'Renewed'}, format='json')
+        self.client.delete(f'/api/partnerships/{self.removed}/')
+        delta = self.sync(full['next_since'])
+
+        self.assertFalse(delta['full'])
+        self.assertEqual([row['id'] for row in delta['changed']], [self.edited])
+        self.assertEqual(delta['deleted'], [self.removed])
+        self.assertEqual(self.sync(delta['next_since']), dict(delta, changed=[], deleted=[]))
+
+    def test_archived_partnership_is_a_tombstone_unless_archive_is_synced(self):
+        token = self.sync()['next_since']
+        archive_batch(Partnership.objects.filter(pk=self.kept))
+
+        self.assertEqual(self.sync(token)['deleted'], [self.kept])
+        response = self.client.get('/api/partnerships/sync', {'since': token, 'include_archived': 'true'})
+        self.assertEqual([row['id'] for row in response.data['data']['changed']], [self.kept])
+
+    @override_settings(OUTBOX_SETTLE_SECONDS=60)
+    def test_change_committed_late_is_not_skipped(self):
+        position = OutboxEvent.objects.latest('id').id
+        # Event position+1 belongs to a transaction that hasn't committed yet
+        OutboxEvent.objects.create(id=position + 2, event_type='partnership.updated', partnership_id=self.edited, payload={})
+
+        delta = self.sync(position)
+        self.assertEqual((delta['changed'], delta['next_since']), ([], str(position)))
+
+        OutboxEvent.objects.create(id=position + 1, event_type='partnership.updated', partnership_id=self.kept, payload={})
+        delta = self.sync(position)
+        self.assertEqual(sorted(row['id'] for row in delta['changed']), [self.kept, self.edited])
+        self.assertEqual(delta['next_since'], str(position + 2))
+
+    def test_token_from_before_the_retention_window_gets_a_full_resync(self):
+        first = OutboxEvent.objects.earliest('id').id
+        OutboxEvent.objects.filter(id=first).delete()
+
+        self.assertTrue(self.sync(first - 1)['full'])
+
+    def test_invalid_tokens_are_rejected(self):
+        for token in ('2024-13-45T00:00:00', '2024-09-01T00:00:00+00:00', '-1', 'abc'):
+            response = self.client.get('/api/partnerships/sync', {'since': token})
+            self.assertEqual(response.status_code, 400, token)
+            self.assertEqual(response.data['message'], 'Invalid since token')
+
+
+@override_settings(OUTBOX_SETTLE_SECONDS=0, OUTBOX_RETRY_BASE_SECONDS=0)
+class OutboxDeliveryTests(TestCase):
+    def setUp(self):
+        self.partnership = create_partnership(None)
+        self.events = [
+            add_event('partnership.updated', self.partnership.pk, {'n': n}) for n in range(5)
+        ]
+        self.received = []
+
+    def test_events_are_delivered_once_in_id_order_across_batches(self):
+        sink = CallableSink(lambda events: self.received.extend(event['id'] for event in events))
+
+        delivered = drain_sink('test', sink, batch_size=2)
+
+        ids = [event.id for event in self.events]
+        self.assertEqual(delivered, 5)
+        self.assertEqual(self.received, ids)
+        self.assertEqual(OutboxCursor.objects.get(sink='test').last_event_id, ids[-1])
+        self.assertEqual(drain_sink('test', sink, batch_size=2), 0)
+
+    def test_failed_batch_is_delivered_again(self):
+        calls = []
+
+        def flaky(events):
+            calls.append(len(calls))
+            self.received.extend(event['id'] for event in events)
+            # The second batch reaches the sink but isn't acknowledged
+            if len(calls) == 2:
+                raise ConnectionError('connection reset')
+
+        sink = CallableSink(flaky)
+        with self.assertLogs('partnerships.outbox', 'WARNING'):
+            self.assertEqual(drain_sink('test', sink, batch_size=2), 2)
+        cursor = OutboxCursor.objects.get(sink='test')
+        self.assertEqual((cursor.failures, cursor.leased_by), (1, None))
+
+        self.assertEqual(drain_sink('test', sink, batch_size=2), 3)
+
+        ids = [event.id for event in self.events]
+        self.assertEqual(self.received, ids[:4] + ids[2:])
+        cursor.refresh_from_db()
+        self.assertEqual((cursor.last_event_id, cursor.failures, cursor.last_error), (ids[-1], 0, None))
+
+    @override_settings(OUTBOX_RETRY_BASE_SECONDS=60)
+    def test_failing_sink_backs_off(self):
+        def down(events):
+            raise ConnectionError('connection refused')
+
+        with self.assertLogs('partnerships.outbox', 'WARNING'):
+            drain_sink('test', CallableSink(down))
+        sink = CallableSink(lambda events: self.received.extend(events))
+
+        self.assertEqual(drain_sink('test', sink), 0)
+        self.assertEqual(self.received, [])
+
+    def test_partnership_update_queues_an_event(self):
+        admin = User.objects.create_superuser('admin@example.com', 'Adm1n-passw0rd!', full_name='Admin')
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f'Bearer {JWTAuthentication.generate_token(admin)}')
+
+        client.put(f'/api/partnerships/{self.partnership.pk}/', {'status': 'for_renewal'}, format='json')
+
+        event = OutboxEvent.objects.latest('id')
+        self.assertEqual((event.event_type, event.partnership_id), ('partnership.updated', self.partnership.pk))
+        self.assertEqual(event.payload['new_values']['status'], 'for_renewal')
+
+
+class ReportWriterTests(SimpleTestCase):
+    rows = [
+        ['Acme & Sons <Cebu>', 'Cebu City', 'Ana Cruz', 'Ben Reyes', None, 'hr@acme.example.com',
+         '09170000000', date(2024, 9, 1), date(2027, 9, 1), 'Active', None],
+    ] * 3
+
+    def write(self, writer, suffix, *args):
+        fd, path = tempfile.mkstemp(suffix=suffix)
+        os.close(fd)
+        self.addCleanup(os.remove, path)
+        count = writer(path, iter(self.rows), *args)
+        with open(path, 'rb') as handle:
+            return count, handle.read()
+
+    def test_every_format_writes_every_row(self):
+        self.assertEqual(len(self.rows[0]), len(REPORT_COLUMNS))
+        self.assertEqual(self.write(_write_csv, '.csv')[0], 3)
+        count, content = self.write(_write_xlsx, '.xlsx', 'CET 2024-2025')
+        self.assertEqual((count, content[:2]), (3, b'PK'))
+
+        if 'pdf' not in available_formats():
+            self.skipTest('reportlab is not installed')
+        count, content = self.write(_write_pdf, '.pdf', 'CET partnerships 2024-2025')
+        self.assertEqual((count, content[:5]), (3, b'%PDF-'))
@@ -0,0 +1,196 @@
+"""
+Chunked, resumable partnership image uploads.
+
+Protocol: init (declares name, size and optional SHA-256), upload chunk N
+as a raw request body, complete. Chunks are written straight into a
+preallocated temp file at their offset, so nothing larger than one read
+buffer is held in memory and chunks may arrive in any order or be retried.
+On completion the file is checked (size, checksum, image header via Pillow)
+and attached to `Partnership.image`.
+"""
+import hashlib
+import os
+import tempfile
+from datetime import timedelta
+from django.conf import settings
+from django.core.files import File
+from django.db import IntegrityError
+from django.utils import timezone
+from PIL import Image, UnidentifiedImageError
+from .models import ImageUpload, ImageUploadChunk
+
+ALLOWED_EXTENSIONS = {'jpg', 'jpeg', 'png', 'gif', 'webp'}
+ALLOWED_FORMATS = {'JPEG', 'PNG', 'GIF', 'WEBP'}
+READ_BUFFER_SIZE = 64 * 1024
+
+
+class UploadError(Exception):
+    def __init__(self, message, status_code=400):
+        super().__init__(message)
+        self.message = message
+        self.status_code = status_code
+
+
+def temp_path(upload):
+    directory = os.path.join(settings.FILE_UPLOAD_TEMP_DIR or tempfile.gettempdir(), 'osa_image_uploads')
+    os.makedirs(directory, exist_ok=True)
+    return os.path.join(directory, f'{upload.upload_id}.part')
+
+
+def discard(upload):
+    try:
+        os.remove(temp_path(upload))
+    except FileNotFoundError:
+        pass
+
+
+def purge_expired():
+    """Remove abandoned uploads and their temp files"""
+    cutoff = timezone.now() - timedelta(hours=settings.IMAGE_UPLOAD_EXPIRY_HOURS)
+    for upload in ImageUpload.objects.filter(status='pending', updated_at__lt=cutoff):
+        discard(upload)
+        upload.delete()
+
+
+def start_upload(partnership, user, filename, size, checksum=None):
+    extension = filename.rsplit('.', 1)[-1].lower() if '.' in filename else ''
+    if extension not in ALLOWED_EXTENSIONS:
+        raise UploadError(f"File type must be one of: {', '.join(sorted(ALLOWED_EXTENSIONS))}")
+
+    if size <= 0:
+        raise UploadError('File size must be greater than zero')
+
+    if size > settings.PARTNERSHIP_IMAGE_MAX_SIZE:
+        raise UploadError(
+            f'Image must be at most {settings.PARTNERSHIP_IMAGE_MAX_SIZE} bytes',
+            status_code=413
+        )
+
+    purge_expired()
+
+    upload = ImageUpload.objects.create(
+        partnership=partnership,
+        user=user,
+        filename=os.path.basename(filename),
+        total_size=size,
+        chunk_size=settings.IMAGE_UPLOAD_CHUNK_SIZE,
+        checksum=(checksum or '').lower() or None,
+    )
+
+    # Preallocate so chunks can be written at their offsets in any order
+    with open(temp_path(upload), 'wb') as handle:
+        handle.truncate(size)
+
+    return upload
+
+
+def write_chunk(upload, index, stream, content_length, checksum=None):
+    """Stream one chunk from the request body into the temp file"""
+    if upload.status != 'pending':
+        raise UploadError('Upload is already completed', status_code=409)
+
+    if index >= upload.chunk_count:
+        raise UploadError('Chunk index out of range')
+
+    expected = upload.expected_chunk_size(index)
+    # Reject on the declared length before reading any of the body
+    if content_length is not None and content_length != expected:
+        status_code = 413 if content_length > expected else 400
+        raise UploadError(f'Chunk {index} must be {expected} bytes', status_code=status_code)
+
+    digest = hashlib.sha256()
+    received = 0
+    with open(temp_path(upload), 'r+b') as handle:
+        handle.seek(index * upload.chunk_size)
+        while received <= expected:
+            block = stream.read(min(READ_BUFFER_SIZE, expected + 1 - received))
+            if not block:
+                break
+            received += len(block)
+            if received > expected:
+                raise UploadError(f'Chunk {index} must be {expected} bytes', status_code=413)
+            digest.update(block)
+            handle.write(block)
+
+    if received != expected:
+        raise UploadError(f'Chunk {index} must be {expected} bytes')
+
+    digest = digest.hexdigest()
+    if checksum and checksum.lower() != digest:
+        raise UploadError(f'Checksum mismatch for chunk {index}')
+
+    try:
+        ImageUploadChunk.objects.update_or_create(
+            upload=upload, index=index,
+            defaults={'size': received, 'checksum': digest}
+        )
+    except IntegrityError:
+        # Same chunk retried concurrently; the bytes are identical
+        pass
+
+    upload.save(update_fields=['updated_at'])
+    return digest
+
+
+def received_chunks(upload):
+    return list(upload.chunks.order_by('index').values_list('index', flat=True))
+
+
+def finish_upload(upload):
+    """
+    Verify the assembled file and attach it to the partnership image.
+    Returns the updated partnership.
+    """
+    if upload.status != 'pending':
+        raise UploadError('Upload is already completed', status_code=409)
+
+    missing = sorted(set(range(upload.chunk_count)) - set(received_chunks(upload)))
+    if missing:
+        raise UploadError(f'Missing chunks: {missing}')
+
+    path = temp_path(upload)
+    digest = hashlib.sha256()
+    with open(path, 'rb') as handle:
+        for block in iter(lambda: handle.read(READ_BUFFER_SIZE), b''):
+            digest.update(block)
+
+    if upload.checksum and upload.checksum != digest.hexdigest():
+        discard(upload)
+        upload.delete()
+        raise UploadError('Checksum mismatch, please upload the file again')
+
+    # Image.open only parses the header; pixel data is never decoded here
+    try:
+        with Image.open(path) as image:
+            image_format = image.format
+            width, height = image.size
+    except (UnidentifiedImageError, Image.DecompressionBombError, OSError):
+        discard(upload)
+        upload.delete()
+        raise UploadError('File is not a valid image')
+
+    if image_format not in ALLOWED_FORMATS:
+        discard(upload)
+        upload.delete()
+        raise UploadError(f'Unsupported image format {image_format}')
+
+    if Image.MAX_IMAGE_PIXELS and width * height > Image.MAX_IMAGE_PIXELS:
+        discard(upload)
+        upload.delete()
+        raise UploadError('Image dimensions are too large')
+
+    partnership = upload.partnership
+    with open(path, 'rb') as handle:
+        partnership.image.save(upload.filename, File(handle), save=False)
+    try:
+        partnership.save()
+    except Exception:
+        # Don't leave the stored copy behind when the row can't be updated
+        partnership.image.delete(save=False)
+        raise
+
+    upload.status = 'completed'
+    upload.save(update_fields=['status', 'updated_at'])
+    upload.chunks.all().delete()
+    discard(upload)
+    return partnership
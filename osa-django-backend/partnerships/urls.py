@@ -7,8 +7,22 @@ urlpatterns = [
     path('public', views.get_public_partnerships, name='public'),
 
     path('statistics', views.get_statistics, name='statistics'),
+
+    path('sync', views.sync_partnerships, name='sync'),
+
+    path('analytics', views.get_analytics, name='analytics'),
+
+    path('reports', views.manage_reports, name='reports'),
+    path('reports/<int:pk>/download', views.download_report, name='report-download'),
+
+    path('duplicates', views.check_duplicates, name='duplicates'),
     
     path('', views.manage_partnerships, name='partnerships'), 
     
     path('<int:pk>/', views.manage_partnership_detail, name='partnership-detail'), 
+
+    path('<int:pk>/image-uploads/', views.start_image_upload, name='image-upload-start'),
+    path('image-uploads/<uuid:upload_id>/', views.get_image_upload, name='image-upload'),
+    path('image-uploads/<uuid:upload_id>/chunks/<int:index>', views.upload_image_chunk, name='image-upload-chunk'),
+    path('image-uploads/<uuid:upload_id>/complete', views.complete_image_upload, name='image-upload-complete'),
 ]   
\ No newline at end of file
@@ -1,61 +1,261 @@
 from rest_framework import status
-from rest_framework.decorators import api_view, permission_classes, parser_classes
-from rest_framework.parsers import MultiPartParser, FormParser, JSONParser
+from rest_framework.decorators import api_view, permission_classes, parser_classes, throttle_classes
+from rest_framework.parsers import MultiPartParser, FormParser
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated, AllowAny
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.db import transaction
 from django.db.models import Q, Count
-from .models import Partnership, AuditLog
-from .serializers import PartnershipSerializer, PartnershipLimitedSerializer
+from django.http import FileResponse
+from django.utils import timezone
+from datetime import datetime
+from .models import Partnership, ArchivedPartnership, AuditLog, PartnershipReport, ImageUpload, VersionConflict
+from .serializers import PartnershipSerializer, PartnershipLimitedSerializer, PartnershipReportSerializer
 from .permissions import IsAdminOrDepartment, IsAdminOrOwnDepartment
+from .reports import available_formats, can_download, report_file_exists, valid_school_year
+from .duplicates import find_duplicates, index_partnership, unindex_partnership
+from .uploads import UploadError, start_upload, write_chunk, received_chunks, finish_upload
+from .analytics import build_timeseries, invalidate_partnership_months, add_months, month_start, status_summary
+from .archive import PUBLIC_CACHE_NAMESPACE, include_archived
+from .outbox import add_event, changes_since, current_position
+from osa_backend.parsers import FastJSONParser, OPTIONAL_PARSERS
+from osa_backend.events import publish_on_commit
+from osa_backend.idempotency import idempotent
+from osa_backend.throttling import PublicThrottle
+from jobs.queue import enqueue
+from jobs.serializers import JobSerializer
+from osa_backend.utils import get_sparse_fieldset, if_none_match
+from osa_backend.columnar import wants_columnar, build_columns, COLUMNAR
+from osa_backend.compression import cache_compressed, invalidate_cached_responses
 import json
 
 
+def serialize_partnerships(partnerships, request, limited_only=False):
+    """
+    Serialize partnerships with the fields the user's role may see, trimmed
+    by `fields=` / `exclude=` and fetching only the columns those need.
+    Department users get full details for their own department only.
+    """
+    fields, exclude = get_sparse_fieldset(request)
+    role = None if limited_only else request.user.role
+
+    limited_fields = PartnershipLimitedSerializer.sparse_field_names(fields, exclude)
+    limited = PartnershipLimitedSerializer(fields=limited_fields, context={'request': request})
+    columns = PartnershipLimitedSerializer.model_columns(limited_fields)
+
+    full = None
+    if role is not None and role != 'viewer':
+        full_fields = PartnershipSerializer.sparse_field_names(fields, exclude)
+        full = PartnershipSerializer(fields=full_fields, context={'request': request})
+        columns |= PartnershipSerializer.model_columns(full_fields)
+
+    if role == 'department':
+        columns.add('department')
+
+    data = []
+    for partnership in partnerships.only(*columns):
+        if full is None or (role == 'department' and partnership.department != request.user.department):
+            data.append(limited.to_representation(partnership))
+        else:
+            data.append(full.to_representation(partnership))
+    return data
+
+
+# Few distinct values across many rows: sent once per response, rows hold codes
+DICTIONARY_FIELDS = ['department', 'status', 'school_year']
+
+
+def columnar_partnerships(partnerships, request, limited_only=False, archived=None):
+    """
+    `serialize_partnerships` as columns built from `values_list()`.
+    Department users see full details for their own department; on other
+    departments' rows the full-only columns are null. `archived` rows, when
+    given, follow the live ones.
+    """
+    fields, exclude = get_sparse_fieldset(request)
+    role = None if limited_only else request.user.role
+
+    if role is None or role == 'viewer':
+        names = PartnershipLimitedSerializer.sparse_field_names(fields, exclude)
+    else:
+        names = PartnershipSerializer.sparse_field_names(fields, exclude)
+
+    def image_urls(values, raw):
+        return [request.build_absolute_uri(default_storage.url(name)) if name else None for name in values]
+
+    transforms = {name: image_urls for name in ('image', 'image_url') if name in names}
+
+    if role == 'department':
+        own = request.user.department
+        limited = set(PartnershipLimitedSerializer.Meta.fields)
+
+        def masked(transform):
+            def apply(values, raw):
+                values = transform(values, raw) if transform else values
+                return [
+                    value if department == own else None
+                    for value, department in zip(values, raw['department'])
+                ]
+            return apply
+
+        for name in names:
+            if name not in limited:
+                transforms[name] = masked(transforms.get(name))
+
+    return build_columns(
+        [partnerships] if archived is None else [partnerships, archived],
+        names,
+        sources={'image_url': 'image'},
+        dictionary=DICTIONARY_FIELDS,
+        transforms=transforms,
+        extra=['department'] if role == 'department' else [],
+    )
+
+
+def partnership_list_data(partnerships, request, limited_only=False, archived=None):
+    """
+    List payload as rows, or as columns with `?shape=columnar`, plus facets.
+    `archived` is the matching archive queryset when it was asked for.
+    """
+    if wants_columnar(request):
+        count, data = columnar_partnerships(partnerships, request, limited_only, archived)
+        response_data = {
+            'success': True,
+            'count': count,
+            'shape': COLUMNAR,
+            'data': data
+        }
+    else:
+        data = serialize_partnerships(partnerships, request, limited_only)
+        if archived is not None:
+            data += serialize_partnerships(archived, request, limited_only)
+        response_data = {
+            'success': True,
+            'count': len(data),
+            'data': data
+        }
+
+    facets = compute_facets(partnerships, request, archived)
+    if facets is not None:
+        response_data['facets'] = facets
+    return response_data
+
+
+FACET_FIELDS = ['department', 'status', 'school_year']
+
+
+def compute_facets(partnerships, request, archived=None):
+    """
+    Per-value counts for the facets requested with `facets=`, computed over
+    the filtered queryset with a single grouped query and folded per facet.
+    """
+    value = request.query_params.get('facets')
+    if not value:
+        return None
+
+    facets = [name for name in FACET_FIELDS if name in value.split(',')]
+    if not facets:
+        return None
+
+    counts = {name: {} for name in facets}
+    for queryset in [partnerships] if archived is None else [partnerships, archived]:
+        rows = queryset.order_by().values(*facets).annotate(count=Count('id'))
+        for row in rows:
+            for name in facets:
+                counts[name][row[name]] = counts[name].get(row[name], 0) + row['count']
+    return counts
+
+
+PARTNERSHIP_EVENT_TYPES = {
+    'CREATE': 'partnership.created',
+    'UPDATE': 'partnership.updated',
+    'DELETE': 'partnership.deleted',
+}
+
+
+def record_partnership_change(request, action, partnership, old_values=None, new_values=None):
+    """
+    Write the audit log entry and outbox event for a partnership change and
+    notify live subscribers. Call it in the transaction that saves the
+    change, so the change, its audit row and its event commit together.
+    """
+    AuditLog.objects.create(
+        user=request.user,
+        action=action,
+        table_name='partnerships',
+        record_id=partnership.id,
+        old_values=old_values,
+        new_values=new_values
+    )
+    add_event(PARTNERSHIP_EVENT_TYPES[action], partnership.id, {
+        'department': partnership.department,
+        'status': partnership.status,
+        'old_values': old_values,
+        'new_values': new_values,
+    })
+
+    # After commit, or a rollup read in between would re-cache the old rows
+    transaction.on_commit(lambda: invalidate_partnership_months(partnership, old_values))
+
+    if action == 'DELETE':
+        unindex_partnership(partnership.id)
+    else:
+        index_partnership(partnership)
+
+    transaction.on_commit(lambda: invalidate_cached_responses(PUBLIC_CACHE_NAMESPACE))
+
+    publish_on_commit(
+        PARTNERSHIP_EVENT_TYPES[action],
+        {
+            'id': partnership.id,
+            'department': partnership.department,
+            'status': partnership.status,
+        },
+        department=partnership.department
+    )
+
 
 @api_view(['GET'])
 @permission_classes([AllowAny])  
+@throttle_classes([PublicThrottle])
+@cache_compressed(PUBLIC_CACHE_NAMESPACE, settings.PUBLIC_PARTNERSHIPS_CACHE_SECONDS)
 def get_public_partnerships(request):
     """Get all partnerships with limited info (public access)"""
-    partnerships = Partnership.objects.all()
+    filters = Q()
 
     department = request.query_params.get('department')
     school_year = request.query_params.get('school_year')
     search = request.query_params.get('search')
     
     if department:
-        partnerships = partnerships.filter(department=department)
+        filters &= Q(department=department)
     
     if school_year:
-        partnerships = partnerships.filter(school_year=school_year)
+        filters &= Q(school_year=school_year)
     
     if search:
-        partnerships = partnerships.filter(
+        filters &= (
             Q(business_name__icontains=search) |
             Q(department__icontains=search)
         )
     
-    serializer = PartnershipLimitedSerializer(
-        partnerships,
-        many=True,
-        context={'request': request}
-    )
-    
-    return Response({
-        'success': True,
-        'count': partnerships.count(),
-        'data': serializer.data
-    })
+    partnerships = Partnership.objects.filter(filters)
+    archived = ArchivedPartnership.objects.filter(filters) if include_archived(request) else None
+    return Response(partnership_list_data(partnerships, request, limited_only=True, archived=archived))
 
 
 @api_view(['GET', 'POST'])
 @permission_classes([IsAuthenticated])
-@parser_classes([MultiPartParser, FormParser, JSONParser])
+@parser_classes([MultiPartParser, FormParser, FastJSONParser, *OPTIONAL_PARSERS])
+@idempotent
 def manage_partnerships(request):
     """
     GET: Get all partnerships with filters
     POST: Create new partnership (admin/department only)
     """
     if request.method == 'GET':
-        partnerships = Partnership.objects.all()
+        filters = Q()
         
         department = request.query_params.get('department')
         status_filter = request.query_params.get('status')
@@ -63,54 +263,24 @@ def manage_partnerships(request):
         search = request.query_params.get('search')
         
         if department:
-            partnerships = partnerships.filter(department=department)
+            filters &= Q(department=department)
         
         if status_filter:
-            partnerships = partnerships.filter(status=status_filter)
+            filters &= Q(status=status_filter)
         
         if school_year:
-            partnerships = partnerships.filter(school_year=school_year)
+            filters &= Q(school_year=school_year)
         
         if search:
-            partnerships = partnerships.filter(
+            filters &= (
                 Q(business_name__icontains=search) |
                 Q(contact_person__icontains=search)
             )
         
-        user = request.user
-
-        serialized_data = []
-        for partnership in partnerships:
-            if user.role == 'viewer':
-                serializer = PartnershipLimitedSerializer(
-                    partnership,
-                    context={'request': request}
-                )
-            elif user.role == 'department':
-                if partnership.department == user.department:
-                    serializer = PartnershipSerializer(
-                        partnership,
-                        context={'request': request}
-                    )
-                else:
-                    serializer = PartnershipLimitedSerializer(
-                        partnership,
-                        context={'request': request}
-                    )
-
-            else:
-                serializer = PartnershipSerializer(
-                    partnership,
-                    context={'request': request}
-                )
-            
-            serialized_data.append(serializer.data)
-        
-        return Response({
-            'success': True,
-            'count': len(serialized_data),
-            'data': serialized_data
-        })
+        # Live partnerships only, unless ?include_archived=true
+        partnerships = Partnership.objects.filter(filters)
+        archived = ArchivedPartnership.objects.filter(filters) if include_archived(request) else None
+        return Response(partnership_list_data(partnerships, request, archived=archived))
     
     elif request.method == 'POST':
         if request.user.role not in ['admin', 'department']:
@@ -128,20 +298,23 @@ def manage_partnerships(request):
         )
         
         if serializer.is_valid():
-            partnership = serializer.save(created_by=request.user)
-            
-            AuditLog.objects.create(
-                user=request.user,
-                action='CREATE',
-                table_name='partnerships',
-                record_id=partnership.id,
-                new_values=PartnershipSerializer(partnership, context={'request': request}).data
-            )
+            with transaction.atomic():
+                partnership = serializer.save(created_by=request.user)
+                
+                record_partnership_change(
+                    request, 'CREATE', partnership,
+                    new_values=PartnershipSerializer(partnership, context={'request': request}).data
+                )
             
             return Response({
                 'success': True,
                 'message': 'Partnership created successfully',
-                'data': PartnershipSerializer(partnership, context={'request': request}).data
+                'data': PartnershipSerializer(partnership, context={'request': request}).data,
+                'possible_duplicates': find_duplicates(
+                    partnership.business_name,
+                    partnership.email,
+                    exclude_id=partnership.id
+                )
             }, status=status.HTTP_201_CREATED)
         
         print("Validation errors:", serializer.errors)
@@ -153,9 +326,47 @@ def manage_partnerships(request):
         }, status=status.HTTP_400_BAD_REQUEST)
 
 
+def partnership_etag(partnership):
+    return f'"{partnership.version}"'
+
+
+def if_match_versions(request):
+    """Versions listed in If-Match, or None when the header is absent or '*'"""
+    header = request.headers.get('If-Match', '').strip()
+    if not header or header == '*':
+        return None
+    versions = set()
+    for tag in header.split(','):
+        tag = tag.strip()
+        if tag.startswith('W/'):
+            tag = tag[2:]
+        tag = tag.strip('"')
+        if tag.isdigit():
+            versions.add(int(tag))
+    return versions
+
+
+def precondition_failed(partnership, request):
+    """412 carrying the current state, so the client can merge and retry"""
+    try:
+        partnership.refresh_from_db()
+    except Partnership.DoesNotExist:
+        return Response({
+            'success': False,
+            'message': 'Partnership not found'
+        }, status=status.HTTP_404_NOT_FOUND)
+    response = Response({
+        'success': False,
+        'message': 'Partnership was modified by someone else. Reload and try again.',
+        'data': PartnershipSerializer(partnership, context={'request': request}).data
+    }, status=status.HTTP_412_PRECONDITION_FAILED)
+    response['ETag'] = partnership_etag(partnership)
+    return response
+
+
 @api_view(['GET', 'PUT', 'DELETE'])
 @permission_classes([IsAuthenticated])
-@parser_classes([MultiPartParser, FormParser, JSONParser])
+@parser_classes([MultiPartParser, FormParser, FastJSONParser, *OPTIONAL_PARSERS])
 def manage_partnership_detail(request, pk):
     """
     GET: Get single partnership
@@ -165,14 +376,33 @@ def manage_partnership_detail(request, pk):
     try:
         partnership = Partnership.objects.get(pk=pk)
     except Partnership.DoesNotExist:
-        return Response({
-            'success': False,
-            'message': 'Partnership not found'
-        }, status=status.HTTP_404_NOT_FOUND)
+        archived = ArchivedPartnership.objects.filter(pk=pk).first()
+        if archived is None:
+            return Response({
+                'success': False,
+                'message': 'Partnership not found'
+            }, status=status.HTTP_404_NOT_FOUND)
+        if request.method != 'GET':
+            return Response({
+                'success': False,
+                'message': 'Archived partnerships are read-only'
+            }, status=status.HTTP_409_CONFLICT)
+        if not include_archived(request):
+            return Response({
+                'success': False,
+                'message': 'Partnership is archived; pass include_archived=true to read it'
+            }, status=status.HTTP_404_NOT_FOUND)
+        partnership = archived
     
     if request.method == 'GET':
         user = request.user
         
+        etag = partnership_etag(partnership)
+        if if_none_match(request, etag):
+            response = Response(status=status.HTTP_304_NOT_MODIFIED)
+            response['ETag'] = etag
+            return response
+        
         if user.role == 'viewer':
             serializer = PartnershipLimitedSerializer(
                 partnership,
@@ -195,10 +425,12 @@ def manage_partnership_detail(request, pk):
                 context={'request': request}
             )
         
-        return Response({
+        response = Response({
             'success': True,
             'data': serializer.data
         })
+        response['ETag'] = etag
+        return response
     
     elif request.method == 'PUT':
         if request.user.role not in ['admin', 'department']:
@@ -214,6 +446,10 @@ def manage_partnership_detail(request, pk):
                     'message': 'You can only update partnerships in your department'
                 }, status=status.HTTP_403_FORBIDDEN)
         
+        versions = if_match_versions(request)
+        if versions is not None and partnership.version not in versions:
+            return precondition_failed(partnership, request)
+        
         old_values = PartnershipSerializer(partnership, context={'request': request}).data
         
         serializer = PartnershipSerializer(
@@ -224,22 +460,27 @@ def manage_partnership_detail(request, pk):
         )
         
         if serializer.is_valid():
-            partnership = serializer.save()
-            
-            AuditLog.objects.create(
-                user=request.user,
-                action='UPDATE',
-                table_name='partnerships',
-                record_id=partnership.id,
-                old_values=old_values,
-                new_values=PartnershipSerializer(partnership, context={'request': request}).data
-            )
+            # Saved with WHERE version = <version read above>, no row lock held
+            try:
+                with transaction.atomic():
+                    partnership = serializer.save()
+                    
+                    new_values = PartnershipSerializer(partnership, context={'request': request}).data
+                    record_partnership_change(
+                        request, 'UPDATE', partnership,
+                        old_values=old_values,
+                        new_values=new_values
+                    )
+            except (VersionConflict, Partnership.DoesNotExist):
+                return precondition_failed(partnership, request)
             
-            return Response({
+            response = Response({
                 'success': True,
                 'message': 'Partnership updated successfully',
-                'data': PartnershipSerializer(partnership, context={'request': request}).data
+                'data': new_values
             })
+            response['ETag'] = partnership_etag(partnership)
+            return response
         
         return Response({
             'success': False,
@@ -262,47 +503,424 @@ def manage_partnership_detail(request, pk):
                     'message': 'You can only delete partnerships in your department'
                 }, status=status.HTTP_403_FORBIDDEN)
         
+        versions = if_match_versions(request)
+        if versions is not None and partnership.version not in versions:
+            return precondition_failed(partnership, request)
+        
         old_values = PartnershipSerializer(partnership, context={'request': request}).data
         
-        AuditLog.objects.create(
-            user=request.user,
-            action='DELETE',
-            table_name='partnerships',
-            record_id=partnership.id,
-            old_values=old_values
-        )
+        # With If-Match, only delete the version the client saw
+        rows = Partnership.objects.filter(pk=partnership.pk)
+        if versions is not None:
+            rows = rows.filter(version=partnership.version)
         
-        partnership.delete()
+        with transaction.atomic():
+            deleted, _ = rows.delete()
+            if deleted:
+                record_partnership_change(request, 'DELETE', partnership, old_values=old_values)
+        
+        if not deleted:
+            return precondition_failed(partnership, request)
         
         return Response({
             'success': True,
             'message': 'Partnership deleted successfully'
         })
 
+@api_view(['GET'])
+@permission_classes([IsAuthenticated, IsAdminOrDepartment])
+def check_duplicates(request):
+    """Get likely duplicates of a business name / email before creating a partnership"""
+    business_name = request.query_params.get('business_name')
+    email = request.query_params.get('email')
+
+    if not business_name and not email:
+        return Response({
+            'success': False,
+            'message': 'business_name or email is required'
+        }, status=status.HTTP_400_BAD_REQUEST)
+
+    exclude_id = request.query_params.get('exclude')
+    if exclude_id:
+        try:
+            exclude_id = int(exclude_id)
+        except ValueError:
+            return Response({
+                'success': False,
+                'message': 'exclude must be a partnership id'
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+    matches = find_duplicates(business_name, email, exclude_id=exclude_id or None)
+    return Response({
+        'success': True,
+        'count': len(matches),
+        'data': matches
+    })
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def sync_partnerships(request):
+    """
+    Get partnerships created or updated since a sync token, plus the ids of
+    partnerships deleted since then. Tokens are outbox event positions, so
+    a change is reported once it commits, however long its transaction ran;
+    a client may see a row twice but never misses one. Without `since`, or
+    with a token older than the outbox retention, the full list is returned.
+    Partnerships archived since then are reported as deleted, unless
+    `include_archived=true` keeps them in the synced set.
+    """
+    with_archived = include_archived(request)
+    since_param = request.query_params.get('since')
+
+    changes = None
+    if since_param:
+        if not since_param.isdigit():
+            return Response({
+                'success': False,
+                'message': 'Invalid since token'
+            }, status=status.HTTP_400_BAD_REQUEST)
+        changes = changes_since(int(since_param))
+
+    if changes is None:
+        # Taken before the snapshot, so changes made while it is read come again
+        next_since = current_position()
+        changed = serialize_partnerships(Partnership.objects.all(), request)
+        if with_archived:
+            changed += serialize_partnerships(ArchivedPartnership.objects.all(), request)
+        deleted = []
+    else:
+        ids, next_since = changes
+        partnerships = Partnership.objects.filter(id__in=ids)
+        present = set(partnerships.values_list('id', flat=True))
+        changed = serialize_partnerships(partnerships, request)
+        if with_archived:
+            archived = ArchivedPartnership.objects.filter(id__in=ids)
+            present |= set(archived.values_list('id', flat=True))
+            changed += serialize_partnerships(archived, request)
+        # Deleted, or archived when the archive isn't synced
+        deleted = sorted(ids - present)
+
+    return Response({
+        'success': True,
+        'data': {
+            'changed': changed,
+            'deleted': deleted,
+            'full': changes is None,
+            'next_since': str(next_since)
+        }
+    })
+
+def partnership_statistics(partnerships, archived=None):
+    counts, by_department = status_summary(partnerships, archived)
+    return {
+        'total': counts['total'],
+        'active': counts['active'],
+        'terminated': counts['terminated'],
+        'for_renewal': counts['for_renewal'],
+        'non_renewal': counts['non_renewal'],
+        'by_department': by_department
+    }
+
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def get_statistics(request):
     """Get partnership statistics"""
     user = request.user
     partnerships = Partnership.objects.all()
+    archived = ArchivedPartnership.objects.all() if include_archived(request) else None
     
     if user.role == 'department':
         partnerships = partnerships.filter(department=user.department)
+        if archived is not None:
+            archived = archived.filter(department=user.department)
+
+    return Response({
+        'success': True,
+        'data': partnership_statistics(partnerships, archived)
+    })
+
+# Longest range the analytics endpoint will build, in months
+ANALYTICS_MAX_MONTHS = 240
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def get_analytics(request):
+    """
+    Get partnerships established, expiring, terminated and created per month
+    or per school year, broken down by department
+    """
+    user = request.user
+    bucket = request.query_params.get('bucket', 'month')
+    if bucket not in ['month', 'school_year']:
+        return Response({
+            'success': False,
+            'message': 'bucket must be month or school_year'
+        }, status=status.HTTP_400_BAD_REQUEST)
+
+    current = month_start(timezone.localdate())
+    try:
+        start = request.query_params.get('start')
+        end = request.query_params.get('end')
+        start = datetime.strptime(start, '%Y-%m').date() if start else add_months(current, -11)
+        end = datetime.strptime(end, '%Y-%m').date() if end else add_months(current, 12)
+    except ValueError:
+        return Response({
+            'success': False,
+            'message': 'start and end must be in YYYY-MM format'
+        }, status=status.HTTP_400_BAD_REQUEST)
+
+    months = (end.year - start.year) * 12 + end.month - start.month + 1
+    if months < 1 or months > ANALYTICS_MAX_MONTHS:
+        return Response({
+            'success': False,
+            'message': f'Range must cover between 1 and {ANALYTICS_MAX_MONTHS} months'
+        }, status=status.HTTP_400_BAD_REQUEST)
+
+    department = request.query_params.get('department')
+    if user.role == 'department':
+        department = user.department
+
+    return Response({
+        'success': True,
+        'data': {
+            'bucket': bucket,
+            'start': f'{start:%Y-%m}',
+            'end': f'{end:%Y-%m}',
+            'periods': build_timeseries(start, end, bucket, department)
+        }
+    })
+
+
+@api_view(['GET', 'POST'])
+@permission_classes([IsAuthenticated, IsAdminOrDepartment])
+def manage_reports(request):
+    """
+    GET: Get generated department reports (department users see their own)
+    POST: Queue report generation for a school year (admin only)
+    """
+    if request.method == 'GET':
+        reports = PartnershipReport.objects.all()
+
+        school_year = request.query_params.get('school_year')
+        if school_year:
+            reports = reports.filter(school_year=school_year)
+
+        if request.user.role == 'department':
+            reports = reports.filter(department=request.user.department)
+
+        serializer = PartnershipReportSerializer(reports, many=True, context={'request': request})
+        return Response({
+            'success': True,
+            'count': len(serializer.data),
+            'data': serializer.data
+        })
+
+    elif request.method == 'POST':
+        if request.user.role != 'admin':
+            return Response({
+                'success': False,
+                'message': 'You do not have permission to generate reports'
+            }, status=status.HTTP_403_FORBIDDEN)
+
+        school_year = request.data.get('school_year')
+        report_format = request.data.get('format') or available_formats()[0]
+
+        if not school_year:
+            return Response({
+                'success': False,
+                'message': 'School year is required'
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+        if not valid_school_year(school_year):
+            return Response({
+                'success': False,
+                'message': 'School year must look like 2024-2025'
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+        if report_format not in available_formats():
+            return Response({
+                'success': False,
+                'message': f"Format must be one of: {', '.join(available_formats())}"
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+        job = enqueue(
+            'partnerships.generate_reports',
+            {'school_year': school_year, 'format': report_format},
+            user=request.user
+        )
+
+        return Response({
+            'success': True,
+            'message': 'Report generation queued',
+            'data': JobSerializer(job).data
+        }, status=status.HTTP_202_ACCEPTED)
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def download_report(request, pk):
+    """Download a generated report (admin, or department users for their own department)"""
+    report = PartnershipReport.objects.filter(pk=pk).first()
+    if report is None or not report_file_exists(report):
+        return Response({
+            'success': False,
+            'message': 'Report not found'
+        }, status=status.HTTP_404_NOT_FOUND)
+
+    if not can_download(request.user, report):
+        return Response({
+            'success': False,
+            'message': 'You do not have permission to download this report'
+        }, status=status.HTTP_403_FORBIDDEN)
+
+    return FileResponse(
+        report.file.open('rb'),
+        as_attachment=True,
+        filename=f'partnerships-{report.department}-{report.school_year}.{report.format}'
+    )
+
 
-    stats = {
-        'total': partnerships.count(),
-        'active': partnerships.filter(status='active').count(),
-        'terminated': partnerships.filter(status='terminated').count(),
-        'for_renewal': partnerships.filter(status='for_renewal').count(),
-        'non_renewal': partnerships.filter(status='non_renewal').count(),
-        'by_department': {}
+def image_upload_data(upload):
+    return {
+        'upload_id': str(upload.upload_id),
+        'partnership': upload.partnership_id,
+        'filename': upload.filename,
+        'total_size': upload.total_size,
+        'chunk_size': upload.chunk_size,
+        'chunk_count': upload.chunk_count,
+        'received_chunks': received_chunks(upload),
+        'status': upload.status,
     }
 
-    dept_counts = partnerships.values('department').annotate(count=Count('id'))
-    for item in dept_counts:
-        stats['by_department'][item['department']] = item['count']
-    
+
+def get_own_upload(request, upload_id):
+    try:
+        return ImageUpload.objects.select_related('partnership').get(
+            upload_id=upload_id, user=request.user
+        )
+    except ImageUpload.DoesNotExist:
+        return None
+
+
+@api_view(['POST'])
+@permission_classes([IsAuthenticated, IsAdminOrDepartment])
+def start_image_upload(request, pk):
+    """Start a chunked image upload for a partnership (admin/own department only)"""
+    try:
+        partnership = Partnership.objects.get(pk=pk)
+    except Partnership.DoesNotExist:
+        return Response({
+            'success': False,
+            'message': 'Partnership not found'
+        }, status=status.HTTP_404_NOT_FOUND)
+
+    if request.user.role == 'department' and partnership.department != request.user.department:
+        return Response({
+            'success': False,
+            'message': 'You can only update partnerships in your department'
+        }, status=status.HTTP_403_FORBIDDEN)
+
+    filename = request.data.get('filename')
+    try:
+        size = int(request.data.get('size'))
+    except (TypeError, ValueError):
+        size = None
+
+    if not filename or size is None:
+        return Response({
+            'success': False,
+            'message': 'filename and size are required'
+        }, status=status.HTTP_400_BAD_REQUEST)
+
+    try:
+        upload = start_upload(partnership, request.user, filename, size, request.data.get('checksum'))
+    except UploadError as exc:
+        return Response({'success': False, 'message': exc.message}, status=exc.status_code)
+
+    return Response({
+        'success': True,
+        'data': image_upload_data(upload)
+    }, status=status.HTTP_201_CREATED)
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated, IsAdminOrDepartment])
+def get_image_upload(request, upload_id):
+    """Get upload progress so an interrupted upload can resume"""
+    upload = get_own_upload(request, upload_id)
+    if upload is None:
+        return Response({
+            'success': False,
+            'message': 'Upload not found'
+        }, status=status.HTTP_404_NOT_FOUND)
+
+    return Response({
+        'success': True,
+        'data': image_upload_data(upload)
+    })
+
+
+@api_view(['PUT'])
+@permission_classes([IsAuthenticated, IsAdminOrDepartment])
+def upload_image_chunk(request, upload_id, index):
+    """Upload chunk `index` as the raw request body (optional X-Chunk-SHA256 header)"""
+    upload = get_own_upload(request, upload_id)
+    if upload is None:
+        return Response({
+            'success': False,
+            'message': 'Upload not found'
+        }, status=status.HTTP_404_NOT_FOUND)
+
+    try:
+        content_length = int(request.META.get('CONTENT_LENGTH') or 0)
+    except ValueError:
+        content_length = None
+
+    try:
+        checksum = write_chunk(
+            upload, index, request.stream, content_length,
+            request.headers.get('X-Chunk-SHA256')
+        )
+    except UploadError as exc:
+        return Response({'success': False, 'message': exc.message}, status=exc.status_code)
+
+    return Response({
+        'success': True,
+        'data': {'index': index, 'checksum': checksum}
+    })
+
+
+@api_view(['POST'])
+@permission_classes([IsAuthenticated, IsAdminOrDepartment])
+def complete_image_upload(request, upload_id):
+    """Verify the uploaded chunks and attach the image to the partnership"""
+    upload = get_own_upload(request, upload_id)
+    if upload is None:
+        return Response({
+            'success': False,
+            'message': 'Upload not found'
+        }, status=status.HTTP_404_NOT_FOUND)
+
+    old_values = PartnershipSerializer(upload.partnership, context={'request': request}).data
+
+    try:
+        with transaction.atomic():
+            try:
+                partnership = finish_upload(upload)
+            except UploadError as exc:
+                # Commits the cleanup finish_upload did before raising
+                return Response({'success': False, 'message': exc.message}, status=exc.status_code)
+
+            new_values = PartnershipSerializer(partnership, context={'request': request}).data
+            record_partnership_change(request, 'UPDATE', partnership, old_values=old_values, new_values=new_values)
+    except (VersionConflict, Partnership.DoesNotExist):
+        # Edited or deleted while completing; the upload stays pending, so
+        # completing it again after a reload attaches the image
+        return precondition_failed(upload.partnership, request)
+
     return Response({
         'success': True,
-        'data': stats
+        'message': 'Image uploaded successfully',
+        'data': new_values
     })
\ No newline at end of file
@@ -40,8 +40,8 @@ export const usePartnerships = (initialFilters = {}) => {
     }
   };
 
-  const updatePartnership = async (id, data) => {
-    const result = await partnershipService.update(id, data);
+  const updatePartnership = async (id, data, version) => {
+    const result = await partnershipService.update(id, data, version);
     if (result.success) {
       toast.success('Partnership updated successfully');
       fetchPartnerships();
@@ -68,7 +68,7 @@ const AdminDashboard = () => {
 
   const handleFormSubmit = async (data) => {
     if (selectedPartnership) {
-      const result = await updatePartnership(selectedPartnership.id, data);
+      const result = await updatePartnership(selectedPartnership.id, data, selectedPartnership.version);
       if (result.success) {
         setIsFormOpen(false);
         setSelectedPartnership(null);
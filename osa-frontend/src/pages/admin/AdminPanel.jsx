@@ -8,7 +8,6 @@ import UserManagement from '../../components/admin/UserManagement';
 import PendingUsersManagement from '../../components/admin/PendingUsersManagement';
 import LoadingSpinner from '../../components/common/LoadingSpinner';
 import adminService from '../../services/admin.service';
-import partnershipService from '../../services/partnership.service';
 import toast from 'react-hot-toast';
 
 const AdminPanel = () => {
@@ -23,21 +22,16 @@ const AdminPanel = () => {
 
   const fetchData = async () => {
     setLoading(true);
-    const [statsResult, partnershipResult] = await Promise.all([
-      adminService.getDashboardStats(),
-      partnershipService.getStatistics()
-    ]);
+    // One round trip for both stats sections
+    const result = await adminService.getDashboardBootstrap(['dashboard_stats', 'statistics']);
 
-    if (statsResult.success) {
-      setDashboardStats(statsResult.data);
+    if (result.success) {
+      setDashboardStats(result.data.dashboard_stats.data);
+      setPartnershipStats(result.data.statistics.data);
     } else {
       toast.error('Failed to fetch dashboard stats');
     }
 
-    if (partnershipResult.success) {
-      setPartnershipStats(partnershipResult.data);
-    }
-
     setLoading(false);
   };
 
@@ -23,7 +23,7 @@ const Login = () => {
       if (formData.email && formData.email.includes('@')) {
         setCheckingEmail(true);
         try {
-          const response = await api.post('/auth/check-email-status', {
+          const response = await api.post('/auth/pre-login', {
             email: formData.email
           });
           if (response.data.success) {
@@ -93,7 +93,7 @@ const DepartmentDashboard = () => {
 
   const handleFormSubmit = async (data) => {
     if (selectedPartnership) {
-      const result = await updatePartnership(selectedPartnership.id, data);
+      const result = await updatePartnership(selectedPartnership.id, data, selectedPartnership.version);
       if (result?.success) {
         setIsFormOpen(false);
         setSelectedPartnership(null);
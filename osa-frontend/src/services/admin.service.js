@@ -1,4 +1,4 @@
-import api from './api';
+import api, { postIdempotent } from './api';
 import { API_ENDPOINTS } from '../utils/constants';
 
 class AdminService {
@@ -68,7 +68,7 @@ class AdminService {
 
   async createUser(userData) {
     try {
-      const response = await api.post(API_ENDPOINTS.ADMIN.USERS, userData);
+      const response = await postIdempotent(API_ENDPOINTS.ADMIN.USERS, userData);
       if (response.data.success) {
         return { success: true, data: response.data.data };
       }
@@ -132,6 +132,24 @@ class AdminService {
     }
   }
 
+  async getDashboardBootstrap(sections) {
+    try {
+      const response = await api.get(API_ENDPOINTS.ADMIN.DASHBOARD_BOOTSTRAP, {
+        params: sections ? { sections: sections.join(',') } : undefined,
+      });
+      if (response.data.success) {
+        return { success: true, data: response.data.data };
+      }
+      return { success: false, data: null };
+    } catch (error) {
+      return {
+        success: false,
+        message: error.response?.data?.message || 'Failed to fetch dashboard',
+        data: null,
+      };
+    }
+  }
+
   async getDashboardStats() {
     try {
       const response = await api.get(API_ENDPOINTS.ADMIN.DASHBOARD_STATS);
@@ -8,6 +8,11 @@ const api = axios.create({
   },
 });
 
+const newIdempotencyKey = () => (
+  window.crypto?.randomUUID
+    ? window.crypto.randomUUID()
+    : `${Date.now().toString(36)}-${Math.random().toString(36).slice(2)}`
+);
 
 api.interceptors.request.use(
   (config) => {
@@ -36,4 +41,31 @@ api.interceptors.response.use(
   }
 );
 
+// Retried with the same Idempotency-Key: the connection dropped, the first
+// attempt is still in flight (409), or a gateway gave up on it
+const RETRY_STATUSES = [409, 502, 503, 504];
+const RETRY_DELAYS_MS = [500, 1500];
+
+const shouldRetry = (error) => !error.response || RETRY_STATUSES.includes(error.response.status);
+
+const sleep = (ms) => new Promise((resolve) => setTimeout(resolve, ms));
+
+// POST to an endpoint that accepts an Idempotency-Key (partnership create,
+// register, admin user create). The key is made once for this create and
+// sent again on every retry, so the server replays the first response
+// instead of creating a duplicate.
+export const postIdempotent = async (url, data, config = {}) => {
+  const headers = { ...config.headers, 'Idempotency-Key': newIdempotencyKey() };
+  for (let attempt = 0; ; attempt += 1) {
+    try {
+      return await api.post(url, data, { ...config, headers });
+    } catch (error) {
+      if (attempt >= RETRY_DELAYS_MS.length || !shouldRetry(error)) {
+        throw error;
+      }
+      await sleep(RETRY_DELAYS_MS[attempt]);
+    }
+  }
+};
+
 export default api;
\ No newline at end of file
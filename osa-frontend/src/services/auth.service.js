@@ -1,4 +1,4 @@
-import api from './api';
+import api, { postIdempotent } from './api';
 import { API_ENDPOINTS, STORAGE_KEYS } from '../utils/constants';
 
 class AuthService {
@@ -27,7 +27,7 @@ class AuthService {
 
   async register(userData) {
     try {
-      const response = await api.post(API_ENDPOINTS.AUTH.REGISTER, userData);
+      const response = await postIdempotent(API_ENDPOINTS.AUTH.REGISTER, userData);
       
       if (response.data.success) {
         return { 
@@ -80,6 +80,10 @@ class AuthService {
         currentPassword,
         newPassword,
       });
+      // The old token is revoked; keep the session on the new one
+      if (response.data.data?.token) {
+        localStorage.setItem(STORAGE_KEYS.TOKEN, response.data.data.token);
+      }
       return { success: true, message: response.data.message };
     } catch (error) {
       return {
@@ -90,6 +94,14 @@ class AuthService {
   }
 
   logout() {
+    const token = localStorage.getItem(STORAGE_KEYS.TOKEN);
+    if (token) {
+      // Best effort: revoke the token server-side, but never block logging out.
+      // The header is set here because storage is cleared before interceptors run.
+      api.post(API_ENDPOINTS.AUTH.LOGOUT, null, {
+        headers: { Authorization: `Bearer ${token}` },
+      }).catch(() => {});
+    }
     localStorage.removeItem(STORAGE_KEYS.TOKEN);
     localStorage.removeItem(STORAGE_KEYS.USER);
     window.location.href = '/login';
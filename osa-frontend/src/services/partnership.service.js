@@ -1,4 +1,4 @@
-import api from './api';
+import api, { postIdempotent } from './api';
 import { API_ENDPOINTS } from '../utils/constants';
 
 class PartnershipService {
@@ -45,7 +45,7 @@ class PartnershipService {
   async create(partnershipData) {
     try {
      
-      const response = await api.post(
+      const response = await postIdempotent(
         API_ENDPOINTS.PARTNERSHIPS.BASE,
         partnershipData,
         {
@@ -67,17 +67,18 @@ class PartnershipService {
     }
   }
 
-  async update(id, partnershipData) {
+  async update(id, partnershipData, version) {
     try {
+      const headers = { 'Content-Type': 'multipart/form-data' };
+      // Only apply the edit if nobody saved the record since it was loaded
+      if (version) {
+        headers['If-Match'] = `"${version}"`;
+      }
     
       const response = await api.put(
         API_ENDPOINTS.PARTNERSHIPS.BY_ID(id),
         partnershipData,
-        {
-          headers: {
-            'Content-Type': 'multipart/form-data'
-          }
-        }
+        { headers }
       );
       
       if (response.data.success) {
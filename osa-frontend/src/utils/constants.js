@@ -24,8 +24,10 @@ export const USER_ROLES = [
 export const API_ENDPOINTS = {
   AUTH: {
     LOGIN: '/auth/login',
+    LOGOUT: '/auth/logout',
     REGISTER: '/auth/register',
     CHECK_EMAIL: '/auth/check-email',
+    PRE_LOGIN: '/auth/pre-login',
     PROFILE: '/auth/profile',
     CHANGE_PASSWORD: '/auth/change-password'
   },
@@ -42,7 +44,8 @@ export const API_ENDPOINTS = {
     REJECT_USER: (id) => `/admin/users/${id}/reject/`,
     CHANGE_USER_PASSWORD: (id) => `/admin/users/${id}/change-password/`,
     AUDIT_LOGS: '/admin/audit-logs',
-    DASHBOARD_STATS: '/admin/dashboard-stats'
+    DASHBOARD_STATS: '/admin/dashboard-stats',
+    DASHBOARD_BOOTSTRAP: '/admin/dashboard/bootstrap/'
   }
 };
 